@@ -9,21 +9,19 @@ import hashlib
 import json
 import logging
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal, InvalidOperation
+from datetime import datetime, timezone
+from decimal import Decimal
 from typing import Any, Dict, List, Mapping, MutableMapping, Optional, Sequence, Tuple
 
-try:  # pragma: no cover - Python 3.9+ ?? zoneinfo
-    from zoneinfo import ZoneInfo
-except ImportError:  # pragma: no cover
-    ZoneInfo = None  # type: ignore[assignment, misc]
-
 from vnpy_fubon.normalization import normalize_exchange, normalize_symbol
+from vnpy_fubon.numeric import Number, NumberConverter, get_number_converter
+from vnpy_fubon.orderbook import apply_depth_to_tick, extract_levels, is_snapshot_payload
+from vnpy_fubon.timestamps import TAIPEI_TZ, parse_timestamp, utc_and_taipei
 from vnpy_fubon.vnpy_compat import Direction, Exchange, Offset, TickData, TradeData
 
 LOGGER = logging.getLogger("vnpy_fubon.adapters")
 
-TAIWAN_TZ = ZoneInfo("Asia/Taipei") if ZoneInfo else timezone(timedelta(hours=8))
+TAIWAN_TZ = TAIPEI_TZ
 
 
 # --------------------------------------------------------------------------- #
@@ -120,67 +118,21 @@ def _first(payload: Mapping[str, Any], *keys: str, default: Any = None) -> Any:
     return default
 
 
-def _to_decimal(value: Any, fallback: str = "0") -> Decimal:
-    if isinstance(value, Decimal):
-        return value
-    if value in (None, "", "null"):
-        return Decimal(fallback)
-    if isinstance(value, (int, float)):
-        return Decimal(str(value))
-    text = str(value).strip().replace(",", "")
-    if not text:
-        return Decimal(fallback)
-    try:
-        return Decimal(text)
-    except (InvalidOperation, ValueError):
-        return Decimal(fallback)
-
-
-def _ensure_datetime(value: Any) -> datetime:
+def _ensure_datetime(value: Any, source: Any = None) -> datetime:
     """Convert various timestamp formats to a timezone-aware UTC datetime."""
 
-    if isinstance(value, datetime):
-        dt = value
-    elif isinstance(value, (int, float)):
-        timestamp = float(value)
-        if timestamp > 1_000_000_000_000_000_000:  # nanoseconds
-            timestamp /= 1_000_000_000.0
-        elif timestamp > 1_000_000_000_000_000:  # microseconds
-            timestamp /= 1_000_000.0
-        elif timestamp > 1_000_000_000_000:  # milliseconds
-            timestamp /= 1_000.0
-        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-    elif isinstance(value, str):
-        text = value.strip()
-        for parser in (
-            datetime.fromisoformat,
-            lambda s: datetime.strptime(s, "%Y-%m-%d %H:%M:%S"),
-            lambda s: datetime.strptime(s, "%Y/%m/%d %H:%M:%S"),
-            lambda s: datetime.strptime(s, "%Y%m%d%H%M%S"),
-        ):
-            try:
-                dt = parser(text)
-                break
-            except Exception:
-                continue
-        else:
-            dt = datetime.now(timezone.utc)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        else:
-            dt = dt.astimezone(timezone.utc)
-    else:
-        dt = datetime.now(timezone.utc)
-
+    dt = parse_timestamp(value, source=source)
+    if dt is None:
+        return datetime.now(timezone.utc)
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
+        return dt.replace(tzinfo=timezone.utc)
+    if dt.tzinfo is timezone.utc:
+        return dt
     return dt.astimezone(timezone.utc)
 
 
 def _utc_and_local(event_dt: datetime) -> Tuple[datetime, datetime]:
-    utc_dt = event_dt.astimezone(timezone.utc)
-    local_dt = utc_dt.astimezone(TAIWAN_TZ)
-    return utc_dt, local_dt
+    return utc_and_taipei(event_dt)
 
 
 def _resolve_direction(raw: Any) -> Direction:
@@ -219,14 +171,17 @@ def _flatten_market_payload(payload: Mapping[str, Any]) -> Mapping[str, Any]:
     if not isinstance(payload, Mapping):
         return payload
 
-    merged: Dict[str, Any] = dict(payload)
     stack: List[Mapping[str, Any]] = []
-
     for key in ("data", "payload"):
         nested = payload.get(key)
         if isinstance(nested, Mapping):
             stack.append(nested)
 
+    if not stack:
+        # Already flat (e.g. expanded by MarketAPI); reuse the mapping without copying.
+        return payload
+
+    merged: Dict[str, Any] = dict(payload)
     seen: set[int] = set()
     while stack:
         current = stack.pop()
@@ -252,8 +207,14 @@ def _flatten_market_payload(payload: Mapping[str, Any]) -> Mapping[str, Any]:
 class MarketEnvelopeNormalizer:
     """Convert Fubon websocket payloads into vn.py compatible data structures."""
 
-    def __init__(self, *, gateway_name: str = "FubonIngest") -> None:
+    def __init__(self, *, gateway_name: str = "FubonIngest", numeric_mode: Optional[str] = None) -> None:
+        """
+        ``numeric_mode`` selects ``decimal`` or ``float`` prices and sizes (default from
+        ``FUBON_NUMERIC_MODE``, else ``decimal``); persistence callers should pin ``decimal``.
+        """
+
         self.gateway_name = gateway_name
+        self._num: NumberConverter = get_number_converter(numeric_mode)
 
     # ------------------------ raw envelope helpers ------------------------ #
 
@@ -263,8 +224,10 @@ class MarketEnvelopeNormalizer:
         *,
         default_channel: str,
         latency_ms: Optional[int] = None,
+        flatten: bool = True,
     ) -> RawEnvelope:
-        payload = _flatten_market_payload(payload)
+        if flatten:
+            payload = _flatten_market_payload(payload)
         channel = str(_first(payload, "channel", "topic", "type", default=default_channel)).lower()
         symbol = normalize_symbol(_first(payload, "symbol", "contractId", "code", "contractID"))
         if not symbol:
@@ -278,7 +241,8 @@ class MarketEnvelopeNormalizer:
                 "updateTime",
                 "timestamp",
                 "time",
-            )
+            ),
+            (channel, "event_time"),
         )
         event_ts_utc, event_ts_local = _utc_and_local(event_dt)
         seq = _seq_from_payload(payload)
@@ -301,8 +265,19 @@ class MarketEnvelopeNormalizer:
         payload: Mapping[str, Any],
         *,
         latency_ms: Optional[int] = None,
+        flatten: bool = True,
     ) -> NormalizedTrade:
-        raw_env = self.build_raw_envelope(payload, default_channel="trades", latency_ms=latency_ms)
+        """
+        Normalise a trade payload.
+
+        Pass ``flatten=False`` when the payload has already been unwrapped from its
+        ``data`` envelope (as ``MarketAPI.parse_market_events`` does) so the mapping
+        is used as-is instead of being walked a second time.
+        """
+
+        raw_env = self.build_raw_envelope(
+            payload, default_channel="trades", latency_ms=latency_ms, flatten=flatten
+        )
         payload = raw_env.payload
         exchange = normalize_exchange(_first(payload, "exchange", "market", default="TAIFEX"))
 
@@ -315,7 +290,7 @@ class MarketEnvelopeNormalizer:
         if trade_entry is None:
             trade_entry = payload
 
-        price = _to_decimal(
+        price = self._num(
             _first(
                 trade_entry,
                 "price",
@@ -324,7 +299,7 @@ class MarketEnvelopeNormalizer:
                 default=_first(payload, "price", "matchPrice", "dealPrice", default="0"),
             )
         )
-        qty = _to_decimal(
+        qty = self._num(
             _first(
                 trade_entry,
                 "size",
@@ -354,8 +329,8 @@ class MarketEnvelopeNormalizer:
             bid_hint = trade_entry.get("bid")
             ask_hint = trade_entry.get("ask")
             try:
-                bid_px = _to_decimal(bid_hint) if bid_hint is not None else None
-                ask_px = _to_decimal(ask_hint) if ask_hint is not None else None
+                bid_px = self._num(bid_hint) if bid_hint is not None else None
+                ask_px = self._num(ask_hint) if ask_hint is not None else None
             except Exception:
                 bid_px = ask_px = None
             if bid_px is not None and price <= bid_px:
@@ -411,8 +386,8 @@ class MarketEnvelopeNormalizer:
         payload = raw_env.payload
         exchange = normalize_exchange(_first(payload, "exchange", "market", default="TAIFEX"))
 
-        last_price = _to_decimal(_first(payload, "lastPrice", "close", "referencePrice", default="0"))
-        volume = _to_decimal(_first(payload, "totalVolume", "volume", default="0"))
+        last_price = self._num(_first(payload, "lastPrice", "close", "referencePrice", default="0"))
+        volume = self._num(_first(payload, "totalVolume", "volume", default="0"))
         name = str(_first(payload, "name", "symbolName", "symbol", default=raw_env.symbol))
 
         tick = TickData(
@@ -425,69 +400,51 @@ class MarketEnvelopeNormalizer:
             gateway_name=self.gateway_name,
         )
 
-        rows: List[BookRow] = []
+        num = self._num
         bids: Sequence[Any] | None = payload.get("bids") or payload.get("bidQuotes")
         asks: Sequence[Any] | None = payload.get("asks") or payload.get("askQuotes")
 
         if isinstance(bids, Sequence) and isinstance(asks, Sequence) and bids and asks:
-            for level in range(1, depth + 1):
-                bid_px, bid_sz = _extract_array_level(bids, level)
-                ask_px, ask_sz = _extract_array_level(asks, level)
-                rows.append(
-                    BookRow(
-                        symbol=raw_env.symbol,
-                        event_ts_utc=raw_env.event_ts_utc,
-                        event_ts_local=raw_env.event_ts_local,
-                        level=level,
-                        bid_px=bid_px,
-                        bid_sz=bid_sz,
-                        ask_px=ask_px,
-                        ask_sz=ask_sz,
-                        mid_px=_mid_price(bid_px, ask_px),
-                        book_seq=raw_env.seq,
-                        is_snapshot=_is_snapshot(payload),
-                        channel=raw_env.channel,
-                        checksum=raw_env.checksum,
-                    )
-                )
+            zero = num(0)
+            bid_prices, bid_sizes = extract_levels(bids, depth, num, zero)
+            ask_prices, ask_sizes = extract_levels(asks, depth, num, zero)
         else:
+            bid_prices, bid_sizes, ask_prices, ask_sizes = [], [], [], []
             for level in range(1, depth + 1):
-                bid_px = _to_decimal(_first(payload, f"bidPx{level}", f"bidPrice{level}"), fallback="0")
-                bid_sz = _to_decimal(_first(payload, f"bidSz{level}", f"bidVolume{level}", f"bidQty{level}"), fallback="0")
-                ask_px = _to_decimal(_first(payload, f"askPx{level}", f"askPrice{level}"), fallback="0")
-                ask_sz = _to_decimal(_first(payload, f"askSz{level}", f"askVolume{level}", f"askQty{level}"), fallback="0")
-                rows.append(
-                    BookRow(
-                        symbol=raw_env.symbol,
-                        event_ts_utc=raw_env.event_ts_utc,
-                        event_ts_local=raw_env.event_ts_local,
-                        level=level,
-                        bid_px=bid_px,
-                        bid_sz=bid_sz,
-                        ask_px=ask_px,
-                        ask_sz=ask_sz,
-                        mid_px=_mid_price(bid_px, ask_px),
-                        book_seq=raw_env.seq,
-                        is_snapshot=_is_snapshot(payload),
-                        channel=raw_env.channel,
-                        checksum=raw_env.checksum,
-                    )
-                )
-
-        if rows:
-            first = rows[0]
-            tick.bid_price_1 = first.bid_px
-            tick.bid_volume_1 = first.bid_sz
-            tick.ask_price_1 = first.ask_px
-            tick.ask_volume_1 = first.ask_sz
+                bid_prices.append(num(_first(payload, f"bidPx{level}", f"bidPrice{level}")))
+                bid_sizes.append(num(_first(payload, f"bidSz{level}", f"bidVolume{level}", f"bidQty{level}")))
+                ask_prices.append(num(_first(payload, f"askPx{level}", f"askPrice{level}")))
+                ask_sizes.append(num(_first(payload, f"askSz{level}", f"askVolume{level}", f"askQty{level}")))
+
+        is_snapshot = _is_snapshot(payload)
+        rows = [
+            BookRow(
+                symbol=raw_env.symbol,
+                event_ts_utc=raw_env.event_ts_utc,
+                event_ts_local=raw_env.event_ts_local,
+                level=index + 1,
+                bid_px=bid_px,
+                bid_sz=bid_sz,
+                ask_px=ask_px,
+                ask_sz=ask_sz,
+                mid_px=_mid_price(bid_px, ask_px),
+                book_seq=raw_env.seq,
+                is_snapshot=is_snapshot,
+                channel=raw_env.channel,
+                checksum=raw_env.checksum,
+            )
+            for index, (bid_px, bid_sz, ask_px, ask_sz) in enumerate(
+                zip(bid_prices, bid_sizes, ask_prices, ask_sizes)
+            )
+        ]
+        apply_depth_to_tick(tick, bid_prices, bid_sizes, ask_prices, ask_sizes)
 
         tick.extra = {
             "book_seq": raw_env.seq,
-            "is_snapshot": _is_snapshot(payload),
+            "is_snapshot": is_snapshot,
             "channel": raw_env.channel,
             "checksum": raw_env.checksum,
             "latency_ms": raw_env.latency_ms,
-            "levels": [row.as_dict() for row in rows],
         }
 
         return NormalizedOrderBook(tick=tick, rows=rows, raw=raw_env)
@@ -504,15 +461,15 @@ class MarketEnvelopeNormalizer:
         payload = raw_env.payload
         exchange = normalize_exchange(_first(payload, "exchange", "market", default="TAIFEX"))
 
-        last_price = _to_decimal(_first(payload, "lastPrice", "close", default="0"))
-        open_price = _to_decimal(_first(payload, "openPrice", "open", default="0"))
-        high_price = _to_decimal(_first(payload, "highPrice", "high", default="0"))
-        low_price = _to_decimal(_first(payload, "lowPrice", "low", default="0"))
-        volume = _to_decimal(_first(payload, "volume", "totalVolume", "accVolume", default="0"))
-        turnover = _to_decimal(_first(payload, "turnover", "totalTurnover", default="0"))
-        open_interest = _to_decimal(_first(payload, "openInterest", "oi"), fallback="0")
-        est_settlement = _to_decimal(_first(payload, "settlementPrice", "theoreticalPrice"), fallback="0")
-        implied_vol = _to_decimal(_first(payload, "impliedVol", "impliedVolatility"), fallback="0")
+        last_price = self._num(_first(payload, "lastPrice", "close", default="0"))
+        open_price = self._num(_first(payload, "openPrice", "open", default="0"))
+        high_price = self._num(_first(payload, "highPrice", "high", default="0"))
+        low_price = self._num(_first(payload, "lowPrice", "low", default="0"))
+        volume = self._num(_first(payload, "volume", "totalVolume", "accVolume", default="0"))
+        turnover = self._num(_first(payload, "turnover", "totalTurnover", default="0"))
+        open_interest = self._num(_first(payload, "openInterest", "oi"))
+        est_settlement = self._num(_first(payload, "settlementPrice", "theoreticalPrice"))
+        implied_vol = self._num(_first(payload, "impliedVol", "impliedVolatility"))
 
         tick = TickData(
             symbol=raw_env.symbol,
@@ -524,10 +481,10 @@ class MarketEnvelopeNormalizer:
             gateway_name=self.gateway_name,
         )
 
-        tick.bid_price_1 = _to_decimal(_first(payload, "bidPx1", "bidPrice1"), fallback="0")
-        tick.bid_volume_1 = _to_decimal(_first(payload, "bidSz1", "bidVolume1"), fallback="0")
-        tick.ask_price_1 = _to_decimal(_first(payload, "askPx1", "askPrice1"), fallback="0")
-        tick.ask_volume_1 = _to_decimal(_first(payload, "askSz1", "askVolume1"), fallback="0")
+        tick.bid_price_1 = self._num(_first(payload, "bidPx1", "bidPrice1"))
+        tick.bid_volume_1 = self._num(_first(payload, "bidSz1", "bidVolume1"))
+        tick.ask_price_1 = self._num(_first(payload, "askPx1", "askPrice1"))
+        tick.ask_volume_1 = self._num(_first(payload, "askSz1", "askVolume1"))
 
         tick.extra = {
             "channel": raw_env.channel,
@@ -542,7 +499,7 @@ class MarketEnvelopeNormalizer:
             "event_ts_utc": raw_env.event_ts_utc,
             "event_ts_local": raw_env.event_ts_local,
             "last_px": last_price,
-            "prev_close_px": _to_decimal(_first(payload, "prevClose", "previousClose"), fallback="0"),
+            "prev_close_px": self._num(_first(payload, "prevClose", "previousClose")),
             "open_px": open_price,
             "high_px": high_price,
             "low_px": low_price,
@@ -566,40 +523,15 @@ class MarketEnvelopeNormalizer:
 # --------------------------------------------------------------------------- #
 # ?????????
 
-def _extract_array_level(entries: Sequence[Any], level: int) -> Tuple[Decimal, Decimal]:
-    index = level - 1
-    if index >= len(entries):
-        return Decimal("0"), Decimal("0")
-
-    entry = entries[index]
-    if isinstance(entry, Mapping):
-        price = _to_decimal(_first(entry, "price", "px"))
-        size = _to_decimal(_first(entry, "qty", "size", "volume"))
-        return price, size
-    if isinstance(entry, Sequence) and len(entry) >= 2:
-        price = _to_decimal(entry[0])
-        size = _to_decimal(entry[1])
-        return price, size
-    return Decimal("0"), Decimal("0")
-
-
-def _is_snapshot(payload: Mapping[str, Any]) -> bool:
-    flag = _first(payload, "isSnapshot", "snapshot")
-    if isinstance(flag, bool):
-        return flag
-    text = str(flag or "").strip().lower()
-    if text in {"y", "yes", "true", "snapshot"}:
-        return True
-    if text in {"n", "no", "false", "delta"}:
-        return False
-    return _first(payload, "seq", "bookSeq") is None  # ????????
-
-def _mid_price(bid: Decimal, ask: Decimal) -> Optional[Decimal]:
+_is_snapshot = is_snapshot_payload
+
+
+def _mid_price(bid: Number, ask: Number) -> Optional[Number]:
     if bid is None or ask is None:
         return None
-    if bid == Decimal("0") and ask == Decimal("0"):
+    if not bid and not ask:
         return None
-    return (bid + ask) / Decimal("2")
+    return (bid + ask) / 2
 
 
 __all__ = [
@@ -13,7 +13,6 @@ asyncio-friendly callbacks.
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
 from concurrent.futures import Future
@@ -30,8 +29,18 @@ from fubon_neo.fugle_marketdata.constants import (
     MESSAGE_EVENT,
 )
 
+from vnpy_fubon.json_codec import JsonDecoder, get_json_decoder
+from vnpy_fubon.ws_pool import DEFAULT_MAX_SUBSCRIPTIONS, batch_keys
+
 LOGGER = logging.getLogger("vnpy_fubon.clients.api")
 
+SessionKey = Tuple[str, Optional[bool]]
+
+
+def _channel_name(channel: str) -> str:
+    name = channel.lower()
+    return "books" if name == "orderbook" else name
+
 
 class ClientState(Enum):
     """Lifecycle phases of the streaming client."""
@@ -182,8 +191,10 @@ class FubonAPIClient:
         on_state_change: Optional[Callable[[ClientState], None]] = None,
         sdk_factory: Callable[[], FubonSDK] = FubonSDK,
         auto_reconnect: bool = True,
+        json_decoder: Optional[str] = None,
     ) -> None:
         self.credentials = credentials or StreamingCredentials()
+        self._decode: JsonDecoder = get_json_decoder(json_decoder)
         if isinstance(mode, str):
             normalized = mode.strip().lower()
             resolved_mode = None
@@ -205,8 +216,9 @@ class FubonAPIClient:
         self._state = ClientState.IDLE
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._ws = None
-        self._subscriptions: Dict[str, Subscription] = {}
-        self._subscription_ids: Dict[Tuple[str, str], str] = {}
+        # Keyed by (symbol, afterHours) so both sessions can be held at once.
+        self._subscriptions: Dict[SessionKey, Subscription] = {}
+        self._subscription_ids: Dict[Tuple[str, str, Optional[bool]], str] = {}
         self._pending_tasks: set[asyncio.Future[Any]] = set()
         self._ws_handlers_registered = False
         self._auto_reconnect_default = auto_reconnect
@@ -272,15 +284,19 @@ class FubonAPIClient:
     # ------------------------------------------------------------------ #
     # Subscription helpers
 
+    @property
+    def subscriptions(self) -> Tuple[SessionKey, ...]:
+        """``(symbol, afterHours)`` pairs currently subscribed."""
+
+        return tuple(self._subscriptions)
+
     async def subscribe(self, subscription: Subscription) -> None:
         if self._ws is None:
             raise RuntimeError("Websocket client not started. Call start() first.")
 
-        self._subscriptions[subscription.symbol] = subscription
+        self._subscriptions[(subscription.symbol, subscription.after_hours)] = subscription
         for channel in subscription.channels:
-            channel_name = channel.lower()
-            if channel_name == "orderbook":
-                channel_name = "books"
+            channel_name = _channel_name(channel)
             payload: Dict[str, Any] = {"channel": channel_name}
             symbols = subscription.extra.get("symbols") if isinstance(subscription.extra, Mapping) else None
             if symbols and isinstance(symbols, Sequence):
@@ -297,35 +313,99 @@ class FubonAPIClient:
                 else {}
             )
             payload.update(extra_items)
-            response = await asyncio.to_thread(self._ws.subscribe, payload)
-            parsed_ids = self._parse_subscription_ids(response, payload.get("symbols", []))
-            sub_id = parsed_ids.get(subscription.symbol)
-            if sub_id:
-                self._subscription_ids[(channel_name, subscription.symbol)] = sub_id
+            await self._send_subscribe(payload, subscription.after_hours, only=subscription.symbol)
+
+    async def subscribe_many(
+        self, subscriptions: Sequence[Subscription], *, batch_size: int = DEFAULT_MAX_SUBSCRIPTIONS
+    ) -> int:
+        """
+        Subscribe many symbols with one request per channel, session and depth.
+
+        Subscriptions carrying ``extra`` options go through :meth:`subscribe`
+        individually. Returns the number of websocket requests sent.
+        """
+
+        if self._ws is None:
+            raise RuntimeError("Websocket client not started. Call start() first.")
+
+        entries: list[Tuple[str, Optional[bool], Optional[int], str]] = []
+        singles: list[Subscription] = []
+        for subscription in subscriptions:
+            if subscription.extra:
+                singles.append(subscription)
+                continue
+            self._subscriptions[(subscription.symbol, subscription.after_hours)] = subscription
+            for channel in subscription.channels:
+                channel_name = _channel_name(channel)
+                depth = subscription.depth if channel_name == "books" else None
+                entries.append((channel_name, subscription.after_hours, depth, subscription.symbol))
+
+        requests = 0
+        for (channel_name, after_hours, depth), batch in batch_keys(entries, lambda entry: entry[:3], batch_size):
+            payload: Dict[str, Any] = {"channel": channel_name, "symbols": [entry[3] for entry in batch]}
+            if depth is not None:
+                payload["depth"] = depth
+            if after_hours is not None:
+                payload["afterHours"] = bool(after_hours)
+            await self._send_subscribe(payload, after_hours)
+            requests += 1
+        for subscription in singles:
+            await self.subscribe(subscription)
+            requests += len(subscription.channels)
+        return requests
+
+    async def _send_subscribe(
+        self, payload: Dict[str, Any], after_hours: Optional[bool], *, only: Optional[str] = None
+    ) -> None:
+        response = await asyncio.to_thread(self._ws.subscribe, payload)
+        parsed_ids = self._parse_subscription_ids(response, payload.get("symbols", []))
+        for symbol, sub_id in parsed_ids.items():
+            if sub_id and (only is None or symbol == only):
+                self._subscription_ids[(payload["channel"], symbol, after_hours)] = sub_id
 
     async def unsubscribe(self, symbol: str) -> None:
+        """Drop ``symbol`` in every session it is subscribed in."""
+
+        await self.unsubscribe_many([key for key in self._subscriptions if key[0] == symbol])
+
+    async def unsubscribe_many(
+        self, keys: Sequence[SessionKey], *, batch_size: int = DEFAULT_MAX_SUBSCRIPTIONS
+    ) -> int:
+        """
+        Drop ``(symbol, afterHours)`` subscriptions, batching known ids per request.
+
+        Channels without a recorded id are unsubscribed one payload at a time.
+        Returns the number of websocket requests sent.
+        """
+
         if self._ws is None:
-            return
-        sub = self._subscriptions.pop(symbol, None)
-        if not sub:
-            return
+            return 0
         ids: list[str] = []
         fallback_payloads: list[Dict[str, Any]] = []
-        for channel in sub.channels:
-            channel_name = channel.lower()
-            if channel_name == "orderbook":
-                channel_name = "books"
-            key = (channel_name, symbol)
-            sub_id = self._subscription_ids.pop(key, None)
-            if sub_id:
-                ids.append(sub_id)
-            else:
-                fallback_payloads.append({"channel": channel_name, "symbol": symbol})
-        if ids:
-            payload = {"ids": ids}
-            await asyncio.to_thread(self._ws.unsubscribe, payload)
+        for key in keys:
+            sub = self._subscriptions.pop(key, None)
+            if not sub:
+                continue
+            symbol, after_hours = key
+            for channel in sub.channels:
+                channel_name = _channel_name(channel)
+                sub_id = self._subscription_ids.pop((channel_name, symbol, after_hours), None)
+                if sub_id:
+                    ids.append(sub_id)
+                    continue
+                payload: Dict[str, Any] = {"channel": channel_name, "symbol": symbol}
+                if after_hours is not None:
+                    payload["afterHours"] = bool(after_hours)
+                fallback_payloads.append(payload)
+        requests = 0
+        size = max(1, int(batch_size))
+        for offset in range(0, len(ids), size):
+            await asyncio.to_thread(self._ws.unsubscribe, {"ids": ids[offset : offset + size]})
+            requests += 1
         for payload in fallback_payloads:
             await asyncio.to_thread(self._ws.unsubscribe, payload)
+            requests += 1
+        return requests
 
     def _parse_subscription_ids(self, response: Any, symbols: Sequence[str]) -> Dict[str, str]:
         parsed: Dict[str, str] = {}
@@ -423,7 +503,7 @@ class FubonAPIClient:
             return
 
         try:
-            payload = json.loads(raw)
+            payload = self._decode(raw)
         except Exception:
             LOGGER.debug("Failed to decode websocket payload: %s", raw, exc_info=True)
             payload = {"event": "raw", "data": raw}
@@ -457,8 +537,8 @@ class FubonAPIClient:
     # Internal helpers
 
     async def _restore_subscriptions(self) -> None:
-        for subscription in list(self._subscriptions.values()):
-            await self.subscribe(subscription)
+        self._subscription_ids.clear()
+        await self.subscribe_many(list(self._subscriptions.values()))
 
     def _schedule_reconnect(self) -> None:
         if not self._auto_reconnect_enabled or self._stopping or self._loop is None:
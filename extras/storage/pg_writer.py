@@ -12,6 +12,7 @@ from dataclasses import dataclass
 from typing import Any, Callable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from adapters import BookRow, NormalizedOrderBook, NormalizedQuote, NormalizedTrade, RawEnvelope
+from vnpy_fubon.gaps import GapEvent
 
 try:  # pragma: no cover - 測試時可使用假連線
     import psycopg
@@ -295,6 +296,64 @@ class PostgresWriter:
 
         self._execute_with_retry(job, description="market_quotes 批次寫入")
 
+    def write_reconcile(
+        self, gaps: Sequence[GapEvent], *, notes: Optional[str] = None
+    ) -> List[int]:
+        """寫入即時偵測到的序號缺口，回傳 reconcile_log.id（狀態為 pending）。"""
+
+        if not gaps:
+            return []
+        ids: List[int] = []
+
+        def job() -> None:
+            ids.clear()
+            with self._cursor() as cur:
+                for gap in gaps:
+                    cur.execute(
+                        """
+                        INSERT INTO reconcile_log (
+                            symbol, channel, start_seq, end_seq,
+                            start_ts_utc, end_ts_utc, gap_detected_at, notes
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING id
+                        """,
+                        (
+                            gap.symbol,
+                            gap.channel,
+                            gap.start_seq,
+                            gap.end_seq,
+                            gap.start_ts_utc,
+                            gap.end_ts_utc,
+                            gap.detected_at,
+                            notes,
+                        ),
+                    )
+                    ids.append(cur.fetchone()[0])
+
+        self._execute_with_retry(job, description="reconcile_log 寫入")
+        return list(ids)
+
+    def update_reconcile(
+        self, reconcile_id: int, status: str, *, notes: Optional[str] = None
+    ) -> None:
+        """更新 reconcile_log 狀態並累計重試次數。"""
+
+        def job() -> None:
+            with self._cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE reconcile_log
+                       SET gap_status = %s,
+                           notes = COALESCE(%s, notes),
+                           last_retry_at = NOW(),
+                           retry_count = retry_count + 1
+                     WHERE id = %s
+                    """,
+                    (status, notes, reconcile_id),
+                )
+
+        self._execute_with_retry(job, description="reconcile_log 狀態更新")
+
     def ingest_bundle(
         self,
         *,
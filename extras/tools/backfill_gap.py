@@ -114,7 +114,7 @@ def fetch_raw_rows(cur, symbol: str, start: datetime, end: datetime, channel: st
 
 
 def backfill_trades(conn, dsn: str, symbol: str, start: datetime, end: datetime, writer: PostgresWriter) -> int:
-    adapter = FubonToVnpyAdapter(gateway_name="FubonBackfill")
+    adapter = FubonToVnpyAdapter(gateway_name="FubonBackfill", numeric_mode="decimal")
     with conn.cursor() as cur:
         payloads = fetch_raw_rows(cur, symbol, start, end, channel="trades")
     if not payloads:
@@ -131,7 +131,7 @@ def backfill_trades(conn, dsn: str, symbol: str, start: datetime, end: datetime,
 
 
 def backfill_quotes(conn, dsn: str, symbol: str, start: datetime, end: datetime, writer: PostgresWriter) -> int:
-    adapter = FubonToVnpyAdapter(gateway_name="FubonBackfill")
+    adapter = FubonToVnpyAdapter(gateway_name="FubonBackfill", numeric_mode="decimal")
     with conn.cursor() as cur:
         payloads = fetch_raw_rows(cur, symbol, start, end, channel="quotes")
     if not payloads:
@@ -0,0 +1,288 @@
+"""
+行情處理效能基準：以合成的 WebSocket 封包量測解碼與正規化耗時。
+
+範例：
+    python extras/tools/bench_market.py --messages 50000 decode
+    python extras/tools/bench_market.py shards --shards 1 4 --consumer-us 50
+    python extras/tools/bench_market.py numeric
+    python extras/tools/bench_market.py timestamps
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import vnpy_fubon  # noqa: F401  # 先載入套件以避開 adapters 的循環匯入
+from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer
+from vnpy_fubon.dispatch import OverflowPolicy, ShardedDispatcher
+from vnpy_fubon.json_codec import available_decoders, get_json_decoder
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.numeric import NUMERIC_MODE_DECIMAL, NUMERIC_MODE_FLOAT
+from vnpy_fubon.timestamps import TimestampParser
+
+LOGGER = logging.getLogger("vnpy_fubon.tools.bench_market")
+
+
+class _NullClient:
+    pass
+
+
+def build_book_frames(count: int, *, symbols: int = 200, depth: int = 5) -> List[str]:
+    """產生 books 頻道的合成封包（模擬 TXO 多履約價同時跳動）。"""
+
+    frames: List[str] = []
+    base_ts = 1_700_000_000_000_000
+    for index in range(count):
+        strike = 17000 + (index % symbols) * 50
+        mid = 100.0 + (index % 37) * 0.5
+        payload = {
+            "event": "data",
+            "channel": "books",
+            "data": {
+                "symbol": f"TXO{strike}K4",
+                "exchange": "TAIFEX",
+                "time": base_ts + index,
+                "bids": [
+                    {"price": round(mid - level * 0.5, 1), "size": 10 + level}
+                    for level in range(depth)
+                ],
+                "asks": [
+                    {"price": round(mid + (level + 1) * 0.5, 1), "size": 12 + level}
+                    for level in range(depth)
+                ],
+            },
+            "id": "bench",
+        }
+        frames.append(json.dumps(payload))
+    return frames
+
+
+def _time_it(func: Callable[[Any], Any], frames: Sequence[Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            func(frame)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_decode(frames: Sequence[str], repeat: int) -> List[Dict[str, Any]]:
+    """逐一量測可用的 JSON 解碼器：純解碼與完整 parse_market_events。"""
+
+    results: List[Dict[str, Any]] = []
+    for name in available_decoders():
+        decoder = get_json_decoder(name)
+        api = MarketAPI(_NullClient(), decoder=decoder)
+        decode_s = _time_it(decoder, frames, repeat)
+        parse_s = _time_it(api.parse_market_events, frames, repeat)
+        results.append(
+            {
+                "decoder": name,
+                "decode_msgs_per_s": len(frames) / decode_s if decode_s else 0.0,
+                "parse_msgs_per_s": len(frames) / parse_s if parse_s else 0.0,
+            }
+        )
+    return results
+
+
+def build_trade_frames(count: int, *, symbols: int = 400) -> List[str]:
+    """產生 trades 頻道的合成封包。"""
+
+    frames: List[str] = []
+    base_ts = 1_700_000_000_000_000
+    for index in range(count):
+        strike = 17000 + (index % symbols) * 50
+        payload = {
+            "event": "data",
+            "channel": "trades",
+            "data": {
+                "symbol": f"TXO{strike}K4",
+                "exchange": "TAIFEX",
+                "time": base_ts + index,
+                "price": 100.0 + (index % 37) * 0.5,
+                "size": 1 + index % 5,
+                "serial": index,
+            },
+        }
+        frames.append(json.dumps(payload))
+    return frames
+
+
+def bench_shards(
+    frames: Sequence[str], shard_counts: Sequence[int], *, consumer_us: float, depth: int = 5
+) -> List[Dict[str, Any]]:
+    """比較 1 與 N 個分片的正規化吞吐量；consumer_us 模擬下游每筆的阻塞耗時。"""
+
+    decoder = get_json_decoder()
+    payloads = [decoder(frame) for frame in frames]
+    normalizer = MarketEnvelopeNormalizer(gateway_name="Bench")
+    delay = consumer_us / 1_000_000
+
+    def handler(payload: Mapping[str, Any]) -> None:
+        if payload.get("channel") == "trades":
+            normalizer.normalize_trade(payload)
+        else:
+            normalizer.normalize_orderbook(payload, depth=depth)
+        if delay:
+            time.sleep(delay)
+
+    results: List[Dict[str, Any]] = []
+    for shards in shard_counts:
+        pool = ShardedDispatcher(
+            handler,
+            shards=shards,
+            maxsize=len(payloads) + 1,
+            policy=OverflowPolicy.BLOCK,
+            conflation_key=None,
+            name="bench-shard",
+        )
+        pool.start()
+        start = time.perf_counter()
+        for payload in payloads:
+            pool.submit(payload)
+        pool.stop(timeout=600)
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "shards": shards,
+                "msgs_per_s": len(payloads) / elapsed if elapsed else 0.0,
+                "errors": pool.stats()["errors"],
+            }
+        )
+    return results
+
+
+def bench_numeric(
+    book_frames: Sequence[str], trade_frames: Sequence[str], repeat: int
+) -> List[Dict[str, Any]]:
+    """逐頻道比較 decimal 與 float 數值模式的正規化吞吐量（不含 JSON 解碼）。"""
+
+    decoder = get_json_decoder()
+    books = [decoder(frame) for frame in book_frames]
+    trades = [decoder(frame) for frame in trade_frames]
+    book_data = [payload["data"] for payload in books]
+
+    results: List[Dict[str, Any]] = []
+    for mode in (NUMERIC_MODE_DECIMAL, NUMERIC_MODE_FLOAT):
+        normalizer = MarketEnvelopeNormalizer(gateway_name="Bench", numeric_mode=mode)
+        api = MarketAPI(_NullClient(), numeric_mode=mode)
+        cases = (
+            ("books/adapter", normalizer.normalize_orderbook, books),
+            ("books/market_api", api.to_tick, book_data),
+            ("trades/adapter", normalizer.normalize_trade, trades),
+        )
+        for channel, func, payloads in cases:
+            elapsed = _time_it(func, payloads, repeat)
+            results.append(
+                {
+                    "mode": mode,
+                    "channel": channel,
+                    "msgs_per_s": len(payloads) / elapsed if elapsed else 0.0,
+                }
+            )
+    return results
+
+
+def bench_timestamps(count: int, repeat: int) -> List[Dict[str, Any]]:
+    """比較時間戳解析：有/無來源格式快取（source=None 時每筆重新偵測格式）。"""
+
+    base_us = 1_700_000_000_000_000
+    samples = {
+        "epoch_us": [base_us + index for index in range(count)],
+        "iso": [
+            f"2024-01-02T09:{index % 60:02d}:{index % 59:02d}.{index % 1000:03d}+08:00"
+            for index in range(count)
+        ],
+        "compact": [
+            f"20240102{9 + index % 4:02d}{index % 60:02d}{index % 59:02d}" for index in range(count)
+        ],
+        "slash": [f"2024/01/02 09:{index % 60:02d}:{index % 59:02d}" for index in range(count)],
+    }
+    results: List[Dict[str, Any]] = []
+    for kind, values in samples.items():
+        for cached in (False, True):
+            parser = TimestampParser()
+            source = ("bench", kind) if cached else None
+            elapsed = _time_it(partial(parser.parse, source=source), values, repeat)
+            results.append(
+                {
+                    "format": kind,
+                    "source_cache": cached,
+                    "msgs_per_s": len(values) / elapsed if elapsed else 0.0,
+                    "fallbacks": parser.fallbacks,
+                }
+            )
+    return results
+
+
+def _print_rows(rows: Sequence[Dict[str, Any]]) -> None:
+    if not rows:
+        return
+    headers = list(rows[0])
+    print("  ".join(f"{header:>20}" for header in headers))
+    for row in rows:
+        cells = []
+        for header in headers:
+            value = row[header]
+            cells.append(f"{value:>20,.0f}" if isinstance(value, float) else f"{value!s:>20}")
+        print("  ".join(cells))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="行情處理效能基準")
+    parser.add_argument("--messages", type=int, default=20000, help="合成封包數量（預設 20000）")
+    parser.add_argument("--repeat", type=int, default=3, help="重複次數，取最佳值（預設 3）")
+    parser.add_argument("--log-level", default="WARNING", help="日誌層級")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("decode", help="比較 JSON 解碼器於 books 頻道的吞吐量")
+    shards_parser = sub.add_parser("shards", help="比較 1 與 N 個符號分片的正規化吞吐量")
+    shards_parser.add_argument(
+        "--shards", type=int, nargs="+", default=[1, 4], help="分片數列表（預設 1 4）"
+    )
+    shards_parser.add_argument(
+        "--consumer-us", type=float, default=0.0, help="模擬下游每筆阻塞微秒數（預設 0）"
+    )
+    sub.add_parser("numeric", help="逐頻道比較 decimal 與 float 數值模式")
+    sub.add_parser("timestamps", help="比較時間戳解析在有/無來源格式快取時的吞吐量")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+
+    if args.command == "decode":
+        frames = build_book_frames(args.messages)
+        _print_rows(bench_decode(frames, args.repeat))
+    elif args.command == "shards":
+        half = args.messages // 2
+        frames = build_book_frames(half) + build_trade_frames(args.messages - half)
+        _print_rows(bench_shards(frames, args.shards, consumer_us=args.consumer_us))
+    elif args.command == "numeric":
+        frames_per_channel = max(1, args.messages // 2)
+        _print_rows(
+            bench_numeric(
+                build_book_frames(frames_per_channel),
+                build_trade_frames(frames_per_channel),
+                args.repeat,
+            )
+        )
+    elif args.command == "timestamps":
+        _print_rows(bench_timestamps(args.messages, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,21 @@ import signal
 import sys
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+from time import perf_counter_ns
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
@@ -34,13 +46,19 @@ if str(EXTRAS_ROOT) not in sys.path:
 from adapters import FubonToVnpyAdapter, NormalizedOrderBook, NormalizedQuote, NormalizedTrade, RawEnvelope
 from clients import ClientState, FubonAPIClient, FubonCredentials, Subscription
 from storage.pg_writer import PostgresWriter, RetryPolicy, WriterConfig
+from vnpy_fubon.dispatch import OverflowPolicy, ShardedDispatcher
+from vnpy_fubon.gaps import GapBackfiller, GapEvent, SequenceGapDetector
+from vnpy_fubon.latency import LatencyTracker, ReceiveStamp, parse_warn_ms, receive_stamp
 from vnpy_fubon.logging_config import configure_logging
+from vnpy_fubon.option_chain import OptionChainIndex
 from vnpy_fubon.vnpy_compat import (
     EVENT_FUBON_MARKET_RAW,
     EVENT_TICK,
     EVENT_TRADE,
     Event,
+    OptionType,
 )
+from vnpy_fubon.ws_pool import plan_subscriptions
 
 try:  # pragma: no cover - Python 3.11 內建 tomllib
     import tomllib  # type: ignore[attr-defined]
@@ -59,6 +77,9 @@ DAY_SESSION_START = time(8, 45)
 DAY_SESSION_END = time(13, 45)
 NIGHT_SESSION_START = time(15, 0)
 NIGHT_SESSION_END = time(5, 0)
+GAP_BACKFILL_LIMIT = 500
+# 選擇權代碼去除商品代碼後：履約價 + 月份代碼（A-L 買權、M-X 賣權）+ 年份尾碼
+OPTION_SUFFIX_PATTERN = re.compile(r"^(\d+)([A-X])(\d)$")
 
 
 def determine_session(now: datetime) -> str:
@@ -224,6 +245,12 @@ class OptionTickerFetcher:
         client = self._ensure()
         return client.intraday.ticker(**params)
 
+    def sdk(self) -> Any:
+        """回傳已登入的 SDK（供回補用的 FubonGateway 共用同一個登入）。"""
+
+        self._ensure()
+        return self._sdk
+
     def close(self) -> None:
         with self._lock:
             if self._sdk is not None:
@@ -264,6 +291,7 @@ class SymbolResolver:
         env: Mapping[str, str],
         rest_client: Optional[Any] = None,
         rest_enabled: bool = False,
+        option_chain: Optional[OptionChainIndex] = None,
     ) -> None:
         self.config = config
         self.env = env
@@ -271,6 +299,9 @@ class SymbolResolver:
         self._rest_enabled = rest_enabled and rest_client is not None
         self._rest_cache: Dict[Tuple[str, str], List[Mapping[str, Any]]] = {}
         self._strike_hint: Optional[float] = None
+        # 外部提供的 option chain（例如 gateway.get_option_chain()）優先於 REST tickers。
+        self._option_chain = option_chain
+        self._rest_chains: Dict[str, OptionChainIndex] = {}
 
     @staticmethod
     def _cap_option_list(symbols: List[str], limit: int) -> List[str]:
@@ -448,28 +479,16 @@ class SymbolResolver:
         if req.variant.startswith("weekly"):
             return self._resolve_weekly(cfg, now)
         if req.variant.startswith("monthly"):
-            rest_symbols: List[str] = []
-            if self._rest_enabled:
-                rest_symbols = self._resolve_monthly_rest(req, cfg, now, req.variant)
-            if rest_symbols:
-                return rest_symbols
+            chain_symbols = self._resolve_monthly_chain(cfg, now, req.variant)
+            if chain_symbols:
+                return chain_symbols
             return self._resolve_monthly(cfg, now, req.variant)
         LOGGER.warning("options.%s 不支援變體 %s", req.base, req.variant)
         return []
 
-    def _resolve_weekly(self, cfg: Mapping[str, Any], now: datetime) -> List[str]:
-        variant = cfg.get("weekly_all") or {}
-        include_weeks = variant.get("include_weeks") or ["W1", "W2", "W3"]
-        spacing = int(cfg.get("strike_spacing", 50))
-        strikes_window = int(variant.get("strikes_window", cfg.get("strikes_window", 6)))
-        max_contracts = int(variant.get("max_contracts", cfg.get("max_weekly_contracts", 0)))
-        base_symbol = str(cfg.get("base_symbol", "TXO"))
-        call_code = str(cfg.get("call_code", "C")).upper()
-        put_code = str(cfg.get("put_code", "P")).upper()
-
-        strike_center = self._resolve_strike_center(cfg, now, spacing)
-
-        candidates: List[Tuple[Tuple[int, int, int], str]] = []
+    @staticmethod
+    def _week_offsets(include_weeks: Sequence[Any]) -> List[Tuple[int, str]]:
+        offsets: List[Tuple[int, str]] = []
         for idx, week_code in enumerate(include_weeks):
             week = str(week_code).upper().strip()
             if not week:
@@ -485,6 +504,27 @@ class SymbolResolver:
                 week = f"W{offset + 1}"
             else:
                 offset = idx
+            offsets.append((offset, week))
+        return offsets
+
+    def _resolve_weekly(self, cfg: Mapping[str, Any], now: datetime) -> List[str]:
+        chain_symbols = self._resolve_weekly_chain(cfg, now)
+        if chain_symbols:
+            return chain_symbols
+
+        variant = cfg.get("weekly_all") or {}
+        include_weeks = variant.get("include_weeks") or ["W1", "W2", "W3"]
+        spacing = int(cfg.get("strike_spacing", 50))
+        strikes_window = int(variant.get("strikes_window", cfg.get("strikes_window", 6)))
+        max_contracts = int(variant.get("max_contracts", cfg.get("max_weekly_contracts", 0)))
+        base_symbol = str(cfg.get("base_symbol", "TXO"))
+        call_code = str(cfg.get("call_code", "C")).upper()
+        put_code = str(cfg.get("put_code", "P")).upper()
+
+        strike_center = self._resolve_strike_center(cfg, now, spacing)
+
+        candidates: List[Tuple[Tuple[int, int, int], str]] = []
+        for offset, week in self._week_offsets(include_weeks):
             week_date = now + timedelta(days=offset * 7)
             year = week_date.year
             month = week_date.month
@@ -531,77 +571,116 @@ class SymbolResolver:
         ordered = [symbol for _, symbol in candidates]
         return self._cap_option_list(ordered, max_contracts)
 
-    def _resolve_monthly_rest(
-        self,
-        req: SymbolRequest,
-        cfg: Mapping[str, Any],
-        now: datetime,
-        variant: str,
-    ) -> List[str]:
-        tickers = self._fetch_option_tickers(cfg, session="REGULAR")
-        if not tickers:
-            return []
-
-        offset = 0
-        if "next" in variant:
-            offset = 1
+    # ----------------------- option chain helper ----------------------- #
 
-        target_year, target_month = _add_months(now.year, now.month, offset)
-        target_settlement = _third_wednesday(target_year, target_month).date().isoformat()
+    def _chain_for(self, cfg: Mapping[str, Any]) -> Optional[OptionChainIndex]:
+        """取得 option chain：優先使用外部索引，否則以 REST tickers 建立一次並快取。"""
 
-        spacing = int(cfg.get("strike_spacing", 50))
-        strikes_window = int(cfg.get("strikes_window", 8))
-        strike_center = self._resolve_strike_center(cfg, now, spacing)
+        if self._option_chain is not None:
+            return self._option_chain
+        if not self._rest_enabled:
+            return None
+        base_symbol = str(cfg.get("base_symbol", "TXO")).upper()
+        chain = self._rest_chains.get(base_symbol)
+        if chain is None:
+            chain = self._build_chain_from_tickers(base_symbol, self._fetch_option_tickers(cfg, session="REGULAR"))
+            self._rest_chains[base_symbol] = chain
+        return chain
 
-        pattern = re.compile(r"^(TXO)(\d+)([A-Z])(\d)$")
-        strikes: Dict[int, Dict[str, str]] = {}
+    @staticmethod
+    def _build_chain_from_tickers(base_symbol: str, tickers: Iterable[Mapping[str, Any]]) -> OptionChainIndex:
+        chain: OptionChainIndex[str] = OptionChainIndex()
         for item in tickers:
-            if item.get("settlementDate") != target_settlement:
+            symbol = str(item.get("symbol") or "").upper()
+            settlement = str(item.get("settlementDate") or "")[:10]
+            if not symbol.startswith(base_symbol) or not settlement:
                 continue
-            symbol = str(item.get("symbol") or "")
-            match = pattern.match(symbol)
+            match = OPTION_SUFFIX_PATTERN.match(symbol[len(base_symbol) :])
             if not match:
                 continue
-            strike = int(match.group(2))
-            side_code = match.group(3)
-            if side_code in {"L", "C"}:
-                side = "call"
-            elif side_code in {"X", "P"}:
-                side = "put"
-            else:
+            try:
+                expiry = date.fromisoformat(settlement)
+            except ValueError:
                 continue
-            bucket = strikes.setdefault(strike, {})
-            bucket[side] = symbol
+            # 月份代碼 A-L 為買權、M-X 為賣權。
+            option_type = OptionType.CALL if match.group(2) <= "L" else OptionType.PUT
+            chain.add(base_symbol, expiry, int(match.group(1)), option_type, symbol)
+        return chain
 
-        if not strikes:
+    @staticmethod
+    def _chain_candidates(
+        chain: OptionChainIndex,
+        product: str,
+        expiry: date,
+        center: float,
+        window: int,
+        offset: int = 0,
+    ) -> List[Tuple[Tuple[int, float, int], str]]:
+        candidates: List[Tuple[Tuple[int, float, int], str]] = []
+        for strike in chain.neighbours(product, expiry, center, window):
+            delta = strike - center
+            priority = (offset, abs(delta), 0 if delta >= 0 else 1)
+            for option_type in (OptionType.CALL, OptionType.PUT):
+                item = chain.get(product, expiry, strike, option_type)
+                if item is not None:
+                    candidates.append((priority, str(getattr(item, "symbol", item))))
+        return candidates
+
+    def _resolve_monthly_chain(self, cfg: Mapping[str, Any], now: datetime, variant: str) -> List[str]:
+        chain = self._chain_for(cfg)
+        if chain is None:
             return []
 
+        offset = 1 if "next" in variant else 0
+        target_year, target_month = _add_months(now.year, now.month, offset)
+        expiry = _third_wednesday(target_year, target_month).date()
+
+        spacing = int(cfg.get("strike_spacing", 50))
+        strikes_window = int(cfg.get("strikes_window", 8))
         max_contracts = int(cfg.get("max_monthly_contracts", 0))
-        desired: List[str] = []
-        for delta in range(-strikes_window, strikes_window + 1):
-            strike = strike_center + delta * spacing
-            bucket = strikes.get(strike)
-            if not bucket:
+        base_symbol = str(cfg.get("base_symbol", "TXO")).upper()
+        strike_center = self._resolve_strike_center(cfg, now, spacing)
+
+        candidates = self._chain_candidates(chain, base_symbol, expiry, strike_center, strikes_window)
+        candidates.sort(key=lambda item: item[0])
+        return self._cap_option_list([symbol for _, symbol in candidates], max_contracts)
+
+    def _resolve_weekly_chain(self, cfg: Mapping[str, Any], now: datetime) -> List[str]:
+        """
+        以 option chain 中實際掛牌的週選到期日解析 W1/W2...（排除月選結算日）。
+        週選若為獨立商品代碼（如 TX1/TX2），可於 weekly_products 指定。
+        """
+
+        chain = self._chain_for(cfg)
+        if chain is None:
+            return []
+
+        variant = cfg.get("weekly_all") or {}
+        include_weeks = variant.get("include_weeks") or ["W1", "W2", "W3"]
+        spacing = int(cfg.get("strike_spacing", 50))
+        strikes_window = int(variant.get("strikes_window", cfg.get("strikes_window", 6)))
+        max_contracts = int(variant.get("max_contracts", cfg.get("max_weekly_contracts", 0)))
+        products = [str(item).upper() for item in cfg.get("weekly_products") or [cfg.get("base_symbol", "TXO")]]
+        strike_center = self._resolve_strike_center(cfg, now, spacing)
+
+        today = now.astimezone(TAIWAN_TZ).date()
+        expiries = sorted(
+            {
+                (expiry, product)
+                for product in products
+                for expiry in chain.expiries(product, after=today)
+                if expiry != _third_wednesday(expiry.year, expiry.month).date()
+            }
+        )
+        candidates: List[Tuple[Tuple[int, float, int], str]] = []
+        for offset, _week in self._week_offsets(include_weeks):
+            if offset >= len(expiries):
                 continue
-            if "call" in bucket:
-                desired.append(bucket["call"])
-            if "put" in bucket:
-                desired.append(bucket["put"])
-
-        if desired:
-            return self._cap_option_list(desired, max_contracts)
-
-        # Fallback to closest strikes when configured window not available
-        sorted_strikes = sorted(strikes.keys(), key=lambda value: (abs(value - strike_center), value))
-        for strike in sorted_strikes:
-            bucket = strikes[strike]
-            if "call" in bucket:
-                desired.append(bucket["call"])
-            if "put" in bucket:
-                desired.append(bucket["put"])
-            if len(desired) >= (strikes_window * 2 + 2):
-                break
-        return self._cap_option_list(desired, max_contracts)
+            expiry, product = expiries[offset]
+            candidates.extend(self._chain_candidates(chain, product, expiry, strike_center, strikes_window, offset))
+
+        candidates.sort(key=lambda item: item[0])
+        return self._cap_option_list([symbol for _, symbol in candidates], max_contracts)
 
     def _fetch_option_tickers(self, cfg: Mapping[str, Any], *, session: str) -> List[Mapping[str, Any]]:
         if not self._rest_enabled or self._rest_client is None:
@@ -703,7 +782,8 @@ async def main_async(args: argparse.Namespace) -> None:
         retry=retry_policy,
     )
 
-    adapter = FubonToVnpyAdapter(gateway_name="FubonIngest")
+    # 入庫路徑固定使用 Decimal，不受 FUBON_NUMERIC_MODE 影響。
+    adapter = FubonToVnpyAdapter(gateway_name="FubonIngest", numeric_mode="decimal")
     event_engine = SimpleEventEngine()
 
     raw_symbol_expr = args.symbols or os.environ.get("SYMBOL_SET")
@@ -727,6 +807,91 @@ async def main_async(args: argparse.Namespace) -> None:
     )
     symbol_list = resolver.resolve(parse_symbol_tokens(tokens))
 
+    # 即時序號缺口偵測：發現缺口即寫入 reconcile_log，可選擇背景透過 REST 回補 trades。
+    ingest_cfg = pipeline_cfg.get("ingest", {})
+    gap_detector: Optional[SequenceGapDetector] = None
+    gap_backfiller: Optional[GapBackfiller] = None
+    backfill_fetcher: Optional[OptionTickerFetcher] = None
+    reconcile_ids: Dict[GapEvent, int] = {}
+    if str(os.environ.get("GAP_DETECTION", ingest_cfg.get("gap_detection", True))).strip().lower() in {"1", "true", "yes"}:
+        gap_detector = SequenceGapDetector()
+    backfill_flag = str(os.environ.get("GAP_BACKFILL", ingest_cfg.get("gap_backfill", False))).strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    backfill_gateway: Optional[Any] = None
+
+    def _fetch_gap_trades(gap: GapEvent) -> List[NormalizedTrade]:
+        """於回補執行緒執行：以 fetch_trades_history 取回缺漏成交並落地。"""
+
+        nonlocal backfill_gateway
+        if backfill_gateway is None:
+            from vnpy_fubon.gateway import FubonGateway
+
+            backfill_gateway = FubonGateway(event_engine, "FubonBackfill", client=backfill_fetcher.sdk())
+        trades = backfill_gateway.fetch_trades_history(
+            gap.symbol,
+            session="afterhours" if current_session == "night" else None,
+            offset=gap.start_seq - 1,
+            limit=min(gap.missing, GAP_BACKFILL_LIMIT),
+        )
+        recovered: List[NormalizedTrade] = []
+        for trade in trades:
+            try:
+                serial = int(trade.tradeid)
+            except (TypeError, ValueError):
+                continue
+            if not gap.start_seq <= serial <= gap.end_seq:
+                continue
+            recovered.append(
+                adapter.normalize_trade(
+                    {
+                        "channel": "trades",
+                        "symbol": gap.symbol,
+                        "exchange": getattr(trade.exchange, "value", trade.exchange),
+                        "serial": serial,
+                        "price": str(trade.price),
+                        "size": str(trade.volume),
+                        "side": getattr(trade.direction, "value", trade.direction),
+                        "time": trade.datetime.isoformat(),
+                    }
+                )
+            )
+        writer.write_trades(recovered)
+        return recovered
+
+    def _on_gap_backfilled(gap: GapEvent, recovered: Optional[List[NormalizedTrade]], error: Optional[BaseException]) -> None:
+        reconcile_id = reconcile_ids.pop(gap, None)
+        if reconcile_id is None:
+            return
+        if error is not None:
+            writer.update_reconcile(reconcile_id, "pending", notes=f"即時回補失敗：{error}")
+            return
+        count = len(recovered or [])
+        status = "backfilled" if count >= gap.missing else "pending"
+        writer.update_reconcile(reconcile_id, status, notes=f"即時回補 {count}/{gap.missing} 筆")
+
+    if gap_detector is not None and backfill_flag:
+        backfill_fetcher = ticker_fetcher or OptionTickerFetcher(
+            credentials, mode=os.environ.get("FUBON_MARKET_MODE", "Normal") or "Normal"
+        )
+        gap_backfiller = GapBackfiller(
+            _fetch_gap_trades,
+            on_done=_on_gap_backfilled,
+            name="fubon-ingest-gap-backfill",
+            logger=LOGGER,
+        )
+        gap_backfiller.start()
+    LOGGER.info("序號缺口偵測：%s（回補：%s）", gap_detector is not None, gap_backfiller is not None)
+
+    # 延遲量測：收到封包 → 正規化 → DB commit → 事件發布，另記交易所時間至收到的時差。
+    latency_tracker = LatencyTracker(
+        warn_ms=parse_warn_ms(os.environ.get("LATENCY_WARN_MS", ingest_cfg.get("latency_warn_ms"))),
+        summary_interval=float(os.environ.get("LATENCY_LOG_INTERVAL", ingest_cfg.get("latency_log_interval", 60)) or 0),
+        logger=LOGGER,
+    )
+
     default_channels = ["trades", "orderbook"]
     channel_expr = args.channels or os.environ.get("CHANNELS")
     if channel_expr:
@@ -753,9 +918,15 @@ async def main_async(args: argparse.Namespace) -> None:
         symbol: Subscription(symbol=symbol, channels=channels, depth=depth) for symbol in symbol_list
     }
     stop_event = asyncio.Event()
-    subscribed_symbols: set[str] = set()
     session_lock = asyncio.Lock()
     current_session: Optional[str] = None
+    # 換盤時先訂閱新盤別再退訂舊盤別，並可於開盤前預先訂閱以縮短盲區。
+    session_overlap = str(os.environ.get("SESSION_OVERLAP", ingest_cfg.get("session_overlap", True))).strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    session_prewarm = max(0.0, float(os.environ.get("SESSION_PREWARM_SEC", ingest_cfg.get("session_prewarm_sec", 30))))
 
     async def _persist(
         *,
@@ -772,31 +943,121 @@ async def main_async(args: argparse.Namespace) -> None:
             quotes=quotes,
         )
 
-    async def handle_message(payload: Mapping[str, Any]) -> None:
+    def normalize_payload(payload: Mapping[str, Any]) -> Tuple[str, Any]:
+        """正規化單筆 WS 封包，回傳 (種類, 正規化結果)；純 CPU 工作，可於分片執行緒執行。"""
+
         channel = str(payload.get("channel") or payload.get("type") or "").lower()
+        if "trade" in channel:
+            return "trade", adapter.normalize_trade(payload)
+        if any(tag in channel for tag in ("book", "depth", "orderbook")):
+            return "book", adapter.normalize_orderbook(payload, depth=depth)
+        if "quote" in channel:
+            return "quote", adapter.normalize_quote(payload)
+        return "raw", adapter.build_raw_envelope(payload, default_channel=channel or "misc")
+
+    async def record_gap(symbol: str, channel: str, seq: Optional[int], ts: Optional[datetime]) -> None:
+        if gap_detector is None:
+            return
+        gap = gap_detector.observe(symbol, channel, seq, ts)
+        if gap is None:
+            return
+        LOGGER.warning("序號缺口 %s %s：缺少 %s-%s（%s 筆）", symbol, channel, gap.start_seq, gap.end_seq, gap.missing)
+        ids = await asyncio.to_thread(writer.write_reconcile, [gap], notes="即時偵測")
+        if gap_backfiller is None or channel != "trades":
+            return
+        reconcile_ids[gap] = ids[0]
+        if not gap_backfiller.submit(gap):
+            # 佇列已滿：保留 pending 狀態，交由 backfill_gap.py 離線處理。
+            reconcile_ids.pop(gap, None)
+            LOGGER.warning("回補佇列已滿，%s %s-%s 留待離線回補", symbol, gap.start_seq, gap.end_seq)
+
+    async def publish_normalized(kind: str, result: Any, received: ReceiveStamp, normalized_ns: int) -> None:
+        raw = result if kind == "raw" else result.raw
+        raw.latency_ms = latency_tracker.record_skew(raw.channel, received[1], raw.event_ts_utc)
+        if kind == "trade":
+            result.trade.extra["latency_ms"] = raw.latency_ms
+            await record_gap(raw.symbol, "trades", raw.seq, raw.event_ts_utc)
+            await _persist(raw=[raw], trades=[result])
+        elif kind == "book":
+            result.tick.extra["latency_ms"] = raw.latency_ms
+            await record_gap(raw.symbol, "books", raw.seq, raw.event_ts_utc)
+            await _persist(raw=[raw], orderbooks=[result])
+        elif kind == "quote":
+            result.tick.extra["latency_ms"] = raw.latency_ms
+            await _persist(raw=[raw], quotes=[result])
+        else:
+            await _persist(raw=[raw])
+        committed_ns = perf_counter_ns()
+        event_engine.put(Event(EVENT_FUBON_MARKET_RAW, raw))
+        if kind == "trade":
+            event_engine.put(Event(EVENT_TRADE + result.trade.symbol, result.trade))
+        elif kind in ("book", "quote"):
+            event_engine.put(Event(EVENT_TICK + result.tick.symbol, result.tick))
+        latency_tracker.observe(
+            raw.channel,
+            received,
+            normalized_ns=normalized_ns,
+            committed_ns=committed_ns,
+            published_ns=perf_counter_ns(),
+        )
+
+    # 依符號雜湊分片：同一符號固定落在同一執行緒，保持逐符號順序。
+    normalize_shards = max(
+        1,
+        int(
+            os.environ.get(
+                "NORMALIZE_SHARDS",
+                pipeline_cfg.get("ingest", {}).get("normalize_shards", 1),
+            )
+        ),
+    )
+    loop = asyncio.get_running_loop()
+
+    def _normalize_on_shard(payload: Mapping[str, Any], received: ReceiveStamp) -> None:
         try:
-            if "trade" in channel:
-                trade = adapter.normalize_trade(payload)
-                await _persist(raw=[trade.raw], trades=[trade])
-                event_engine.put(Event(EVENT_FUBON_MARKET_RAW, trade.raw))
-                event_engine.put(Event(EVENT_TRADE + trade.trade.symbol, trade.trade))
-            elif any(tag in channel for tag in ("book", "depth", "orderbook")):
-                book = adapter.normalize_orderbook(payload, depth=depth)
-                await _persist(raw=[book.raw], orderbooks=[book])
-                event_engine.put(Event(EVENT_FUBON_MARKET_RAW, book.raw))
-                event_engine.put(Event(EVENT_TICK + book.tick.symbol, book.tick))
-            elif "quote" in channel:
-                quote = adapter.normalize_quote(payload)
-                await _persist(raw=[quote.raw], quotes=[quote])
-                event_engine.put(Event(EVENT_FUBON_MARKET_RAW, quote.raw))
-                event_engine.put(Event(EVENT_TICK + quote.tick.symbol, quote.tick))
-            else:
-                raw = adapter.build_raw_envelope(payload, default_channel=channel or "misc")
-                await _persist(raw=[raw])
-                event_engine.put(Event(EVENT_FUBON_MARKET_RAW, raw))
+            kind, result = normalize_payload(payload)
+        except Exception as exc:  # pragma: no cover - defensively log runtime errors
+            LOGGER.exception("處理 WS 訊息失敗 payload=%s", payload, exc_info=exc)
+            return
+        # 等待事件迴圈寫入並發布完成再處理下一筆：保持分片內順序，BLOCK 也能回壓到 SDK 執行緒。
+        future = asyncio.run_coroutine_threadsafe(
+            publish_normalized(kind, result, received, perf_counter_ns()), loop
+        )
+        try:
+            future.result()
+        except Exception as exc:  # pragma: no cover - defensively log runtime errors
+            LOGGER.exception("發布 WS 訊息失敗 payload=%s", payload, exc_info=exc)
+
+    normalizer_pool: Optional[ShardedDispatcher] = None
+    if normalize_shards > 1:
+        normalizer_pool = ShardedDispatcher(
+            _normalize_on_shard,
+            shards=normalize_shards,
+            policy=OverflowPolicy.BLOCK,
+            conflation_key=None,
+            stamp=receive_stamp,
+            name="fubon-ingest-normalize",
+            logger=LOGGER,
+        )
+        normalizer_pool.start()
+        LOGGER.info("正規化分片數：%s", normalize_shards)
+
+    async def handle_message(payload: Mapping[str, Any]) -> None:
+        received = receive_stamp()
+        try:
+            kind, result = normalize_payload(payload)
+            await publish_normalized(kind, result, received, perf_counter_ns())
         except Exception as exc:  # pragma: no cover - defensively log runtime errors
             LOGGER.exception("處理 WS 訊息失敗 payload=%s", payload, exc_info=exc)
 
+    def on_message(payload: Mapping[str, Any]) -> Optional[Awaitable[None]]:
+        # 分片模式直接在 SDK 回呼執行緒排入佇列；佇列滿時阻塞的是 SDK 執行緒而非事件迴圈，
+        # 否則分片等待事件迴圈發布時會與阻塞中的 submit 互相等待。
+        if normalizer_pool is not None:
+            normalizer_pool.submit(payload)
+            return None
+        return handle_message(payload)
+
     def on_state_change(state: ClientState) -> None:
         LOGGER.info("串流狀態切換：%s", state.name)
 
@@ -804,35 +1065,60 @@ async def main_async(args: argparse.Namespace) -> None:
     client = FubonAPIClient(
         credentials=credentials,
         mode=market_mode,
-        on_message=handle_message,
+        on_message=on_message,
         on_state_change=on_state_change,
     )
 
-    # Session management helpers will handle subscribe/unsubscribe.
-    async def apply_session(session: str) -> None:
+    def session_targets(session: str) -> Dict[Tuple[str, Optional[bool]], Subscription]:
+        if session == "idle":
+            return {}
+        after_hours = session == "night"
+        return {
+            (symbol, after_hours): Subscription(
+                symbol=symbol, channels=sub.channels, depth=sub.depth, after_hours=after_hours
+            )
+            for symbol, sub in subscriptions.items()
+        }
+
+    async def apply_session(session: str, *, prewarm: bool = False) -> None:
+        """依目前與目標訂閱集合的差異換盤；prewarm 僅預先訂閱新盤別，不退訂、不切換盤別。"""
+
         nonlocal current_session
         async with session_lock:
             if session == current_session:
                 return
-            if session == "idle":
-                if subscribed_symbols:
-                    LOGGER.info("Switching to idle window; cancelling all subscriptions.")
-                    for symbol in list(subscribed_symbols):
-                        await client.unsubscribe(symbol)
-                    subscribed_symbols.clear()
-                current_session = session
+            targets = session_targets(session)
+            plan = plan_subscriptions(client.subscriptions, targets)
+            started = perf_counter_ns()
+            if prewarm:
+                if plan.subscribe:
+                    requests = await client.subscribe_many([targets[key] for key in plan.subscribe])
+                    LOGGER.info("預先訂閱 %s 盤：%s 檔，%s 次請求", session, len(plan.subscribe), requests)
                 return
-            after_hours = session == "night"
-            LOGGER.info("Switching to %s session (afterHours=%s)", "night" if after_hours else "day", after_hours)
-            if subscribed_symbols:
-                for symbol in list(subscribed_symbols):
-                    await client.unsubscribe(symbol)
-                subscribed_symbols.clear()
-            for symbol, sub in subscriptions.items():
-                sub.after_hours = after_hours
-                await client.subscribe(sub)
-                subscribed_symbols.add(symbol)
+            if gap_detector is not None:
+                # 換盤後序號重新起算，清除上一盤的追蹤狀態。
+                gap_detector.reset()
+            LOGGER.info(
+                "Switching to %s session: +%s -%s (kept %s)",
+                session,
+                len(plan.subscribe),
+                len(plan.unsubscribe),
+                len(plan.keep),
+            )
+            requests = 0
+            if session_overlap:
+                requests += await client.subscribe_many([targets[key] for key in plan.subscribe])
+                requests += await client.unsubscribe_many(plan.unsubscribe)
+            else:
+                requests += await client.unsubscribe_many(plan.unsubscribe)
+                requests += await client.subscribe_many([targets[key] for key in plan.subscribe])
             current_session = session
+            LOGGER.info(
+                "換盤完成：%s 盤，%s 次請求，耗時 %.1f ms",
+                session,
+                requests,
+                (perf_counter_ns() - started) / 1_000_000,
+            )
 
     async def session_watcher() -> None:
         while not stop_event.is_set():
@@ -840,7 +1126,19 @@ async def main_async(args: argparse.Namespace) -> None:
             session = determine_session(now_local)
             await apply_session(session)
             boundary = next_session_boundary(now_local)
+            upcoming = determine_session(boundary)
             timeout = max((boundary - now_local).total_seconds(), 60.0)
+            if session_prewarm and upcoming not in {"idle", session}:
+                # 新盤別開盤前先行訂閱，開盤時只需退訂舊盤別。
+                lead = (boundary - now_local).total_seconds() - session_prewarm
+                if lead > 0:
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), timeout=lead)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                await apply_session(upcoming, prewarm=True)
+                timeout = max((boundary - datetime.now(TAIWAN_TZ)).total_seconds(), 1.0)
             try:
                 await asyncio.wait_for(stop_event.wait(), timeout=timeout)
                 break
@@ -878,9 +1176,15 @@ async def main_async(args: argparse.Namespace) -> None:
             with contextlib.suppress(asyncio.CancelledError):
                 await session_task
         await client.stop()
+        if normalizer_pool is not None:
+            await asyncio.to_thread(normalizer_pool.stop)
+        if gap_backfiller is not None:
+            await asyncio.to_thread(gap_backfiller.stop)
         writer.close()
         if ticker_fetcher:
             ticker_fetcher.close()
+        if backfill_fetcher is not None and backfill_fetcher is not ticker_fetcher:
+            backfill_fetcher.close()
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
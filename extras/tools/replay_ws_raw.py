@@ -5,7 +5,6 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import os
 import sys
@@ -20,6 +19,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from adapters import FubonToVnpyAdapter, NormalizedOrderBook, RawEnvelope
 from storage.pg_writer import PostgresWriter, WriterConfig
+from vnpy_fubon.json_codec import decode_json
 
 try:  # pragma: no cover
     import psycopg
@@ -91,7 +91,7 @@ def fetch_market_raw(cur, symbol: str, start: datetime, end: datetime, channel:
     for row in cur.fetchall():
         payload = row[2]
         if isinstance(payload, str):
-            payload = json.loads(payload)
+            payload = decode_json(payload)
         rows.append(
             {
                 "id": row[0],
@@ -159,7 +159,7 @@ def replay(
     batch_size: int,
 ) -> ReplayResult:
     conn = connect_pg(dsn)
-    adapter = FubonToVnpyAdapter(gateway_name="FubonReplay")
+    adapter = FubonToVnpyAdapter(gateway_name="FubonReplay", numeric_mode="decimal")
     writer: Optional[PostgresWriter] = None
     if apply_changes:
         writer = PostgresWriter(WriterConfig(dsn=dsn, schema=os.environ.get("PG_SCHEMA", "public"), batch_size=batch_size))
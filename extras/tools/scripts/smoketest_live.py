@@ -52,7 +52,13 @@ class EventRecorder:
     def _on_raw(self, event: Event) -> None:
         self.counts["raw"] += 1
         if self._raw_file:
-            json.dump({"timestamp": time.time(), "payload": event.data}, self._raw_file, ensure_ascii=False)
+            payload = event.data.to_dict() if hasattr(event.data, "to_dict") else event.data
+            json.dump(
+                {"timestamp": time.time(), "payload": payload},
+                self._raw_file,
+                ensure_ascii=False,
+                default=str,
+            )
             self._raw_file.write("\n")
             self._raw_file.flush()
 
@@ -0,0 +1,116 @@
+import json
+from datetime import datetime, time, timedelta, timezone
+
+from vnpy_fubon.bars import BarAggregator, parse_bar_windows
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.vnpy_compat import EVENT_FUBON_BAR, Exchange
+
+TPE = timezone(timedelta(hours=8))
+SESSIONS = ((time(8, 45), time(13, 45)), (time(15, 0), time(5, 0)))
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def _aggregator(windows, published):
+    return BarAggregator(
+        published.append, sessions=SESSIONS, tz=TPE, windows=windows, close_check_interval=0
+    )
+
+
+def test_bars_anchor_to_session_start_and_close_on_next_bucket():
+    published = []
+    aggregator = _aggregator((1, 60), published)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 2, 8, 45, 10, tzinfo=TPE), 100, 1)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 2, 8, 45, 50, tzinfo=TPE), 102, 2)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 2, 8, 46, 5, tzinfo=TPE), 99, 1)
+
+    assert len(published) == 1
+    bar = published[0]
+    assert bar.datetime == datetime(2024, 1, 2, 8, 45, tzinfo=TPE)
+    assert (bar.open_price, bar.high_price, bar.low_price, bar.close_price, bar.volume) == (
+        100,
+        102,
+        100,
+        102,
+        3,
+    )
+    assert bar.extra["window"] == 1 and bar.extra["session"] == "day"
+
+    # A late trade for the closed minute must not resurrect it.
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 2, 8, 45, 59, tzinfo=TPE), 98, 1)
+    assert aggregator.stats()["late"] == 1
+
+    closed = aggregator.close_due(datetime(2024, 1, 2, 9, 45, tzinfo=TPE))
+    assert [(bar.extra["window"], bar.datetime.time()) for bar in closed] == [
+        (60, time(8, 45)),
+        (1, time(8, 46)),
+    ]
+    assert closed[0].volume == 5  # the late 1m trade still belongs to the open 60m bar
+
+
+def test_night_session_spans_midnight_and_last_bucket_is_truncated():
+    published = []
+    aggregator = _aggregator((60,), published)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 2, 23, 59, tzinfo=TPE), 100, 1)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 3, 0, 1, tzinfo=TPE), 101, 1)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 3, 5, 0, tzinfo=TPE), 102, 1)
+    aggregator.on_trade("TXFA4", Exchange.CFE, datetime(2024, 1, 3, 14, 0, tzinfo=TPE), 103, 1)
+
+    assert [bar.datetime for bar in published] == [
+        datetime(2024, 1, 2, 23, 0, tzinfo=TPE),
+        datetime(2024, 1, 3, 0, 0, tzinfo=TPE),
+    ]
+    assert all(bar.extra["session"] == "night" for bar in published)
+    stats = aggregator.stats()
+    assert stats["out_of_session"] == 1 and stats["open_bars"] == 1
+    assert aggregator.close_due(datetime(2024, 1, 3, 5, 0, tzinfo=TPE))[0].datetime.hour == 4
+
+
+def test_parse_bar_windows():
+    assert parse_bar_windows("60, 1m,5,bad,0") == (1, 5, 60)
+    assert parse_bar_windows(None) == ()
+
+
+def test_gateway_builds_bars_from_trades_without_raw_listeners(monkeypatch):
+    monkeypatch.setenv("FUBON_BAR_INTERVALS", "1")
+    monkeypatch.setenv("FUBON_EMIT_RAW", "never")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._start_bar_aggregation()
+    try:
+        for second, price in ((1, 100), (30, 105), (61, 101)):
+            stamp = datetime(2024, 1, 2, 9, 0, tzinfo=TPE) + timedelta(seconds=second)
+            gateway._handle_ws_message(
+                json.dumps(
+                    {
+                        "channel": "trades",
+                        "data": {
+                            "symbol": "TXFA4",
+                            "price": price,
+                            "size": 1,
+                            "time": stamp.isoformat(),
+                        },
+                    }
+                )
+            )
+    finally:
+        gateway._stop_bar_aggregation()
+    bars = [event.data for event in engine.events if event.type == EVENT_FUBON_BAR]
+    assert len(bars) == 1
+    assert bars[0].high_price == 105 and bars[0].volume == 2
+    per_symbol = [
+        event.data for event in engine.events if event.type == EVENT_FUBON_BAR + bars[0].vt_symbol
+    ]
+    assert per_symbol == bars
@@ -0,0 +1,60 @@
+import json
+
+from vnpy_fubon.conflation import TickConflator
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.vnpy_compat import EVENT_FUBON_MARKET_RAW, EVENT_TICK
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def test_conflator_keeps_latest_per_key_and_counts_coalesced():
+    published = []
+    conflator = TickConflator(lambda tick, raw: published.append(tick), interval=0)
+    conflator.offer("A", 1)
+    conflator.offer("B", 1)
+    conflator.offer("A", 2)
+    assert conflator.flush() == 2
+    assert published == [2, 1]
+    stats = conflator.stats()
+    assert stats["received"] == 3
+    assert stats["coalesced"] == 1
+    assert stats["published"] == 2
+    assert conflator.flush() == 0
+
+
+def test_gateway_conflates_books_until_flushed(monkeypatch):
+    monkeypatch.setenv("FUBON_BOOK_CONFLATION", "1")
+    monkeypatch.setenv("FUBON_BOOK_CONFLATION_INTERVAL_MS", "0")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._start_book_conflation()
+    for price in (100, 101, 102):
+        gateway._handle_ws_message(
+            json.dumps({"channel": "books", "data": {"symbol": "TXFA4", "bid_price": price}})
+        )
+    gateway._handle_ws_message(
+        json.dumps({"channel": "trades", "data": {"symbol": "TXFA4", "price": 1, "size": 1}})
+    )
+    assert not [event for event in engine.events if event.type == EVENT_TICK]
+    assert len(engine.events) == 1  # the trade raw event is not conflated
+
+    assert gateway.flush_conflated_ticks() == 1
+    ticks = [event.data for event in engine.events if event.type == EVENT_TICK]
+    assert len(ticks) == 1
+    assert ticks[0].bid_price_1 == 102
+    raw = [event.data for event in engine.events if event.type == EVENT_FUBON_MARKET_RAW]
+    assert raw[-1]["tick"] is ticks[0]
+    assert gateway.get_conflation_stats()["coalesced"] == 2
+    gateway._stop_book_conflation()
@@ -0,0 +1,112 @@
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+
+from vnpy_fubon.contract_cache import ContractCache, diff_contracts, trading_day_for
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.timestamps import TAIPEI_TZ
+from vnpy_fubon.vnpy_compat import ContractData, Exchange, Product
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def _record(symbol: str, pricetick: float = 1.0, extra=None):
+    contract = ContractData(
+        gateway_name="FUBON",
+        symbol=symbol,
+        exchange=Exchange.CFE,
+        name=symbol,
+        product=Product.FUTURES,
+        size=200,
+        pricetick=pricetick,
+    )
+    if extra is not None:
+        contract.extra = extra
+    return contract, symbol, "TAIFEX"
+
+
+def test_trading_day_rolls_at_night_session_and_weekend():
+    assert (
+        trading_day_for(datetime(2024, 6, 14, 14, 59, tzinfo=TAIPEI_TZ)).isoformat() == "2024-06-14"
+    )
+    assert (
+        trading_day_for(datetime(2024, 6, 14, 16, 0, tzinfo=TAIPEI_TZ)).isoformat() == "2024-06-17"
+    )
+    assert (
+        trading_day_for(datetime(2024, 6, 15, 3, 0, tzinfo=TAIPEI_TZ)).isoformat() == "2024-06-17"
+    )
+
+
+def test_cache_round_trip_and_staleness(tmp_path):
+    day = trading_day_for(datetime(2024, 6, 14, 9, 0, tzinfo=TAIPEI_TZ))
+    cache = ContractCache(tmp_path / "contracts.sqlite3")
+    assert cache.load(day, "FUBON") is None
+    assert cache.save(day, [_record("TXFF4"), _record("MXFF4")]) == 2
+
+    loaded = cache.load(day, "FUBON")
+    assert sorted(contract.vt_symbol for contract, _, _ in loaded) == ["MXFF4.CFE", "TXFF4.CFE"]
+    assert diff_contracts(loaded, [_record("TXFF4"), _record("MXFF4")]).empty
+    assert (
+        cache.load(trading_day_for(datetime(2024, 6, 14, 15, 0, tzinfo=TAIPEI_TZ)), "FUBON") is None
+    )
+    assert ContractCache(cache.path, version=cache.version + 1).load(day, "FUBON") is None
+
+
+def test_diff_ignores_extra_values_changed_by_the_cache(tmp_path):
+    day = trading_day_for(datetime(2024, 6, 14, 9, 0, tzinfo=TAIPEI_TZ))
+    extra = {"tick_size": Decimal("0.5"), "listed": date(2024, 5, 16), "sessions": ("day", "night")}
+    cache = ContractCache(tmp_path / "contracts.sqlite3")
+    cache.save(day, [_record("TXFF4", extra=extra)])
+
+    loaded = cache.load(day, "FUBON")
+    assert loaded[0][0].extra == {
+        "tick_size": "0.5",
+        "listed": "2024-05-16",
+        "sessions": ["day", "night"],
+    }
+    assert diff_contracts(loaded, [_record("TXFF4", extra=dict(extra))]).empty
+    assert diff_contracts(
+        loaded, [_record("TXFF4", extra={**extra, "tick_size": Decimal("1")})]
+    ).changed == ("TXFF4.CFE",)
+
+
+def test_gateway_publishes_cache_then_only_changes(tmp_path, monkeypatch):
+    cache = ContractCache(tmp_path / "contracts.sqlite3")
+    cache.save(trading_day_for(), [_record("TXFF4"), _record("MXFF4"), _record("TXFE4")])
+    monkeypatch.setenv("FUBON_CONTRACT_CACHE", str(cache.path))
+
+    released = threading.Event()
+    fresh = [_record("TXFF4"), _record("MXFF4", pricetick=0.5), _record("TXFG4")]
+
+    def fetch():
+        released.wait(timeout=5)
+        return fresh
+
+    gateway = FubonGateway(RecordingEventEngine())
+    monkeypatch.setattr(gateway, "_fetch_contracts_from_rest", fetch)
+    published = []
+    monkeypatch.setattr(
+        gateway, "on_contract", lambda contract: published.append(contract.vt_symbol)
+    )
+
+    gateway._configure_contract_cache()
+    gateway._load_and_publish_contracts()
+    assert sorted(published) == ["MXFF4.CFE", "TXFE4.CFE", "TXFF4.CFE"]
+
+    published.clear()
+    released.set()
+    gateway._contract_refresh_thread.join(timeout=5)
+    assert sorted(published) == ["MXFF4.CFE", "TXFG4.CFE"]
+    assert sorted(gateway.contracts) == ["MXFF4.CFE", "TXFF4.CFE", "TXFG4.CFE"]
+    assert gateway.contracts["MXFF4.CFE"].pricetick == 0.5
+    assert sorted(contract.symbol for contract, _, _ in cache.load(trading_day_for(), "FUBON")) == [
+        "MXFF4",
+        "TXFF4",
+        "TXFG4",
+    ]
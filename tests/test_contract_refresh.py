@@ -0,0 +1,178 @@
+from datetime import date
+from decimal import Decimal
+
+from vnpy_fubon.contract_cache import ContractCache, trading_day_for
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.vnpy_compat import ContractData, Exchange, Product
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def _record(symbol: str, name: str = ""):
+    contract = ContractData(
+        gateway_name="FUBON",
+        symbol=symbol,
+        exchange=Exchange.CFE,
+        name=name or symbol,
+        product=Product.OPTION,
+        size=50,
+        pricetick=0.1,
+    )
+    return contract, symbol, "TAIFEX"
+
+
+def _gateway(monkeypatch, fresh):
+    gateway = FubonGateway(RecordingEventEngine())
+    published = []
+    monkeypatch.setattr(
+        gateway, "on_contract", lambda contract: published.append(contract.vt_symbol)
+    )
+    monkeypatch.setattr(gateway, "_fetch_contracts_from_rest", lambda: list(fresh))
+    return gateway, published
+
+
+def test_refresh_publishes_only_delta_and_marks_expired(monkeypatch):
+    fresh = [_record("TX117000F4"), _record("TX117100F4"), _record("TX217000F4")]
+    gateway, published = _gateway(monkeypatch, fresh)
+    gateway._publish_contract_records(list(fresh))
+    unchanged = gateway.contracts["TX117000F4.CFE"]
+    old_aliases = gateway._symbol_aliases
+    published.clear()
+
+    fresh[:] = [_record("TX117000F4"), _record("TX217000F4", name="renamed"), _record("TX317000F4")]
+    diff = gateway.refresh_contracts()
+
+    assert diff.added == ("TX317000F4.CFE",) and diff.changed == ("TX217000F4.CFE",)
+    assert diff.removed == ("TX117100F4.CFE",)
+    assert sorted(published) == ["TX217000F4.CFE", "TX317000F4.CFE"]
+    assert gateway.contracts["TX117000F4.CFE"] is unchanged
+    assert gateway.contracts["TX217000F4.CFE"].name == "renamed"
+
+    expired = gateway.expired_contracts["TX117100F4.CFE"]
+    assert expired.extra["expired"] is True
+    assert gateway.resolve_vt_symbol("TX117100F4") is None
+    assert gateway.resolve_vt_symbol("TX317000F4") == "TX317000F4.CFE"
+    # The alias table was replaced, not edited in place.
+    assert gateway._symbol_aliases is not old_aliases and "TX117100F4" in old_aliases
+
+    stats = gateway.get_contract_refresh_stats()
+    assert (stats["added"], stats["changed"], stats["expired"], stats["expired_total"]) == (
+        1,
+        1,
+        1,
+        1,
+    )
+
+    published.clear()
+    assert gateway.refresh_contracts().empty and published == []
+
+
+def test_identical_refresh_publishes_empty_delta(tmp_path, monkeypatch):
+    def download():
+        # A new download builds new objects; extra carries values JSON cannot hold.
+        records = [_record("TX117000F4"), _record("TX217000F4")]
+        for contract, _, _ in records:
+            contract.extra = {
+                "tick": Decimal("0.1"),
+                "listed": date(2024, 5, 16),
+                "sessions": ("day", "night"),
+            }
+        return records
+
+    gateway, published = _gateway(monkeypatch, [])
+    monkeypatch.setattr(gateway, "_fetch_contracts_from_rest", download)
+    cache = ContractCache(tmp_path / "contracts.sqlite3")
+    cache.save(trading_day_for(), download())
+    gateway._publish_contract_records(cache.load(trading_day_for(), gateway.gateway_name))
+    published.clear()
+
+    for _ in range(2):
+        diff = gateway.refresh_contracts()
+        assert diff is not None and diff.empty
+    assert published == []
+    assert gateway.get_contract_refresh_stats()["changed"] == 0
+
+
+class FlakyIntraday:
+    """Intraday REST stub whose OPTION tickers query can be made to fail."""
+
+    def __init__(self) -> None:
+        self.fail_option_tickers = False
+        self.future_name = "TXF"
+
+    def products(self, **params):
+        symbol = "TXF" if params["type"] == "FUTURE" else "TXO"
+        return {"data": [{"symbol": symbol, "tickSize": 1, "contractSize": 200}]}
+
+    def tickers(self, **params):
+        if params["type"] == "FUTURE":
+            return {"data": [{"symbol": "TXFF4", "type": "FUTURE", "name": self.future_name}]}
+        if self.fail_option_tickers:
+            raise TimeoutError("tickers timed out")
+        return {
+            "data": [
+                {"symbol": f"TXO{strike}F4", "type": "OPTION", "name": "TXO"}
+                for strike in (18000, 18100)
+            ]
+        }
+
+
+def test_refresh_with_a_failed_query_expires_nothing_and_keeps_the_cache(tmp_path, monkeypatch):
+    intraday = FlakyIntraday()
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway._get_intraday_client = lambda: intraday
+    gateway._contract_cache = ContractCache(tmp_path / "contracts.sqlite3")
+    published = []
+    monkeypatch.setattr(
+        gateway, "on_contract", lambda contract: published.append(contract.vt_symbol)
+    )
+    gateway._load_and_publish_contracts()
+    gateway._cancel_contract_refresh()
+    cached = gateway._contract_cache.load(trading_day_for(), gateway.gateway_name)
+    assert len(cached) == 3
+    published.clear()
+
+    intraday.fail_option_tickers = True
+    intraday.future_name = "TXF renamed"
+    diff = gateway.refresh_contracts()
+
+    assert diff.removed == () and diff.changed == ("TXFF4.CFE",)
+    assert published == ["TXFF4.CFE"]
+    assert sorted(gateway.contracts) == ["TXFF4.CFE", "TXO18000F4.CFE", "TXO18100F4.CFE"]
+    assert gateway.expired_contracts == {}
+    assert gateway.resolve_vt_symbol("TXO18000F4") == "TXO18000F4.CFE"
+    cached = gateway._contract_cache.load(trading_day_for(), gateway.gateway_name)
+    assert {contract.name for contract, _, _ in cached} == {"TXF", "TXO"}
+
+
+def test_partial_initial_download_is_published_but_not_cached(tmp_path):
+    intraday = FlakyIntraday()
+    intraday.fail_option_tickers = True
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway._get_intraday_client = lambda: intraday
+    gateway._contract_cache = ContractCache(tmp_path / "contracts.sqlite3")
+    gateway._load_and_publish_contracts()
+    gateway._cancel_contract_refresh()
+
+    assert list(gateway.contracts) == ["TXFF4.CFE"]
+    assert gateway._contract_cache.load(trading_day_for(), gateway.gateway_name) is None
+
+
+def test_refresh_is_discarded_after_close(monkeypatch):
+    fresh = [_record("TX117000F4")]
+    gateway, published = _gateway(monkeypatch, fresh)
+    gateway._publish_contract_records(list(fresh))
+
+    def fetch_then_close():
+        gateway.close()
+        return [_record("TX117100F4")]
+
+    monkeypatch.setattr(gateway, "_fetch_contracts_from_rest", fetch_then_close)
+    assert gateway.refresh_contracts() is None
+    assert gateway.contracts == {} and gateway.expired_contracts == {}
@@ -0,0 +1,171 @@
+import json
+import threading
+
+from vnpy_fubon.dispatch import (
+    FrameDispatcher,
+    OverflowPolicy,
+    ShardedDispatcher,
+    frame_conflation_key,
+    frame_shard_key,
+    shard_for,
+    split_frame_by_symbol,
+)
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.vnpy_compat import EVENT_TICK
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def _book_frame(symbol: str, price: int) -> str:
+    return json.dumps({"channel": "books", "data": {"symbol": symbol, "bid_price": price}})
+
+
+def _blocked_dispatcher(policy: OverflowPolicy, maxsize: int):
+    gate = threading.Event()
+    seen = []
+
+    def handler(item):
+        gate.wait(timeout=5)
+        seen.append(item)
+
+    dispatcher = FrameDispatcher(handler, maxsize=maxsize, policy=policy)
+    dispatcher.start()
+    # Park the single worker on the first frame so later frames stay queued.
+    dispatcher.submit("warmup")
+    while dispatcher.stats()["queue_depth"]:
+        pass
+    return dispatcher, gate, seen
+
+
+def test_frame_conflation_key_only_for_single_symbol_books():
+    assert frame_conflation_key(_book_frame("TXFA4", 1)) == ("books", "TXFA4")
+    assert (
+        frame_conflation_key(json.dumps({"channel": "trades", "data": {"symbol": "TXFA4"}})) is None
+    )
+    multi = json.dumps({"channel": "books", "data": [{"symbol": "A"}, {"symbol": "B"}]})
+    assert frame_conflation_key(multi) is None
+
+
+def test_drop_oldest_policy_counts_drops():
+    dispatcher, gate, seen = _blocked_dispatcher(OverflowPolicy.DROP_OLDEST, maxsize=2)
+    for index in range(5):
+        dispatcher.submit(index)
+    gate.set()
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    assert stats["dropped"] == 3
+    assert seen == ["warmup", 3, 4]
+
+
+def test_conflate_policy_keeps_latest_book_per_symbol():
+    dispatcher, gate, seen = _blocked_dispatcher(OverflowPolicy.CONFLATE, maxsize=10)
+    dispatcher.submit(_book_frame("TXFA4", 1))
+    dispatcher.submit(_book_frame("TXFB4", 1))
+    dispatcher.submit(_book_frame("TXFA4", 2))
+    gate.set()
+    dispatcher.stop()
+    assert dispatcher.stats()["conflated"] == 1
+    assert seen[1:] == [_book_frame("TXFA4", 2), _book_frame("TXFB4", 1)]
+
+
+def test_gateway_thread_dispatch_publishes_from_worker(monkeypatch):
+    monkeypatch.setenv("FUBON_WS_DISPATCH_MODE", "thread")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._start_ws_dispatcher()
+    gateway._on_ws_message(_book_frame("TXFA4", 100))
+    gateway._stop_ws_dispatcher()
+    assert [event for event in engine.events if event.type == EVENT_TICK]
+    assert gateway.get_dispatch_stats() == {"mode": "inline"}
+
+
+def test_sharded_dispatcher_preserves_per_symbol_order():
+    seen = {}
+    lock = threading.Lock()
+
+    def handler(item):
+        with lock:
+            seen.setdefault(item["symbol"], []).append(item["seq"])
+
+    pool = ShardedDispatcher(handler, shards=4, conflation_key=None)
+    pool.start()
+    for seq in range(200):
+        for symbol in ("TXFA4", "TXO17000K4", "TXO17050K4", "MXFA4"):
+            pool.submit({"symbol": symbol, "seq": seq})
+    pool.stop()
+    assert all(values == list(range(200)) for values in seen.values())
+    stats = pool.stats()
+    assert stats["processed"] == 800
+    assert len(stats["per_shard"]) == 4
+
+
+def test_frame_shard_key_reads_raw_and_decoded_frames():
+    assert frame_shard_key(_book_frame("TXFA4", 1)) == "TXFA4"
+    assert frame_shard_key({"channel": "books", "data": {"symbol": "TXFA4"}}) == "TXFA4"
+    assert shard_for("TXFA4", 8) == shard_for("TXFA4", 8)
+    assert shard_for(None, 8) == 0
+
+
+def test_split_frame_by_symbol_groups_multi_symbol_frames():
+    single = _book_frame("TXFA4", 1)
+    assert split_frame_by_symbol(single) == [single]
+
+    multi = json.dumps(
+        {
+            "channel": "trades",
+            "data": [
+                {"symbol": "TXFA4", "seq": 1},
+                {"symbol": "MXFA4", "seq": 1},
+                {"symbol": "TXFA4", "seq": 2},
+            ],
+        }
+    )
+    parts = [json.loads(part) for part in split_frame_by_symbol(multi)]
+    assert parts == [
+        {
+            "channel": "trades",
+            "data": [{"symbol": "TXFA4", "seq": 1}, {"symbol": "TXFA4", "seq": 2}],
+        },
+        {"channel": "trades", "data": [{"symbol": "MXFA4", "seq": 1}]},
+    ]
+    decoded = [{"symbol": "TXFA4"}, {"symbol": "MXFA4"}]
+    assert split_frame_by_symbol(decoded) == [[{"symbol": "TXFA4"}], [{"symbol": "MXFA4"}]]
+
+
+def test_sharded_dispatcher_keeps_order_for_every_symbol_in_multi_symbol_frames():
+    symbols = ("TXFA4", "MXFA4", "TXO17000K4", "TXO17050K4")
+    seen = {}
+    lock = threading.Lock()
+
+    def handler(frame):
+        with lock:
+            for entry in json.loads(frame)["data"]:
+                seen.setdefault(entry["symbol"], []).append(entry["seq"])
+
+    pool = ShardedDispatcher(handler, shards=4, conflation_key=None)
+    pool.start()
+    for seq in range(0, 200, 2):
+        # A batch frame for every symbol, then a single-symbol frame for each.
+        pool.submit(
+            json.dumps({"channel": "trades", "data": [{"symbol": s, "seq": seq} for s in symbols]})
+        )
+        for symbol in symbols:
+            pool.submit(
+                json.dumps({"channel": "trades", "data": [{"symbol": symbol, "seq": seq + 1}]})
+            )
+    pool.stop()
+    assert {symbol: seen[symbol] for symbol in symbols} == {
+        symbol: list(range(200)) for symbol in symbols
+    }
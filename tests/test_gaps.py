@@ -0,0 +1,186 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+from vnpy_fubon.gaps import GapBackfiller, SequenceGapDetector
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.vnpy_compat import EVENT_FUBON_MARKET_RAW
+
+T0 = datetime(2024, 1, 2, 1, 0, tzinfo=timezone.utc)
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def test_detector_reports_missing_range_and_ignores_duplicates():
+    detector = SequenceGapDetector()
+    assert detector.observe("TXFA4", "trades", 1, T0) is None
+    assert detector.observe("TXFA4", "trades", 2, T0) is None
+    assert detector.observe("TXFA4", "trades", 2, T0) is None
+    assert detector.observe("MXFA4", "trades", 7, T0) is None
+
+    gap = detector.observe("TXFA4", "trades", 6, T0 + timedelta(seconds=3))
+    assert (gap.start_seq, gap.end_seq, gap.missing) == (3, 5, 3)
+    assert gap.start_ts_utc == T0 and gap.end_ts_utc == T0 + timedelta(seconds=3)
+
+    # A new session restarts the sequence instead of counting as a duplicate.
+    assert detector.observe("TXFA4", "trades", 1, T0) is None
+    assert detector.last_seq("TXFA4", "trades") == 1
+    assert detector.recent() == [gap]
+
+    stats = detector.stats()
+    assert stats["gaps"] == 1 and stats["missing"] == 3
+    assert stats["duplicates"] == 1 and stats["restarts"] == 1
+    assert stats["tracked"] == 2
+
+
+def test_detector_treats_a_large_backward_jump_as_a_restart():
+    detector = SequenceGapDetector()
+    for serial in range(1, 501):
+        detector.observe("TXFA4", "trades", serial, T0)
+    assert detector.observe("TXFA4", "trades", 498, T0) is None
+    for serial in (3, 4, 5):
+        assert detector.observe("TXFA4", "trades", serial, T0) is None
+    gap = detector.observe("TXFA4", "trades", 20, T0)
+    assert (gap.start_seq, gap.end_seq) == (6, 19)
+    stats = detector.stats()
+    assert stats["restarts"] == 1 and stats["duplicates"] == 1
+
+
+def test_gateway_rebases_sequences_after_reconnect(monkeypatch):
+    gateway = FubonGateway(DummyEventEngine(), client=DummyClient())
+    gateway._gap_detector = SequenceGapDetector()
+    gateway._ws_client = object()
+    key = ("trades", "TXFA4", None)
+    gateway._active_subscriptions.add(key)
+    gateway._ws_pool.bind(key)
+    monkeypatch.setattr(gateway, "_resubscribe_connections", lambda jobs: {})
+    gateway._observe_sequence("TXFA4", "trades", 40, T0)
+    gateway._resubscribe_all()
+    assert gateway._gap_detector.last_seq("TXFA4", "trades") is None
+    gateway._observe_sequence("TXFA4", "trades", 7, T0)
+    assert gateway._gap_detector.stats()["gaps"] == 0
+
+
+def test_backfiller_is_bounded_and_reports_results():
+    detector = SequenceGapDetector()
+    detector.observe("TXFA4", "trades", 1)
+    gaps = [detector.observe("TXFA4", "trades", seq) for seq in (3, 5, 7)]
+    release = threading.Event()
+    done = []
+    finished = threading.Event()
+
+    def fetch(gap):
+        release.wait(timeout=5)
+        if gap.start_seq == 4:
+            raise RuntimeError("rest down")
+        return [gap.start_seq]
+
+    def on_done(gap, result, error):
+        done.append((gap.start_seq, result, error is not None))
+        if len(done) == 2:
+            finished.set()
+
+    backfiller = GapBackfiller(fetch, on_done=on_done, max_pending=2)
+    backfiller.start()
+    try:
+        assert backfiller.submit(gaps[0])
+        assert backfiller.submit(gaps[1])
+        assert not backfiller.submit(gaps[2])
+        release.set()
+        assert finished.wait(timeout=5)
+    finally:
+        backfiller.stop()
+    assert done == [(2, [2], False), (4, None, True)]
+    stats = backfiller.stats()
+    assert stats == {"submitted": 2, "dropped": 1, "completed": 1, "failed": 1, "pending": 0}
+
+
+def test_gateway_flags_trade_gap_and_publishes_backfill(monkeypatch):
+    monkeypatch.setenv("FUBON_GAP_DETECTION", "1")
+    monkeypatch.setenv("FUBON_EMIT_RAW", "never")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    requests = []
+    published = threading.Event()
+
+    def fake_history(symbol, *, session=None, offset=None, limit=None):
+        requests.append((symbol, session, offset, limit))
+        return [
+            gateway._normalize_market_trade(
+                {
+                    "channel": "trades",
+                    "symbol": symbol,
+                    "serial": serial,
+                    "trades": [{"price": 100, "matchQty": 1}],
+                }
+            )
+            for serial in (2, 3, 9)
+        ]
+
+    def put_event(event_type, data):
+        engine.events.append((event_type, data))
+        if event_type == EVENT_FUBON_MARKET_RAW and data.get("event_type") == "backfill":
+            published.set()
+
+    monkeypatch.setattr(gateway, "fetch_trades_history", fake_history)
+    monkeypatch.setattr(gateway, "_put_event", put_event)
+    gateway._start_gap_detection()
+    try:
+        for serial in (1, 4):
+            gateway._handle_ws_message(
+                json.dumps(
+                    {
+                        "channel": "trades",
+                        "data": {
+                            "symbol": "TXFA4",
+                            "price": 100,
+                            "size": 1,
+                            "serial": serial,
+                            "time": T0.isoformat(),
+                        },
+                    }
+                )
+            )
+        assert published.wait(timeout=5)
+    finally:
+        gateway._stop_gap_detection()
+
+    assert requests == [("TXFA4", None, 1, 2)]
+    raw = [data for event_type, data in engine.events if event_type == EVENT_FUBON_MARKET_RAW][0]
+    assert raw["gap_status"] == "backfilled"
+    assert [trade.tradeid for trade in raw["trades"]] == ["2", "3"]
+    assert gateway.get_gap_stats() == {}
+
+
+def test_gateway_publishes_failed_backfill(monkeypatch):
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    published = []
+    monkeypatch.setattr(
+        gateway, "_put_event", lambda event_type, data: published.append((event_type, data))
+    )
+    detector = SequenceGapDetector()
+    detector.observe("TXFA4", "trades", 1, T0)
+    gap = detector.observe("TXFA4", "trades", 4, T0 + timedelta(seconds=1))
+
+    gateway._on_gap_backfilled(gap, None, RuntimeError("HTTP 503"))
+
+    assert len(published) == 1
+    event_type, raw = published[0]
+    assert event_type == EVENT_FUBON_MARKET_RAW
+    assert raw["gap_status"] == "pending"
+    assert raw["error"] == "HTTP 503"
+    assert (raw["start_seq"], raw["end_seq"]) == (2, 3)
+    assert raw["trades"] == []
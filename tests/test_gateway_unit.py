@@ -5,7 +5,7 @@ from decimal import Decimal
 import pytest
 
 from vnpy_fubon.gateway import FubonGateway
-from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.market import ChannelDecoder, MarketAPI, MarketRawView
 from vnpy_fubon.normalization import normalize_exchange, normalize_product, normalize_symbol
 from vnpy_fubon.order import OrderAPI
 from vnpy_fubon.vnpy_compat import (
@@ -222,6 +222,21 @@ def test_market_parse_market_events_trades():
     assert api.parse_websocket_message(message) == []
 
 
+def test_market_channel_decoder_registry_and_signature_cache():
+    api = MarketAPI(DummyClient())
+    api.register_channel_decoder("Snapshot", ChannelDecoder(event_type="orderbook", to_tick=True))
+    events = api.parse_market_events(
+        json.dumps({"channel": "snapshot", "data": {"symbol": "TXFA4", "bid_price": 1}})
+    )
+    assert events[0].event_type == "orderbook"
+    assert events[0].tick is not None
+
+    message = json.dumps({"channel": "misc", "data": {"symbol": "TXFA4", "trade_price": 1}})
+    assert api.parse_market_events(message)[0].event_type == "trade"
+    assert api.parse_market_events(message)[0].event_type == "trade"
+    assert len(api._signature_cache) == 1
+
+
 def test_gateway_market_message_dispatch_emits_raw_and_tick():
     engine = DummyEventEngine()
     gateway = FubonGateway(engine, client=DummyClient())
@@ -267,6 +282,100 @@ def test_gateway_market_trade_message_only_emits_raw():
     assert not tick_events
 
 
+def test_gateway_market_trade_message_attaches_trade_and_envelope():
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    message = json.dumps(
+        {
+            "channel": "trades",
+            "data": {"symbol": "TXFA4", "price": 20500, "size": 2, "serial": 7},
+        }
+    )
+    gateway._handle_ws_message(message)
+    raw = [event for event in engine.events if event.type == EVENT_FUBON_MARKET_RAW][-1].data
+    trade = raw["trade"]
+    envelope = raw["envelope"]
+    assert trade.symbol == "TXFA4"
+    assert trade.price == Decimal("20500")
+    assert trade.volume == Decimal("2")
+    assert trade.extra["channel"] == envelope.channel
+    assert envelope.symbol == "TXFA4"
+
+
+def test_flatten_market_payload_reuses_flat_mapping():
+    from adapters.fubon_to_vnpy import _flatten_market_payload
+
+    flat = {"symbol": "TXFA4", "price": 1}
+    assert _flatten_market_payload(flat) is flat
+    nested = {"channel": "trades", "data": {"symbol": "TXFA4"}}
+    assert _flatten_market_payload(nested)["symbol"] == "TXFA4"
+
+
+class RegistryEventEngine(DummyEventEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.handlers = {}
+
+    def register(self, event_type, handler) -> None:
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unregister(self, event_type, handler) -> None:
+        self.handlers[event_type].remove(handler)
+
+
+def test_gateway_raw_events_only_emitted_with_listener(monkeypatch):
+    monkeypatch.setenv("FUBON_EMIT_RAW", "auto")
+    engine = RegistryEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    book = json.dumps({"channel": "books", "data": {"symbol": "TXFA4", "bid_price": 1}})
+    trade = json.dumps({"channel": "trades", "data": {"symbol": "TXFA4", "price": 1, "size": 1}})
+
+    gateway._handle_ws_message(book)
+    gateway._handle_ws_message(trade)
+    assert [event.type for event in engine.events] == [EVENT_TICK]
+
+    def listener(event):
+        return None
+
+    gateway.register_raw_handler(listener)
+    assert engine.handlers[EVENT_FUBON_MARKET_RAW] == [listener]
+    gateway._handle_ws_message(trade)
+    raw = engine.events[-1].data
+    assert engine.events[-1].type == EVENT_FUBON_MARKET_RAW
+    assert isinstance(raw, MarketRawView)
+    assert raw["channel"] == "trades"
+    assert raw["symbol"] == "TXFA4"
+    assert "trade" in raw
+    with pytest.raises(TypeError):
+        raw["symbol"] = "X"  # type: ignore[index]
+
+    gateway.unregister_raw_handler(listener)
+    published = len(engine.events)
+    gateway._handle_ws_message(trade)
+    assert len(engine.events) == published and engine.handlers[EVENT_FUBON_MARKET_RAW] == []
+
+
+def test_gateway_raw_emit_mode_overrides(monkeypatch):
+    monkeypatch.setenv("FUBON_EMIT_RAW", "never")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._handle_ws_message(
+        json.dumps({"channel": "trades", "data": {"symbol": "TXFA4", "price": 1, "size": 1}})
+    )
+    assert not engine.events
+
+    gateway._raw_emit_mode = "always"
+    engine_with_registry = RegistryEventEngine()
+    gateway.event_engine = engine_with_registry
+    gateway._handle_ws_message(
+        json.dumps({"channel": "trades", "data": {"symbol": "TXFA4", "price": 1, "size": 1}})
+    )
+    assert engine_with_registry.events[-1].data.to_dict()["event_type"] == "trade"
+
+
 def test_query_account_dispatches_event():
     engine = DummyEventEngine()
     gateway = FubonGateway(engine, client=DummyClient())
@@ -0,0 +1,46 @@
+import json
+
+import vnpy_fubon  # noqa: F401
+from vnpy_fubon.json_codec import available_decoders, get_json_decoder, resolve_decoder_name
+from vnpy_fubon.market import MarketAPI
+
+
+class DummyClient:
+    pass
+
+
+def test_stdlib_decoder_always_available():
+    assert "json" in available_decoders()
+    assert available_decoders()[-1] == "json"
+    assert resolve_decoder_name("stdlib") == "json"
+
+
+def test_unknown_decoder_falls_back_to_auto(monkeypatch):
+    monkeypatch.delenv("FUBON_JSON_DECODER", raising=False)
+    assert resolve_decoder_name("not-a-decoder") == available_decoders()[0]
+    assert resolve_decoder_name(None) == available_decoders()[0]
+
+
+def test_env_selects_decoder(monkeypatch):
+    monkeypatch.setenv("FUBON_JSON_DECODER", "json")
+    assert resolve_decoder_name() == "json"
+
+
+def test_all_decoders_produce_identical_market_events():
+    message = json.dumps(
+        {
+            "channel": "books",
+            "data": {
+                "symbol": "TXFA4",
+                "bids": [{"price": 20499, "size": 5}],
+                "asks": [{"price": 20501, "size": 3}],
+            },
+        }
+    )
+    results = []
+    for name in available_decoders():
+        api = MarketAPI(DummyClient(), decoder=get_json_decoder(name))
+        events = api.parse_market_events(message)
+        assert len(events) == 1
+        results.append((events[0].channel, events[0].event_type, dict(events[0].payload)))
+    assert all(result == results[0] for result in results)
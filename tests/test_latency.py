@@ -0,0 +1,94 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from vnpy_fubon.dispatch import FrameDispatcher
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.latency import STAGE_SKEW, STAGE_TOTAL, LatencyHistogram, LatencyTracker
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.vnpy_compat import EVENT_FUBON_MARKET_RAW
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def test_histogram_percentiles_stay_within_bucket_precision():
+    histogram = LatencyHistogram()
+    for value_us in range(1, 10_001):
+        histogram.record_us(value_us)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 10_000
+    assert snapshot["min_ms"] == 0.001 and snapshot["max_ms"] == 10.0
+    for name, expected in (("p50_ms", 5.0), ("p90_ms", 9.0), ("p99_ms", 9.9)):
+        assert expected <= snapshot[name] <= expected * 1.07
+    assert snapshot["p999_ms"] <= 10.0
+
+
+def test_tracker_alerts_once_per_interval_and_counts_breaches(caplog):
+    tracker = LatencyTracker(warn_ms=5, warn_interval=60, logger=logging.getLogger("test.latency"))
+    received = (0, 1_700_000_000.25)
+    exchange_ts = datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
+    with caplog.at_level(logging.WARNING, logger="test.latency"):
+        skew = tracker.observe(
+            "books",
+            received,
+            normalized_ns=1_000_000,
+            published_ns=2_000_000,
+            exchange_ts=exchange_ts,
+        )
+        tracker.observe("books", received, published_ns=6_000_000)
+        tracker.observe("books", received, published_ns=7_000_000)
+    assert skew == 250
+    assert tracker.alerts() == {"books": 2}
+    assert len([record for record in caplog.records if record.levelno == logging.WARNING]) == 1
+    stats = tracker.snapshot()["books"]
+    assert stats[STAGE_TOTAL]["count"] == 3
+    assert 250 <= stats[STAGE_SKEW]["p50_ms"] <= 260
+
+
+def test_dispatcher_passes_receive_stamp_to_handler():
+    seen = []
+    dispatcher = FrameDispatcher(
+        lambda item, stamp: seen.append((item, stamp)), stamp=lambda: "stamp"
+    )
+    dispatcher.start()
+    dispatcher.submit("frame")
+    dispatcher.stop()
+    assert seen == [("frame", "stamp")]
+
+
+def test_gateway_fills_latency_ms_and_exposes_stats(monkeypatch):
+    monkeypatch.setenv("FUBON_LATENCY_WARN_MS", "1000")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._start_latency_tracking()
+    stamp = (datetime.now(timezone.utc) - timedelta(milliseconds=40)).isoformat()
+    gateway._handle_ws_message(
+        json.dumps(
+            {
+                "channel": "trades",
+                "data": {"symbol": "TXFA4", "price": 100, "size": 1, "time": stamp},
+            }
+        )
+    )
+
+    raw = [
+        event.data
+        for event in engine.events
+        if getattr(event, "type", None) == EVENT_FUBON_MARKET_RAW
+    ][0]
+    assert raw["trade"].extra["latency_ms"] >= 40
+    assert raw["envelope"].latency_ms == raw["trade"].extra["latency_ms"]
+    stats = gateway.get_latency_stats()
+    assert set(stats["channels"]["trades"]) == {"decode", "normalize", "publish", "total", "skew"}
+    assert stats["alerts"] == {}
@@ -0,0 +1,57 @@
+import vnpy_fubon  # noqa: F401
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.normalization import (
+    clear_normalization_caches,
+    get_normalization_cache_stats,
+    normalize_exchange,
+    normalize_product,
+    normalize_symbol,
+)
+from vnpy_fubon.vnpy_compat import Exchange, Product
+
+
+class DummyEventEngine:
+    def put(self, event) -> None:
+        pass
+
+
+class DummyClient:
+    pass
+
+
+def test_memoized_normalizers_count_hits_and_intern_symbols():
+    clear_normalization_caches()
+    first = normalize_symbol(" txfa4")
+    second = normalize_symbol("TXFA4 ")
+    assert first == "TXFA4"
+    assert first is second
+    assert normalize_exchange("taifex-ah") == normalize_exchange("taifex-ah") == Exchange.CFE
+    assert normalize_product("Options") is Product.OPTION
+    assert normalize_product("Options") is Product.OPTION
+
+    stats = get_normalization_cache_stats()
+    assert stats["symbol"]["misses"] == 2 and stats["symbol"]["hits"] == 0
+    assert stats["exchange"] == {
+        "hits": 1,
+        "misses": 1,
+        "size": 1,
+        "maxsize": stats["exchange"]["maxsize"],
+    }
+    assert stats["product"]["hits"] == 1
+
+    normalize_symbol(" txfa4")
+    assert get_normalization_cache_stats()["symbol"]["hits"] == 1
+
+
+def test_default_is_part_of_exchange_cache_key():
+    clear_normalization_caches()
+    assert normalize_exchange(None, default="TWSE") == Exchange.TSE
+    assert normalize_exchange(None, default="TAIFEX") == Exchange.CFE
+    assert normalize_exchange(["unhashable"], default="TPEX") == Exchange.OTC
+
+
+def test_gateway_reports_cache_and_alias_stats():
+    gateway = FubonGateway(DummyEventEngine(), client=DummyClient())
+    stats = gateway.get_normalization_cache_stats()
+    assert set(stats) == {"exchange", "symbol", "product", "aliases"}
+    assert stats["aliases"] == {"symbol": 0, "symbol_exchange": 0}
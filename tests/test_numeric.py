@@ -0,0 +1,64 @@
+import json
+from decimal import Decimal
+
+import vnpy_fubon  # noqa: F401
+from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.numeric import get_number_converter, resolve_numeric_mode, to_decimal, to_float
+
+
+class DummyClient:
+    pass
+
+
+def test_converters_handle_vendor_formats():
+    assert to_decimal("1,234.5") == Decimal("1234.5")
+    assert to_decimal(None) == Decimal("0")
+    assert to_decimal("bad") == Decimal("0")
+    assert to_float("1,234.5") == 1234.5
+    assert to_float(Decimal("1.5")) == 1.5
+    assert to_float("null") == 0.0
+    assert to_float("bad") == 0.0
+
+
+def test_numeric_mode_resolution(monkeypatch):
+    monkeypatch.delenv("FUBON_NUMERIC_MODE", raising=False)
+    assert resolve_numeric_mode() == "decimal"
+    monkeypatch.setenv("FUBON_NUMERIC_MODE", "float")
+    assert get_number_converter() is to_float
+    assert resolve_numeric_mode("unknown") == "decimal"
+
+
+def test_float_mode_produces_floats_on_market_paths():
+    api = MarketAPI(DummyClient(), numeric_mode="float")
+    tick = api.to_tick({"symbol": "TXFA4", "price": "20500", "bid_price": 20499})
+    assert isinstance(tick.last_price, float) and tick.last_price == 20500.0
+    assert isinstance(tick.bid_price_1, float)
+
+    normalizer = MarketEnvelopeNormalizer(numeric_mode="float")
+    book = normalizer.normalize_orderbook(
+        {
+            "channel": "books",
+            "data": {
+                "symbol": "TXFA4",
+                "bids": [{"price": 10, "size": 1}],
+                "asks": [{"price": 11, "size": 2}],
+            },
+        }
+    )
+    assert book.tick.bid_price_1 == 10.0 and isinstance(book.tick.bid_price_1, float)
+    assert book.rows[0].mid_px == 10.5
+
+    trade = normalizer.normalize_trade(
+        json.loads('{"channel": "trades", "data": {"symbol": "TXFA4", "price": "1.5", "size": 2}}')
+    )
+    assert trade.trade.price == 1.5
+    assert trade.row["turnover"] == 3.0
+
+
+def test_decimal_mode_is_default_for_storage_rows(monkeypatch):
+    monkeypatch.delenv("FUBON_NUMERIC_MODE", raising=False)
+    normalizer = MarketEnvelopeNormalizer()
+    trade = normalizer.normalize_trade({"symbol": "TXFA4", "price": "1.5", "size": 2})
+    assert trade.row["price"] == Decimal("1.5")
+    assert isinstance(trade.row["turnover"], Decimal)
@@ -0,0 +1,59 @@
+from datetime import date, datetime
+
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.option_chain import OptionChainIndex
+from vnpy_fubon.product_index import ProductIndex
+from vnpy_fubon.vnpy_compat import OptionType
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def test_lookup_and_neighbour_strikes():
+    index = OptionChainIndex()
+    june = date(2024, 6, 19)
+    for strike in (16900, 17000, 17100, 17200, 16800):
+        index.add("txo", june, strike, OptionType.CALL, f"C{strike}")
+        index.add("TXO", june, strike, OptionType.PUT, f"P{strike}")
+    index.add("TXO", datetime(2024, 7, 17, 13, 30), 17000, OptionType.CALL, "C17000-JUL")
+
+    assert len(index) == 11
+    assert index.get("TXO", june, 17100.0, OptionType.PUT) == "P17100"
+    assert index.get("TXO", june, 17150, OptionType.PUT) is None
+    assert list(index.strikes("TXO", june)) == [16800.0, 16900.0, 17000.0, 17100.0, 17200.0]
+    assert index.expiries("TXO") == [june, date(2024, 7, 17)]
+    assert index.expiries("TXO", after=date(2024, 6, 20)) == [date(2024, 7, 17)]
+
+    assert index.atm_strike("TXO", june, 17040) == 17000.0
+    assert index.neighbours("TXO", june, 17060, 1) == [17000.0, 17100.0, 17200.0]
+    assert index.neighbours("TXO", june, 16000, 2) == [16800.0, 16900.0, 17000.0]
+    assert index.neighbours("TXO", date(2024, 8, 21), 17000, 2) == []
+
+
+def test_gateway_builds_chain_from_loaded_contracts():
+    gateway = FubonGateway(RecordingEventEngine())
+    product_metadata = {"TXO": {"symbol": "TXO", "tickSize": 0.1, "underlyingSymbol": "TXF"}}
+    index = ProductIndex(product_metadata)
+    tickers = [
+        {"symbol": f"TXO{strike}{month}4", "type": "OPTION", "settlementDate": "2024-06-19"}
+        for strike in (16900, 17000, 17100)
+        for month in "FR"
+    ]
+    records = [
+        gateway._map_ticker_to_contract(ticker, product_metadata, index) for ticker in tickers
+    ]
+    gateway._publish_contract_records(records)
+
+    chain = gateway.get_option_chain()
+    put = chain.get("TXO", date(2024, 6, 19), 17000, OptionType.PUT)
+    assert put is gateway.contracts[put.vt_symbol] and put.symbol == "TXO17000R4"
+    underlying = put.option_underlying
+    assert chain.get(underlying, date(2024, 6, 19), 17000, OptionType.CALL).symbol == "TXO17000F4"
+    assert chain.neighbours("TXO", date(2024, 6, 19), 17020, 1) == [16900.0, 17000.0, 17100.0]
+    # Every option is indexed under TXO and its underlying but counted once.
+    assert underlying != "TXO" and len(chain) == len(tickers)
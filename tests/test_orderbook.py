@@ -0,0 +1,198 @@
+import vnpy_fubon.gateway as gateway_module
+from vnpy_fubon.gateway import BOOK_RESUBSCRIBE_ATTEMPTS, FubonGateway
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.orderbook import (
+    BOOK_APPLIED,
+    BOOK_AWAITING_SNAPSHOT,
+    BOOK_GAP,
+    BOOK_SNAPSHOT,
+    BOOK_STALE,
+    OrderBookEngine,
+    is_snapshot_payload,
+)
+from vnpy_fubon.vnpy_compat import EVENT_LOG, EVENT_TICK
+
+
+class DummyClient:
+    pass
+
+
+class DummyEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+SNAPSHOT = {
+    "symbol": "TXFA4",
+    "seq": 10,
+    "isSnapshot": True,
+    "bids": [[100, 1], [99, 2], [98, 3]],
+    "asks": [{"price": 101, "size": 4}, {"price": 102, "size": 5}],
+}
+
+
+def test_snapshot_then_deltas_update_levels():
+    engine = OrderBookEngine()
+    assert engine.apply("TXFA4", SNAPSHOT).status == BOOK_SNAPSHOT
+
+    update = engine.apply("TXFA4", {"seq": 11, "bids": [[100, 0], [99.5, 7]], "asks": [[101, 6]]})
+    assert update.status == BOOK_APPLIED
+    assert update.bids == [(99.5, 7.0), (99.0, 2.0), (98.0, 3.0)]
+    assert update.asks[0] == (101.0, 6.0)
+
+    assert engine.apply("TXFA4", {"seq": 11, "bids": [[97, 1]]}).status == BOOK_STALE
+
+
+def test_gap_requests_single_resnapshot_until_snapshot_arrives():
+    requests = []
+    engine = OrderBookEngine(
+        on_gap=lambda symbol, expected, received: requests.append((symbol, expected, received))
+    )
+    engine.apply("TXFA4", SNAPSHOT)
+
+    assert engine.apply("TXFA4", {"seq": 13, "bids": [[100, 9]]}).status == BOOK_GAP
+    assert engine.apply("TXFA4", {"seq": 14, "bids": [[100, 9]]}).status == BOOK_AWAITING_SNAPSHOT
+    assert requests == [("TXFA4", 11, 13)]
+
+    assert engine.apply("TXFA4", dict(SNAPSHOT, seq=20)).ready
+    assert engine.apply("TXFA4", {"seq": 21, "asks": [[101, 1]]}).status == BOOK_APPLIED
+    stats = engine.stats()
+    assert stats["gaps"] == 1 and stats["resnapshot_requests"] == 1 and stats["valid_books"] == 1
+
+
+def test_unanswered_resnapshot_request_is_repeated():
+    requests = []
+    engine = OrderBookEngine(
+        on_gap=lambda symbol, expected, received: requests.append(received), resnapshot_timeout=60
+    )
+    engine.apply("TXFA4", {"seq": 3, "bids": [[100, 1]]})
+    engine.apply("TXFA4", {"seq": 4, "bids": [[100, 1]]})
+    assert requests == [3]
+    engine.cancel_resnapshot("TXFA4")
+    engine.apply("TXFA4", {"seq": 5, "bids": [[100, 1]]})
+    assert requests == [3, 5]
+
+    engine = OrderBookEngine(
+        on_gap=lambda symbol, expected, received: requests.append(received), resnapshot_timeout=0
+    )
+    engine.apply("MXFA4", {"seq": 8, "bids": [[100, 1]]})
+    engine.apply("MXFA4", {"seq": 9, "bids": [[100, 1]]})
+    assert requests == [3, 5, 8, 9]
+
+
+class ImmediateTimer:
+    def __init__(self, interval, function, args=()) -> None:
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.daemon = False
+
+    def start(self) -> None:
+        self.function(*self.args)
+
+
+def _book_gateway(monkeypatch, failures):
+    monkeypatch.setenv("FUBON_BOOK_ENGINE", "1")
+    monkeypatch.setattr(gateway_module, "Timer", ImmediateTimer)
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway._start_book_engine()
+    gateway._active_subscriptions.add(("books", "TXFA4", None))
+    calls = {"subscribe": 0, "delays": []}
+
+    def unsubscribe_quotes(symbols, *, channels=None, after_hours=None):
+        gateway._active_subscriptions.discard(("books", "TXFA4", after_hours))
+
+    def subscribe_quotes(symbols, *, channels=None, after_hours=None):
+        calls["subscribe"] += 1
+        if calls["subscribe"] <= failures:
+            raise RuntimeError("subscribe rejected")
+        gateway._active_subscriptions.add(("books", "TXFA4", after_hours))
+
+    monkeypatch.setattr(gateway, "unsubscribe_quotes", unsubscribe_quotes)
+    monkeypatch.setattr(gateway, "subscribe_quotes", subscribe_quotes)
+    return gateway, engine, calls
+
+
+def test_failed_book_resubscribe_is_retried(monkeypatch):
+    gateway, _engine, calls = _book_gateway(monkeypatch, failures=2)
+    gateway._resubscribe_books("TXFA4")
+    assert calls["subscribe"] == 3
+    assert ("books", "TXFA4", None) in gateway._active_subscriptions
+
+
+def test_book_resubscribe_gives_up_and_clears_the_pending_request(monkeypatch):
+    gateway, engine, calls = _book_gateway(monkeypatch, failures=BOOK_RESUBSCRIBE_ATTEMPTS)
+    requests = []
+    gateway._book_engine._on_gap = lambda symbol, expected, received: requests.append(received)
+    gateway._book_engine.apply("TXFA4", {"seq": 3, "bids": [[100, 1]]})
+    gateway._resubscribe_books("TXFA4")
+    assert calls["subscribe"] == BOOK_RESUBSCRIBE_ATTEMPTS
+    assert [event for event in engine.events if event.type == EVENT_LOG]
+    gateway._book_engine.apply("TXFA4", {"seq": 4, "bids": [[100, 1]]})
+    assert requests == [3, 4]
+
+
+def test_snapshot_detection_defaults():
+    assert is_snapshot_payload({"bids": []})
+    assert not is_snapshot_payload({"seq": 3})
+    assert is_snapshot_payload({"seq": 3, "snapshot": "Y"})
+
+
+def test_gateway_emits_five_level_ticks_from_engine(monkeypatch):
+    monkeypatch.setenv("FUBON_BOOK_ENGINE", "1")
+    engine = DummyEventEngine()
+    gateway = FubonGateway(engine, client=DummyClient())
+    gateway.market_api = MarketAPI(DummyClient())
+    gateway._request_book_resnapshot = lambda *args: None
+    gateway._start_book_engine()
+
+    frame = '{"channel": "books", "data": %s}'
+    gateway._handle_ws_message(
+        frame % '{"symbol": "TXFA4", "seq": 5, "bids": [[100, 1]], "asks": [[101, 1]]}'
+    )
+    assert not [event for event in engine.events if event.type == EVENT_TICK]
+
+    gateway._handle_ws_message(
+        frame % '{"symbol": "TXFA4", "seq": 6, "isSnapshot": true, '
+        '"bids": [[100, 1], [99, 2], [98, 3], [97, 4], [96, 5], [95, 6]], "asks": [[101, 1], [102, 2]]}'
+    )
+    gateway._handle_ws_message(frame % '{"symbol": "TXFA4", "seq": 7, "bids": [[96, 0]]}')
+    ticks = [event.data for event in engine.events if event.type == EVENT_TICK]
+    tick = ticks[-1]
+    assert tick.bid_price_1 == 100 and tick.bid_price_5 == 95
+    assert tick.ask_price_2 == 102 and tick.ask_volume_3 == 0
+    assert gateway.get_book_engine_stats()["awaiting_snapshot"] == 1
+
+
+def test_orderbook_and_market_api_map_five_levels_onto_tick():
+    from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer
+
+    bids = [{"price": 100 - level, "size": level + 1} for level in range(6)]
+    asks = [[101 + level, level + 1] for level in range(3)]
+    book = MarketEnvelopeNormalizer(numeric_mode="float").normalize_orderbook(
+        {"channel": "books", "data": {"symbol": "TXFA4", "bids": bids, "asks": asks}}
+    )
+    tick = book.tick
+    assert (tick.bid_price_5, tick.bid_volume_5) == (96.0, 5.0)
+    assert (tick.ask_price_3, tick.ask_price_4, tick.ask_volume_5) == (103.0, 0.0, 0.0)
+    assert "levels" not in tick.extra
+    assert [row.level for row in book.rows] == [1, 2, 3, 4, 5]
+
+    quote = MarketAPI(DummyClient(), numeric_mode="float").to_tick(
+        {"symbol": "TXFA4", "bids": bids, "asks": asks}
+    )
+    assert (quote.bid_price_1, quote.bid_price_5, quote.ask_volume_2) == (100.0, 96.0, 2.0)
+
+
+def test_market_api_skips_depth_when_book_engine_rebuilds_it():
+    api = MarketAPI(DummyClient(), numeric_mode="float")
+    frame = '{"channel": "books", "data": {"symbol": "TXFA4", "bids": [[100, 1], [99, 2]], "asks": [[101, 3]]}}'
+
+    full = api.parse_market_events(frame)[0].tick
+    top_only = api.parse_market_events(frame, book_levels=False)[0].tick
+    assert (full.bid_price_2, full.ask_volume_1) == (99.0, 3.0)
+    assert not top_only.bid_price_2 and not top_only.ask_price_1
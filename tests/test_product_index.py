@@ -0,0 +1,49 @@
+import time
+
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.product_index import ProductIndex
+from vnpy_fubon.vnpy_compat import OptionType
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+def test_longest_prefix_and_split():
+    index = ProductIndex(["TX", "TXO", "TXF", "mx"])
+    assert len(index) == 4 and "MX" in index and "TXA" not in index
+    assert index.longest_prefix("TXO18000F4") == "TXO"
+    assert index.longest_prefix("TXZF4") == "TX"
+    assert index.longest_prefix("MXFF4") == "MX"
+    assert index.longest_prefix("ZZZ") is None
+    assert index.split("TXO18000F4") == ("TXO", "18000F4")
+    assert index.split("ZZZ") == (None, "ZZZ")
+
+
+def test_full_option_chain_maps_quickly():
+    gateway = FubonGateway(RecordingEventEngine())
+    product_metadata = {f"Q{i:02d}": {"symbol": f"Q{i:02d}", "tickSize": 1} for i in range(300)}
+    product_metadata["TXO"] = {"symbol": "TXO", "tickSize": 0.1, "underlyingSymbol": "TXF"}
+    product_metadata["TX"] = {"symbol": "TX", "tickSize": 1}
+    tickers = [
+        {"symbol": f"TXO{strike}{month}4", "type": "OPTION", "settlementDate": "2024-06-19"}
+        for strike in range(15000, 25000, 10)
+        for month in "FRGS"
+    ]
+    index = ProductIndex(product_metadata)
+
+    started = time.perf_counter()
+    records = [
+        gateway._map_ticker_to_contract(ticker, product_metadata, index) for ticker in tickers
+    ]
+    elapsed = time.perf_counter() - started
+
+    assert len(records) == 4000 and elapsed < 1.0
+    contract = records[1][0]
+    assert contract.symbol == "TXO15000R4"
+    assert contract.option_strike == 15000.0 and contract.option_type is OptionType.PUT
+    assert contract.pricetick == 0.1 and contract.option_underlying.startswith("TXF.")
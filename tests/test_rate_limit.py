@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from vnpy_fubon.exceptions import FubonRateLimitError
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.order import OrderAPI
+from vnpy_fubon.rate_limit import (
+    ENDPOINT_ACCOUNT,
+    ENDPOINT_MARKET_DATA,
+    ENDPOINT_ORDER,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class SlowIntraday:
+    """Fake ``futopt.intraday`` that takes ``latency`` per call and rejects the first products query."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._rejected = False
+
+    def _call(self, kind, params):
+        with self._lock:
+            self.calls.append((kind, params["type"], params["session"]))
+            if kind == "products" and not self._rejected:
+                self._rejected = True
+                raise RateLimitError("Rate limit exceeded")
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+
+    def products(self, **params):
+        self._call("products", params)
+        symbol = "TXF" if params["type"] == "FUTURE" else "TXO"
+        return {
+            "data": [
+                {"symbol": symbol, "tickSize": 1, "contractSize": 200, "session": params["session"]}
+            ]
+        }
+
+    def tickers(self, **params):
+        self._call("tickers", params)
+        if params["type"] == "FUTURE":
+            return {"data": [{"symbol": "TXFF4", "type": "FUTURE", "name": "TXF"}]}
+        return {"data": [{"symbol": "TXO18000F4", "type": "OPTION", "name": "TXO"}]}
+
+
+def test_token_bucket_bursts_then_paces_and_pauses():
+    clock = FakeClock()
+    bucket = TokenBucket(5, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.2)
+    assert not bucket.try_acquire()
+
+    bucket.pause(1.0)
+    assert bucket.acquire() == 1.0
+    assert bucket.acquire() == pytest.approx(0.2)
+    stats = bucket.stats()
+    assert stats["acquired"] == 8 and stats["waits"] == 3 and stats["pauses"] == 1
+
+
+def test_contract_download_runs_concurrently_under_shared_limiter():
+    intraday = SlowIntraday(latency=0.2)
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway._get_intraday_client = lambda: intraday
+    gateway._rate_limiter = RateLimiter({ENDPOINT_MARKET_DATA: 100})
+
+    started = time.perf_counter()
+    records = gateway._fetch_contracts_from_rest()
+    elapsed = time.perf_counter() - started
+
+    assert sorted(contract.symbol for contract, _, _ in records) == ["TXFF4", "TXO18000F4"]
+    assert len(intraday.calls) == 9
+    assert intraday.max_active > 1
+    # Sequentially: 8 x 0.2s plus the 0.5s pause after the 429.
+    assert elapsed < 1.5
+    stats = gateway.get_rest_limiter_stats()
+    assert stats["acquired"] == 9 and stats["pauses"] == 1
+
+
+class CancellingClient:
+    def __init__(self) -> None:
+        self.cancelled = []
+
+    def cancel_order(self, order_id: str, **_kwargs):
+        self.cancelled.append(order_id)
+        return {"is_success": True}
+
+
+def test_limiter_keeps_separate_budgets_and_rejects_late_orders():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        {ENDPOINT_ORDER: 2, ENDPOINT_ACCOUNT: 1},
+        max_wait={ENDPOINT_ORDER: 0.1},
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    client = CancellingClient()
+    api = OrderAPI(client, gateway_name="TEST", rate_limiter=limiter)
+
+    assert api.cancel_order("A") and api.cancel_order("B")
+    with pytest.raises(FubonRateLimitError):
+        api.cancel_order("C")
+    assert client.cancelled == ["A", "B"] and clock.now == 0
+
+    # The account budget is untouched by orders and waits instead of rejecting.
+    assert limiter.acquire(ENDPOINT_ACCOUNT) == 0
+    assert limiter.acquire(ENDPOINT_ACCOUNT) == pytest.approx(1.0)
+
+    stats = limiter.stats()
+    assert stats[ENDPOINT_ORDER]["acquired"] == 2 and stats[ENDPOINT_ORDER]["rejected"] == 1
+    assert stats[ENDPOINT_ACCOUNT]["waits"] == 1 and stats[ENDPOINT_ACCOUNT][
+        "waited_ms"
+    ] == pytest.approx(1000.0)
+    assert stats[ENDPOINT_MARKET_DATA]["acquired"] == 0
+
+
+def test_gateway_reads_budgets_from_settings():
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway._configure_rate_limiter({"order_rate_per_sec": "20", "account_rate_per_sec": "bogus"})
+    stats = gateway.get_rate_limiter_stats()
+    assert stats[ENDPOINT_ORDER]["rate"] == 20.0
+    assert stats[ENDPOINT_ACCOUNT]["rate"] == 5.0
+    assert stats[ENDPOINT_MARKET_DATA]["rate"] == 5.0
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List
+
+from vnpy_fubon.gateway import FubonGateway
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+class BatchingWebsocketClient:
+    def __init__(self, *, batch: bool = True) -> None:
+        self.batch = batch
+        self.connected = False
+        self.subscribed: List[Dict[str, Any]] = []
+
+    def connect(self) -> None:
+        self.connected = True
+
+    def subscribe(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.subscribed.append(dict(payload))
+        if "symbols" in payload:
+            if not self.batch:
+                raise TypeError("symbols not supported")
+            return {"ids": [f"{payload['channel']}-{symbol}" for symbol in payload["symbols"]]}
+        return {"id": f"{payload['channel']}-{payload['symbol']}"}
+
+
+def _gateway_with_dropped_connection(websocket: BatchingWebsocketClient, keys) -> FubonGateway:
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway.client = object()
+    gateway._ws_client = websocket
+    gateway._ws_connected = False
+    gateway._ws_handlers_registered = True
+    gateway._active_subscriptions = set(keys)
+    gateway._start_token_refresh = lambda: None
+    gateway._start_ws_heartbeat = lambda: None
+    return gateway
+
+
+def test_reconnect_resubscribes_in_batches_per_channel_and_session():
+    keys = [("books", f"TXF{i:03d}", None) for i in range(250)]
+    keys += [("trades", f"TXF{i:03d}", None) for i in range(30)]
+    keys += [("trades", f"MXF{i:03d}", True) for i in range(20)]
+    websocket = BatchingWebsocketClient()
+    gateway = _gateway_with_dropped_connection(websocket, keys)
+
+    gateway._ensure_websocket_client()
+
+    shapes = [
+        (item["channel"], item.get("afterHours"), len(item["symbols"]))
+        for item in websocket.subscribed
+    ]
+    assert len(shapes) == 4
+    assert set(shapes) == {
+        ("books", None, 200),
+        ("books", None, 50),
+        ("trades", None, 30),
+        ("trades", True, 20),
+    }
+    assert gateway._subscription_ids_by_key[("books", "TXF249", None)] == "books-TXF249"
+    assert gateway._subscription_key_by_id["trades-MXF019"] == ("trades", "MXF019", True)
+    summary = gateway.get_ws_pool_stats()["last_resubscribe"]
+    assert summary["keys"] == summary["resubscribed"] == 300
+    assert summary["requests"] == 4 and summary["failed"] == 0
+    assert summary["elapsed_ms"] >= 0
+
+
+def test_resubscribe_falls_back_to_single_symbols_when_batches_rejected():
+    keys = [("books", symbol, None) for symbol in ("TXFA4", "MXFA4")]
+    websocket = BatchingWebsocketClient(batch=False)
+    gateway = _gateway_with_dropped_connection(websocket, keys)
+
+    gateway._ensure_websocket_client()
+
+    single = sorted(item["symbol"] for item in websocket.subscribed if "symbol" in item)
+    assert single == ["MXFA4", "TXFA4"]
+    assert gateway._subscription_ids_by_key[("books", "TXFA4", None)] == "books-TXFA4"
+    summary = gateway.get_ws_pool_stats()["last_resubscribe"]
+    assert summary["resubscribed"] == 2 and summary["requests"] == 3
@@ -0,0 +1,121 @@
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.subscriptions import ACTION_SUBSCRIBE, SubscriptionQueue
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+class SlowWebsocketClient:
+    def __init__(self, *, reject: str = "") -> None:
+        self.reject = reject
+        self.subscribed: List[Dict[str, Any]] = []
+        self.unsubscribed: List[Dict[str, Any]] = []
+        self.release = threading.Event()
+
+    def subscribe(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.release.wait(timeout=5)
+        self.subscribed.append(dict(payload))
+        symbols = payload.get("symbols") or [payload["symbol"]]
+        if self.reject in symbols:
+            raise ValueError(f"invalid symbol {self.reject}")
+        return {"ids": [f"id-{symbol}" for symbol in symbols]}
+
+    def unsubscribe(self, payload: Dict[str, Any]) -> None:
+        self.unsubscribed.append(dict(payload))
+
+
+def _gateway(websocket: SlowWebsocketClient) -> FubonGateway:
+    gateway = FubonGateway(RecordingEventEngine())
+    gateway.client = object()
+    gateway._ws_client = websocket
+    gateway._ws_connected = True
+    gateway._ws_handlers_registered = True
+    gateway._subscribe_window_ms = 50
+    return gateway
+
+
+def test_subscribe_async_returns_at_once_and_coalesces_requests():
+    websocket = SlowWebsocketClient()
+    gateway = _gateway(websocket)
+    try:
+        futures = {}
+        for strike in range(100):
+            futures.update(gateway.subscribe_async([f"TXO{strike:05d}C4"]))
+        assert not any(future.done() for future in futures.values())
+        websocket.release.set()
+
+        ids = {key[1]: future.result(timeout=5) for key, future in futures.items()}
+        assert ids["TXO00042C4"] == "id-TXO00042C4"
+        assert len(websocket.subscribed) == 1 and len(websocket.subscribed[0]["symbols"]) == 100
+
+        again = gateway.subscribe_async(["TXO00042C4"])
+        assert again[("books", "TXO00042C4", None)].result(timeout=0) == "id-TXO00042C4"
+
+        gateway.unsubscribe_async(["TXO00042C4"])[("books", "TXO00042C4", None)].result(timeout=5)
+        assert websocket.unsubscribed == [{"ids": ["id-TXO00042C4"]}]
+        stats = gateway.get_subscription_queue_stats()
+        assert stats["batches"] == 2 and stats["completed"] == 101 and stats["pending"] == 0
+    finally:
+        gateway._stop_subscription_queue()
+
+
+def test_subscribe_async_fails_only_rejected_symbols():
+    websocket = SlowWebsocketClient(reject="BAD")
+    websocket.release.set()
+    gateway = _gateway(websocket)
+    try:
+        futures = gateway.subscribe_async(["TXFA4", "BAD"], channels=("trades",))
+        assert futures[("trades", "TXFA4", None)].result(timeout=5) == "id-TXFA4"
+        with pytest.raises(ValueError):
+            futures[("trades", "BAD", None)].result(timeout=5)
+    finally:
+        gateway._stop_subscription_queue()
+
+
+def test_subscribe_async_keeps_sending_after_a_rejected_symbol():
+    websocket = SlowWebsocketClient(reject="BAD")
+    gateway = _gateway(websocket)
+    try:
+        bad = gateway.subscribe_async(["BAD"], channels=("trades",))
+        good = gateway.subscribe_async(["TXFA4", "MXFA4"], channels=("trades",))
+        websocket.release.set()
+        with pytest.raises(ValueError, match="BAD"):
+            bad[("trades", "BAD", None)].result(timeout=5)
+        assert good[("trades", "TXFA4", None)].result(timeout=5) == "id-TXFA4"
+        assert good[("trades", "MXFA4", None)].result(timeout=5) == "id-MXFA4"
+        assert {"channel": "trades", "symbol": "MXFA4"} in websocket.subscribed
+    finally:
+        gateway._stop_subscription_queue()
+
+
+def test_stopping_queue_cancels_unsent_requests():
+    started = threading.Event()
+    release = threading.Event()
+
+    def send(action, channel, symbols, after_hours):
+        started.set()
+        release.wait(timeout=5)
+        return {symbol: None for symbol in symbols}
+
+    subscription_queue = SubscriptionQueue(send, window=0)
+    subscription_queue.start()
+    first = subscription_queue.submit(ACTION_SUBSCRIBE, [("books", "A", None)])
+    assert started.wait(timeout=5)
+    second = subscription_queue.submit(ACTION_SUBSCRIBE, [("books", "B", None)])
+    stopper = threading.Thread(target=subscription_queue.stop)
+    stopper.start()
+    release.set()
+    stopper.join(timeout=5)
+    assert first[0].result(timeout=1) is None
+    assert second[0].cancelled()
+    assert subscription_queue.stats()["pending"] == 0
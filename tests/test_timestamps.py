@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import vnpy_fubon  # noqa: F401
+from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer
+from vnpy_fubon.market import MarketAPI
+from vnpy_fubon.timestamps import (
+    FORMAT_EPOCH,
+    TAIPEI_TZ,
+    TimestampParser,
+    epoch_to_datetime,
+    utc_and_taipei,
+)
+
+EXPECTED = datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+
+
+class DummyClient:
+    pass
+
+
+def test_epoch_units_detected_by_magnitude():
+    assert epoch_to_datetime(1_700_000_000) == EXPECTED
+    assert epoch_to_datetime(1_700_000_000_000) == EXPECTED
+    assert epoch_to_datetime(1_700_000_000_000_123) == EXPECTED + timedelta(microseconds=123)
+    assert epoch_to_datetime(1_700_000_000_000_123_000) == EXPECTED + timedelta(microseconds=123)
+    assert epoch_to_datetime(1_700_000_000.5) == EXPECTED + timedelta(milliseconds=500)
+
+
+def test_parser_caches_format_per_source_and_counts_fallbacks():
+    parser = TimestampParser()
+    source = ("trades", "time")
+    assert parser.parse("2024/01/02 09:00:00", source=source) == datetime(
+        2024, 1, 2, 9, tzinfo=timezone.utc
+    )
+    assert parser.parse("2024/01/02 09:00:01", source=source).second == 1
+    assert parser.format_for(source) == "%Y/%m/%d %H:%M:%S"
+    assert parser.parse("1700000000000", source=("books", "time")) == EXPECTED
+    assert parser.format_for(("books", "time")) == FORMAT_EPOCH
+    assert parser.parse("2024-01-02T09:00:00Z").tzinfo is not None
+    assert parser.parse("20240102090000", naive_tz=None) == datetime(2024, 1, 2, 9)
+
+    assert parser.parse("not a time", source=source) is None
+    assert parser.parse(None, source=source) is None
+    stats = parser.stats()
+    assert stats["cache_hits"] == 1
+    assert stats["fallbacks"] == 2
+    assert stats["fallbacks_by_source"] == {source: 2}
+
+
+def test_taipei_conversion_uses_fixed_offset():
+    utc_dt, local_dt = utc_and_taipei(datetime(2024, 1, 2, 1, 0))
+    assert utc_dt.tzinfo is timezone.utc
+    assert local_dt.tzinfo is TAIPEI_TZ
+    assert local_dt.hour == 9
+
+
+def test_call_sites_share_parser_for_microsecond_epochs():
+    tick = MarketAPI(DummyClient()).to_tick({"symbol": "TXFA4", "time": 1_700_000_000_000_000})
+    assert tick.datetime == EXPECTED
+
+    trade = MarketEnvelopeNormalizer().normalize_trade(
+        {
+            "channel": "trades",
+            "data": {"symbol": "TXFA4", "price": 1, "size": 1, "time": "2023-11-15T06:13:20+08:00"},
+        }
+    )
+    assert trade.raw.event_ts_utc == EXPECTED
+    assert trade.raw.event_ts_local.utcoffset() == timedelta(hours=8)
@@ -0,0 +1,154 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from vnpy_fubon.gateway import FubonGateway
+from vnpy_fubon.ws_pool import SubscriptionPool, batch_keys, plan_subscriptions
+
+
+class RecordingEventEngine:
+    def __init__(self) -> None:
+        self.events = []
+
+    def put(self, event) -> None:
+        self.events.append(event)
+
+
+class StubWebsocketClient:
+    def __init__(self) -> None:
+        self.connected = False
+        self.subscribed: List[Dict[str, Any]] = []
+        self.unsubscribed: List[Dict[str, Any]] = []
+        self.handlers: Dict[str, Any] = {}
+
+    def connect(self) -> None:
+        self.connected = True
+
+    def on(self, event: str, handler) -> None:
+        self.handlers[event] = handler
+
+    def subscribe(self, payload: Dict[str, Any]) -> None:
+        self.subscribed.append(dict(payload))
+
+    def unsubscribe(self, payload: Dict[str, Any]) -> None:
+        self.unsubscribed.append(dict(payload))
+
+    def disconnect(self) -> None:
+        self.connected = False
+
+
+class PoolingSDK:
+    """Hands out a fresh websocket client on every ``init_realtime`` call, like fubon_neo."""
+
+    def __init__(self, *, shared: bool = False) -> None:
+        self.shared = shared
+        self.clients: List[StubWebsocketClient] = []
+        self.marketdata = None
+        self.init_realtime()
+
+    def init_realtime(self, *_args: Any, **_kwargs: Any) -> None:
+        if self.shared and self.clients:
+            return
+        client = StubWebsocketClient()
+        self.clients.append(client)
+        self.marketdata = SimpleNamespace(websocket_client=SimpleNamespace(futopt=client))
+
+
+def _subscribed_symbols(client: StubWebsocketClient) -> List[str]:
+    symbols: List[str] = []
+    for payload in client.subscribed:
+        symbols.extend(payload.get("symbols") or [payload["symbol"]])
+    return symbols
+
+
+def test_pool_fills_connections_in_order_and_rebalances():
+    pool = SubscriptionPool(max_subscriptions=2, max_connections=3)
+    keys = [("books", f"TXF{i}", None) for i in range(5)]
+    placement = pool.assign(keys)
+    assert {index: len(placed) for index, placed in placement.items()} == {0: 2, 1: 2, 2: 1}
+    assert pool.assign(keys[:1]) == {0: keys[:1]}
+
+    pool.release(keys[0])
+    pool.release(keys[1])
+    assert pool.assign([("trades", "MXF", None)]) == {0: [("trades", "MXF", None)]}
+
+    layout = pool.rebalance([0, 1])
+    assert sorted(len(placed) for placed in layout.values()) == [2, 2]
+    stats = pool.stats()
+    assert stats["per_connection"] == [2, 2, 0]
+    assert stats["rebalances"] == 1 and stats["over_cap"] == 0
+
+    pool.assign([("books", "EXTRA", None)])
+    moved = pool.shrink(1)
+    assert len(moved) == 3 and pool.stats()["per_connection"] == [5]
+
+
+def test_gateway_shards_subscriptions_and_recovers_dropped_connection(monkeypatch):
+    monkeypatch.setenv("FUBON_WS_CONNECTIONS", "3")
+    monkeypatch.setenv("FUBON_WS_MAX_SUBSCRIPTIONS", "2")
+    sdk = PoolingSDK()
+    gateway = FubonGateway(RecordingEventEngine(), client=sdk)
+    gateway._configure_ws_pool()
+    monkeypatch.setattr(gateway, "_start_token_refresh", lambda: None)
+    monkeypatch.setattr(gateway, "_start_ws_heartbeat", lambda: None)
+    monkeypatch.setattr(gateway, "_schedule_ws_reconnect", lambda: None)
+
+    symbols = [f"TXF{i}" for i in range(5)]
+    gateway.subscribe_quotes(symbols, channels=("books",))
+
+    assert [_subscribed_symbols(client) for client in sdk.clients] == [
+        symbols[:2],
+        symbols[2:4],
+        symbols[4:],
+    ]
+    stats = gateway.get_ws_pool_stats()
+    assert stats["per_connection"] == [2, 2, 1]
+    assert stats["connected"] == [True, True, True]
+
+    dropped = sdk.clients[1]
+    dropped.handlers["disconnect"]()
+    assert gateway.get_ws_pool_stats()["connected"] == [True, False, True]
+    dropped.subscribed.clear()
+    gateway._perform_ws_reconnect()
+    assert sorted(_subscribed_symbols(dropped)) == symbols[2:4]
+    assert len(sdk.clients[0].subscribed) == 1
+
+    gateway.unsubscribe_quotes(["TXF4"], channels=("books",))
+    assert sdk.clients[2].unsubscribed == [{"channel": "books", "symbol": "TXF4"}]
+    assert gateway.get_ws_pool_stats()["per_connection"] == [2, 2, 0]
+
+
+def test_gateway_keeps_single_connection_when_sdk_shares_client(monkeypatch):
+    monkeypatch.setenv("FUBON_WS_CONNECTIONS", "2")
+    monkeypatch.setenv("FUBON_WS_MAX_SUBSCRIPTIONS", "2")
+    sdk = PoolingSDK(shared=True)
+    gateway = FubonGateway(RecordingEventEngine(), client=sdk)
+    gateway._configure_ws_pool()
+    monkeypatch.setattr(gateway, "_start_token_refresh", lambda: None)
+    monkeypatch.setattr(gateway, "_start_ws_heartbeat", lambda: None)
+
+    gateway.subscribe_quotes(["A", "B", "C"], channels=("trades",))
+
+    assert len(sdk.clients) == 1
+    assert sorted(_subscribed_symbols(sdk.clients[0])) == ["A", "B", "C"]
+    stats = gateway.get_ws_pool_stats()
+    assert stats["max_connections"] == 1 and stats["per_connection"] == [3]
+    assert stats["over_cap"] == 1
+
+
+def test_plan_and_batch_session_switch():
+    day = [(symbol, False) for symbol in ("TXF", "MXF", "TXO1")]
+    night = [(symbol, True) for symbol in ("TXF", "MXF")] + [("TXO1", False)]
+    plan = plan_subscriptions(day, night)
+    assert plan.subscribe == (("TXF", True), ("MXF", True))
+    assert plan.unsubscribe == (("TXF", False), ("MXF", False))
+    assert plan.keep == (("TXO1", False),)
+    assert plan_subscriptions(night, night).empty
+
+    keys = [("books", f"S{i}", None) for i in range(5)] + [("trades", "S0", True)]
+    batches = batch_keys(keys, lambda key: (key[0], key[2]), size=2)
+    assert [(group, len(chunk)) for group, chunk in batches] == [
+        (("books", None), 2),
+        (("books", None), 2),
+        (("books", None), 1),
+        (("trades", True), 1),
+    ]
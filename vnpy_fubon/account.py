@@ -7,10 +7,12 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal
 from typing import Any, Iterable, List, Mapping, Optional
 
 from .exceptions import FubonSDKMethodNotFoundError
+from .numeric import to_decimal as _ensure_decimal
+from .rate_limit import ENDPOINT_ACCOUNT, RateLimiter
 from .vnpy_compat import (
     AccountData,
     ClosePositionRecord,
@@ -27,21 +29,6 @@ BALANCE_QUERY_METHODS = ("query_balances", "get_balance", "QueryBalance")
 LOGGER = logging.getLogger("vnpy_fubon.account")
 
 
-def _ensure_decimal(value: Any) -> Decimal:
-    if isinstance(value, Decimal):
-        return value
-    if value is None:
-        return Decimal("0")
-    if isinstance(value, (int, float)):
-        return Decimal(str(value))
-    if isinstance(value, str):
-        try:
-            return Decimal(value.replace(",", "").strip())
-        except InvalidOperation:
-            return Decimal("0")
-    return Decimal("0")
-
-
 def _normalize_exchange(raw: Any) -> Exchange:
     if isinstance(raw, Exchange):
         return raw
@@ -155,17 +142,27 @@ class AccountAPI:
         *,
         gateway_name: str = "Fubon",
         logger: Optional[logging.Logger] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
         self.client = client
         self.gateway_name = gateway_name
         self.logger = logger or LOGGER
+        self.rate_limiter = rate_limiter
+
+    def _throttle(self) -> None:
+        """Take an account-query token before calling the SDK."""
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(ENDPOINT_ACCOUNT)
 
     def query_account(self, **kwargs: Any) -> AccountData:
         method = self._resolve_method(ACCOUNT_QUERY_METHODS)
+        self._throttle()
         response = method(**kwargs)
         return self._to_account_data(response)
 
     def query_positions(self, *, account: Any = None, **kwargs: Any) -> List[PositionData]:
+        self._throttle()
         accounting = getattr(self.client, "futopt_accounting", None)
         target_account = account or kwargs.get("account")
 
@@ -188,6 +185,7 @@ class AccountAPI:
 
     def query_balances(self, **kwargs: Any) -> AccountData:
         method = self._resolve_method(BALANCE_QUERY_METHODS)
+        self._throttle()
         response = method(**kwargs)
         return self._to_account_data(response)
 
@@ -204,6 +202,7 @@ class AccountAPI:
             )
 
         account_id = _resolve_account_id(account) or "UNKNOWN"
+        self._throttle()
         response = method(account)
         if isinstance(response, Mapping) and "data" in response:
             entries = _extract_list(response.get("data"))
@@ -236,6 +235,7 @@ class AccountAPI:
             )
 
         account_id = _resolve_account_id(account) or "UNKNOWN"
+        self._throttle()
         try:
             if end_date is not None:
                 response = method(account, start_date, end_date)
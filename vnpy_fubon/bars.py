@@ -0,0 +1,285 @@
+"""
+Local tick-to-bar aggregation from the trades stream.
+
+Bars are anchored to trading-session starts (e.g. 08:45 for the TAIFEX day
+session, 15:00 for the night session) rather than to the wall-clock hour, and
+the last bucket of a session is truncated at the session end. A bar is
+published once a later trade arrives for the same symbol or its end time has
+passed (see :meth:`BarAggregator.close_due`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .vnpy_compat import BarData, Exchange, Interval
+
+LOGGER = logging.getLogger("vnpy_fubon.bars")
+
+DEFAULT_BAR_WINDOWS: Tuple[int, ...] = (1, 5, 15, 60)
+DEFAULT_CLOSE_CHECK_INTERVAL = 1.0
+
+Session = Tuple[time, time]
+BarCallback = Callable[[BarData], None]
+
+
+def parse_bar_windows(value: Any) -> Tuple[int, ...]:
+    """
+    Parse ``"1,5,15,60"`` (or an iterable of ints) into sorted unique minute windows.
+    """
+
+    if value in (None, ""):
+        return ()
+    items: Iterable[Any] = value.replace(";", ",").split(",") if isinstance(value, str) else value
+    windows = set()
+    for item in items:
+        text = str(item).strip().lower().rstrip("m")
+        if not text:
+            continue
+        try:
+            minutes = int(text)
+        except ValueError:
+            LOGGER.warning("Ignoring invalid bar window %r", item)
+            continue
+        if minutes > 0:
+            windows.add(minutes)
+    return tuple(sorted(windows))
+
+
+@dataclass
+class _BarState:
+    bar: BarData
+    end: datetime
+    trades: int = 0
+
+
+class BarAggregator:
+    """
+    Build session-anchored minute bars per symbol from individual trades.
+
+    ``sessions`` lists ``(start, end)`` local times; a start later than the end
+    marks an overnight session. Trades exactly at a session end fall into the
+    session's last bar; trades outside every session are counted and ignored.
+    """
+
+    def __init__(
+        self,
+        publish: BarCallback,
+        *,
+        sessions: Sequence[Session],
+        tz: tzinfo,
+        windows: Sequence[int] = DEFAULT_BAR_WINDOWS,
+        gateway_name: str = "Fubon",
+        close_check_interval: float = DEFAULT_CLOSE_CHECK_INTERVAL,
+        name: str = "fubon-bar-aggregator",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._publish = publish
+        self._sessions = tuple(sessions)
+        self._tz = tz
+        self.windows = tuple(sorted(set(int(window) for window in windows if int(window) > 0)))
+        self.gateway_name = gateway_name
+        self.close_check_interval = max(0.0, float(close_check_interval))
+        self._name = name
+        self.logger = logger or LOGGER
+        self._lock = threading.Lock()
+        self._bars: Dict[Tuple[str, int], _BarState] = {}
+        self._last_closed: Dict[Tuple[str, int], datetime] = {}
+        self._stats: Dict[str, int] = {"trades": 0, "bars": 0, "late": 0, "out_of_session": 0}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+
+    def start(self) -> None:
+        if self.close_check_interval <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the close timer; unfinished bars are discarded."""
+
+        self._stop_event.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None:
+            thread.join(timeout=max(1.0, self.close_check_interval * 2))
+        with self._lock:
+            self._bars.clear()
+            self._last_closed.clear()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.close_check_interval):
+            try:
+                self.close_due()
+            except Exception:
+                self.logger.exception("Closing due bars failed.")
+
+    # ------------------------------------------------------------------ #
+    # Aggregation
+
+    def session_bounds(self, moment: datetime) -> Optional[Tuple[str, datetime, datetime]]:
+        """
+        Return ``(session_name, start, end)`` containing ``moment`` (local tz), or ``None``.
+        """
+
+        local = moment.astimezone(self._tz) if moment.tzinfo else moment.replace(tzinfo=self._tz)
+        clock = local.time().replace(tzinfo=None)
+        today = local.date()
+        for start, end in self._sessions:
+            anchor: Optional[date] = None
+            if start <= end:
+                if start <= clock <= end:
+                    anchor = today
+            elif clock >= start:
+                anchor = today
+            elif clock <= end:
+                anchor = today - timedelta(days=1)
+            if anchor is None:
+                continue
+            session_start = datetime.combine(anchor, start, tzinfo=self._tz)
+            end_date = anchor if start <= end else anchor + timedelta(days=1)
+            session_end = datetime.combine(end_date, end, tzinfo=self._tz)
+            name = "day" if start <= end else "night"
+            return name, session_start, session_end
+        return None
+
+    def on_trade(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        moment: datetime,
+        price: float,
+        volume: float,
+    ) -> List[BarData]:
+        """
+        Fold one trade into every window; returns bars closed by it (already published).
+
+        Naive ``moment`` values are taken as session-local time.
+        """
+
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=self._tz)
+        bounds = self.session_bounds(moment)
+        price = float(price)
+        volume = float(volume)
+        closed: List[BarData] = []
+        with self._lock:
+            self._stats["trades"] += 1
+            if bounds is None:
+                self._stats["out_of_session"] += 1
+                return closed
+            session, session_start, session_end = bounds
+            elapsed = moment - session_start
+            for window in self.windows:
+                span = timedelta(minutes=window)
+                index = int(elapsed // span)
+                last_index = max(
+                    0, int((session_end - session_start - timedelta(microseconds=1)) // span)
+                )
+                bucket_start = session_start + span * min(index, last_index)
+                key = (symbol, window)
+                state = self._bars.get(key)
+                if state is not None:
+                    current_start = state.bar.datetime
+                    if bucket_start < current_start:
+                        self._stats["late"] += 1
+                        continue
+                    if bucket_start > current_start:
+                        closed.append(state.bar)
+                        self._last_closed[key] = current_start
+                        state = None
+                if state is None:
+                    last_closed = self._last_closed.get(key)
+                    if last_closed is not None and bucket_start <= last_closed:
+                        self._stats["late"] += 1
+                        continue
+                    state = self._new_state(
+                        symbol, exchange, window, session, bucket_start, session_end, price
+                    )
+                    self._bars[key] = state
+                bar = state.bar
+                if price > bar.high_price:
+                    bar.high_price = price
+                if price < bar.low_price:
+                    bar.low_price = price
+                bar.close_price = price
+                bar.volume += volume
+                bar.turnover += price * volume
+                state.trades += 1
+                bar.extra["trades"] = state.trades
+            self._stats["bars"] += len(closed)
+        self._emit(closed)
+        return closed
+
+    def close_due(self, now: Optional[datetime] = None) -> List[BarData]:
+        """
+        Publish bars whose end time is at or before ``now`` (default: current time).
+        """
+
+        now = now or datetime.now(timezone.utc)
+        with self._lock:
+            closed = []
+            for key in [key for key, state in self._bars.items() if state.end <= now]:
+                bar = self._bars.pop(key).bar
+                self._last_closed[key] = bar.datetime
+                closed.append(bar)
+            self._stats["bars"] += len(closed)
+        closed.sort(key=lambda bar: bar.datetime)
+        self._emit(closed)
+        return closed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_bars"] = len(self._bars)
+        return stats
+
+    def _new_state(
+        self,
+        symbol: str,
+        exchange: Exchange,
+        window: int,
+        session: str,
+        bucket_start: datetime,
+        session_end: datetime,
+        price: float,
+    ) -> _BarState:
+        interval = (
+            getattr(Interval, "HOUR", None) if window == 60 else getattr(Interval, "MINUTE", None)
+        )
+        bar = BarData(
+            gateway_name=self.gateway_name,
+            symbol=symbol,
+            exchange=exchange,
+            datetime=bucket_start,
+            interval=interval,
+            open_price=price,
+            high_price=price,
+            low_price=price,
+            close_price=price,
+        )
+        bar.extra = {"window": window, "session": session, "source": "trades", "trades": 0}
+        end = min(bucket_start + timedelta(minutes=window), session_end)
+        return _BarState(bar=bar, end=end)
+
+    def _emit(self, bars: Sequence[BarData]) -> None:
+        for bar in bars:
+            try:
+                self._publish(bar)
+            except Exception:
+                self.logger.exception("Publishing bar failed.")
+
+
+__all__ = [
+    "BarAggregator",
+    "DEFAULT_BAR_WINDOWS",
+    "parse_bar_windows",
+]
@@ -0,0 +1,134 @@
+"""
+Per-symbol conflation of order book updates.
+
+Only the latest book per ``vt_symbol`` is kept between flushes, which bounds
+event-engine queue growth when consumers fall behind on wide option chains.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+LOGGER = logging.getLogger("vnpy_fubon.conflation")
+
+DEFAULT_CONFLATION_INTERVAL_MS = 100
+
+PublishCallback = Callable[[Any, Optional[Mapping[str, Any]]], None]
+
+
+@dataclass
+class ConflationStats:
+    """Counters for conflated book updates."""
+
+    received: int = 0
+    coalesced: int = 0
+    published: int = 0
+    flushes: int = 0
+    pending: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "published": self.published,
+            "flushes": self.flushes,
+            "pending": self.pending,
+        }
+
+
+class TickConflator:
+    """
+    Keep the latest tick (and its raw payload) per key until flushed.
+
+    With ``interval`` > 0 a daemon thread flushes at that cadence (seconds);
+    with ``interval`` == 0 callers flush on demand via :meth:`flush`. Flushes
+    publish symbols in the order they first became pending.
+    """
+
+    def __init__(
+        self,
+        publish: PublishCallback,
+        *,
+        interval: float = DEFAULT_CONFLATION_INTERVAL_MS / 1000,
+        name: str = "fubon-book-conflation",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._publish = publish
+        self.interval = max(0.0, float(interval))
+        self._name = name
+        self.logger = logger or LOGGER
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[Any, Optional[Mapping[str, Any]]]] = {}
+        self._stats = ConflationStats()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, *, flush: bool = True) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        self._thread = None
+        if thread is not None:
+            thread.join(timeout=max(1.0, self.interval * 2))
+        if flush:
+            self.flush()
+
+    def offer(self, key: str, tick: Any, raw: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Record ``tick`` as the latest update for ``key``.
+        """
+
+        with self._lock:
+            self._stats.received += 1
+            if key in self._pending:
+                self._stats.coalesced += 1
+            self._pending[key] = (tick, raw)
+            self._stats.pending = len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Publish every pending update; returns how many were published.
+        """
+
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending = self._pending
+            self._pending = {}
+            self._stats.pending = 0
+            self._stats.flushes += 1
+
+        published = 0
+        for tick, raw in pending.values():
+            try:
+                self._publish(tick, raw)
+                published += 1
+            except Exception:
+                self.logger.exception("Publishing conflated tick failed.")
+        with self._lock:
+            self._stats.published += published
+        return published
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._stats.as_dict()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.flush()
+
+
+__all__ = [
+    "ConflationStats",
+    "DEFAULT_CONFLATION_INTERVAL_MS",
+    "TickConflator",
+]
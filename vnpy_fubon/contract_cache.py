@@ -0,0 +1,206 @@
+"""
+On-disk contract cache so ``connect()`` does not wait for the REST download.
+
+Contracts are stored in a small SQLite file, one JSON row per ``vt_symbol``,
+together with the schema version and the trading day they were fetched for.
+A cache written for another trading day or by another version is ignored.
+The trading day follows TAIFEX: the night session opening at 15:00 belongs to
+the next business day, so a restart at 16:00 does not reuse the day's list.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .timestamps import TAIPEI_TZ
+from .vnpy_compat import ContractData, Exchange, OptionType, Product
+
+LOGGER = logging.getLogger("vnpy_fubon.contract_cache")
+
+CACHE_VERSION = 2
+TRADING_DAY_ROLL = dt_time(15, 0)
+DEFAULT_CACHE_FILENAME = "fubon_contracts.sqlite3"
+
+# (contract, raw_symbol, raw_exchange), as produced by the REST mapping.
+ContractRecord = Tuple[ContractData, str, str]
+
+
+def trading_day_for(moment: Optional[datetime] = None) -> date:
+    """Return the TAIFEX trading day ``moment`` belongs to (weekends roll to Monday)."""
+
+    local = (moment or datetime.now(TAIPEI_TZ)).astimezone(TAIPEI_TZ)
+    day = local.date()
+    if local.time() >= TRADING_DAY_ROLL:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def _enum_name(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return getattr(value, "name", str(value))
+
+
+def _datetime_text(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _json_value(value: Any) -> Any:
+    """Return ``value`` as it reads back from the cache, so fresh and cached rows compare equal."""
+
+    if value is None:
+        return None
+    return json.loads(json.dumps(value, default=str))
+
+
+def contract_to_row(record: ContractRecord) -> Dict[str, Any]:
+    contract, raw_symbol, raw_exchange = record
+    return {
+        "symbol": contract.symbol,
+        "exchange": _enum_name(contract.exchange),
+        "name": contract.name,
+        "product": _enum_name(contract.product),
+        "size": contract.size,
+        "pricetick": contract.pricetick,
+        "min_volume": contract.min_volume,
+        "history_data": contract.history_data,
+        "option_strike": contract.option_strike,
+        "option_underlying": contract.option_underlying,
+        "option_type": _enum_name(contract.option_type),
+        "option_portfolio": contract.option_portfolio,
+        "option_listed": _datetime_text(contract.option_listed),
+        "option_expiry": _datetime_text(contract.option_expiry),
+        "extra": _json_value(getattr(contract, "extra", None)),
+        "raw_symbol": raw_symbol,
+        "raw_exchange": raw_exchange,
+    }
+
+
+def contract_from_row(row: Mapping[str, Any], gateway_name: str) -> ContractRecord:
+    contract = ContractData(
+        gateway_name=gateway_name,
+        symbol=row["symbol"],
+        exchange=Exchange[row["exchange"]],
+        name=row["name"],
+        product=Product[row["product"]],
+        size=row["size"],
+        pricetick=row["pricetick"],
+    )
+    contract.min_volume = row.get("min_volume", 1)
+    contract.history_data = bool(row.get("history_data"))
+    contract.option_strike = row.get("option_strike")
+    contract.option_underlying = row.get("option_underlying")
+    contract.option_portfolio = row.get("option_portfolio")
+    if row.get("option_type"):
+        contract.option_type = OptionType[row["option_type"]]
+    for field_name in ("option_listed", "option_expiry"):
+        if row.get(field_name):
+            setattr(contract, field_name, datetime.fromisoformat(row[field_name]))
+    if row.get("extra") is not None:
+        contract.extra = row["extra"]
+    return contract, row.get("raw_symbol") or contract.symbol, row.get("raw_exchange") or ""
+
+
+@dataclass(frozen=True)
+class ContractDiff:
+    """``vt_symbol`` lists describing how a fresh download differs from the cache."""
+
+    added: Tuple[str, ...]
+    changed: Tuple[str, ...]
+    removed: Tuple[str, ...]
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+def diff_contracts(old: Iterable[ContractRecord], new: Iterable[ContractRecord]) -> ContractDiff:
+    before = {record[0].vt_symbol: contract_to_row(record) for record in old}
+    after = {record[0].vt_symbol: contract_to_row(record) for record in new}
+    return ContractDiff(
+        added=tuple(sorted(key for key in after if key not in before)),
+        changed=tuple(
+            sorted(key for key, row in after.items() if key in before and before[key] != row)
+        ),
+        removed=tuple(sorted(key for key in before if key not in after)),
+    )
+
+
+class ContractCache:
+    """
+    Versioned SQLite store of contract rows keyed by trading day.
+
+    Every call opens its own connection, so the cache can be used from the
+    background refresh thread as well as from ``connect()``.
+    """
+
+    def __init__(self, path: Path | str, *, version: int = CACHE_VERSION) -> None:
+        self.path = Path(path).expanduser()
+        self.version = int(version)
+        self._lock = threading.Lock()
+
+    def load(self, trading_day: date, gateway_name: str) -> Optional[List[ContractRecord]]:
+        """Return cached records for ``trading_day``; ``None`` when missing, stale or unreadable."""
+
+        if not self.path.exists():
+            return None
+        try:
+            with self._lock, closing(sqlite3.connect(self.path)) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                if (
+                    meta.get("version") != str(self.version)
+                    or meta.get("trading_day") != trading_day.isoformat()
+                ):
+                    return None
+                rows = conn.execute("SELECT payload FROM contracts").fetchall()
+            return [contract_from_row(json.loads(payload), gateway_name) for (payload,) in rows]
+        except (sqlite3.Error, ValueError, KeyError, TypeError) as exc:
+            LOGGER.warning("Ignoring unreadable contract cache %s: %s", self.path, exc)
+            return None
+
+    def save(self, trading_day: date, records: Iterable[ContractRecord]) -> int:
+        """Replace the cached contracts in one transaction; returns the row count."""
+
+        rows = [(record[0].vt_symbol, json.dumps(contract_to_row(record))) for record in records]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS contracts (vt_symbol TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+            conn.execute("DELETE FROM contracts")
+            conn.executemany("INSERT INTO contracts (vt_symbol, payload) VALUES (?, ?)", rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("version", str(self.version)),
+                    ("trading_day", trading_day.isoformat()),
+                    ("saved_at", datetime.now(timezone.utc).isoformat()),
+                ],
+            )
+        return len(rows)
+
+
+__all__ = [
+    "CACHE_VERSION",
+    "ContractCache",
+    "ContractDiff",
+    "ContractRecord",
+    "DEFAULT_CACHE_FILENAME",
+    "contract_from_row",
+    "contract_to_row",
+    "diff_contracts",
+    "trading_day_for",
+]
@@ -0,0 +1,475 @@
+"""
+Bounded off-thread dispatch for websocket frames.
+
+The SDK callback only enqueues the raw frame; worker threads run the decode,
+normalise and publish work so a slow consumer cannot stall the socket reader.
+``ShardedDispatcher`` spreads frames over several single-worker queues by
+symbol hash so per-symbol ordering survives multiple workers.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Hashable, List, Mapping, Optional
+
+from .json_codec import decode_json
+
+LOGGER = logging.getLogger("vnpy_fubon.dispatch")
+
+DISPATCH_MODE_INLINE = "inline"
+DISPATCH_MODE_THREAD = "thread"
+DEFAULT_QUEUE_SIZE = 10000
+
+ConflationKey = Callable[[Any], Optional[Hashable]]
+ShardKey = Callable[[Any], Optional[str]]
+FrameSplitter = Callable[[Any], List[Any]]
+
+
+class OverflowPolicy(str, Enum):
+    """Behaviour when the ring buffer is full."""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+
+    @classmethod
+    def parse(cls, value: Any, default: Optional["OverflowPolicy"] = None) -> "OverflowPolicy":
+        text = str(value or "").strip().lower().replace("-", "_")
+        for item in cls:
+            if item.value == text:
+                return item
+        return default or cls.BLOCK
+
+
+@dataclass
+class DispatchStats:
+    """Counters describing dispatcher throughput and backpressure."""
+
+    enqueued: int = 0
+    processed: int = 0
+    dropped: int = 0
+    conflated: int = 0
+    errors: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+_CHANNEL_PATTERN = re.compile(r'"(?:channel|topic)"\s*:\s*"([^"]+)"')
+_SYMBOL_PATTERN = re.compile(r'"symbol"\s*:\s*"([^"]+)"')
+_CONFLATABLE_CHANNELS = frozenset({"books", "book", "quotes", "orderbook", "depth"})
+
+
+def frame_conflation_key(frame: Any) -> Optional[Hashable]:
+    """
+    Return ``(channel, symbol)`` for single-symbol order book frames, else ``None``.
+
+    Only book snapshots are safe to conflate; trades and multi-symbol frames are
+    never merged. The frame is scanned with regexes so nothing is decoded on the
+    callback thread.
+    """
+
+    if isinstance(frame, (bytes, bytearray)):
+        try:
+            frame = frame.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    if not isinstance(frame, str):
+        return None
+    channel_match = _CHANNEL_PATTERN.search(frame)
+    if not channel_match:
+        return None
+    channel = channel_match.group(1).lower()
+    if channel not in _CONFLATABLE_CHANNELS:
+        return None
+    symbols = _SYMBOL_PATTERN.findall(frame)
+    if len(symbols) != 1:
+        return None
+    return channel, symbols[0]
+
+
+def frame_shard_key(item: Any) -> Optional[str]:
+    """
+    Return the symbol used to pick a shard for a raw frame or decoded payload.
+
+    Only the first symbol is looked at; :class:`ShardedDispatcher` splits
+    multi-symbol frames with :func:`split_frame_by_symbol` before asking.
+    """
+
+    if isinstance(item, Mapping):
+        symbol = item.get("symbol")
+        if symbol is None:
+            nested = item.get("data")
+            if isinstance(nested, Mapping):
+                symbol = nested.get("symbol")
+        return str(symbol) if symbol is not None else None
+    if isinstance(item, (bytes, bytearray)):
+        item = item.decode("utf-8", errors="ignore")
+    if isinstance(item, str):
+        match = _SYMBOL_PATTERN.search(item)
+        return match.group(1) if match else None
+    return None
+
+
+def _entry_symbol(entry: Any) -> Optional[str]:
+    if not isinstance(entry, Mapping):
+        return None
+    symbol = entry.get("symbol")
+    if symbol is None:
+        nested = entry.get("data")
+        if isinstance(nested, Mapping):
+            symbol = nested.get("symbol")
+    return str(symbol) if symbol is not None else None
+
+
+def _group_by_symbol(entries: List[Any]) -> List[List[Any]]:
+    groups: Dict[Optional[str], List[Any]] = {}
+    for entry in entries:
+        groups.setdefault(_entry_symbol(entry), []).append(entry)
+    return list(groups.values())
+
+
+def split_frame_by_symbol(item: Any) -> List[Any]:
+    """
+    Split a frame carrying several symbols into one frame per symbol.
+
+    A ``data`` list (or a top-level list) is grouped by symbol in order of first
+    appearance, keeping the envelope, so each part can go to its own symbol's
+    shard. Single-symbol frames are returned unchanged; raw frames are only
+    decoded when the symbol scan finds more than one symbol, and their parts are
+    re-encoded so the handler still receives text.
+    """
+
+    raw = isinstance(item, (str, bytes, bytearray))
+    if raw:
+        text = (
+            item.decode("utf-8", errors="ignore") if isinstance(item, (bytes, bytearray)) else item
+        )
+        if len(set(_SYMBOL_PATTERN.findall(text))) <= 1:
+            return [item]
+        try:
+            decoded = decode_json(item)
+        except Exception:
+            return [item]
+    else:
+        decoded = item
+
+    if isinstance(decoded, Mapping) and isinstance(decoded.get("data"), list):
+        groups = _group_by_symbol(decoded["data"])
+        parts: List[Any] = [{**decoded, "data": group} for group in groups]
+    elif isinstance(decoded, list):
+        parts = _group_by_symbol(decoded)
+    else:
+        return [item]
+    if len(parts) <= 1:
+        return [item]
+    if raw:
+        return [json.dumps(part, ensure_ascii=False) for part in parts]
+    return parts
+
+
+def shard_for(key: Optional[str], shards: int) -> int:
+    """
+    Stable shard index for ``key`` (crc32, so it is consistent across processes).
+    """
+
+    if shards <= 1 or key is None:
+        return 0
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+class FrameDispatcher:
+    """
+    Ring buffer with worker threads and a selectable overflow policy.
+
+    ``submit`` is safe to call from the SDK callback thread; ``handler`` runs on
+    the worker threads. Under ``CONFLATE`` a frame whose key is already queued
+    replaces the queued frame in place; frames without a key fall back to
+    dropping the oldest entry when the buffer is full. With ``stamp`` set,
+    ``stamp()`` is taken on submit and the handler is called as
+    ``handler(item, stamp)`` so queueing time can be measured.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], None],
+        *,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        workers: int = 1,
+        conflation_key: Optional[ConflationKey] = frame_conflation_key,
+        stamp: Optional[Callable[[], Any]] = None,
+        name: str = "fubon-ws-dispatch",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._handler = handler
+        self._stamp = stamp
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.workers = max(1, int(workers))
+        self._conflation_key = conflation_key
+        self._name = name
+        self.logger = logger or LOGGER
+
+        # Each slot is ``[key, item, stamp]`` so conflation can swap the item without moving it.
+        self._buffer: Deque[List[Any]] = deque()
+        self._pending: Dict[Hashable, List[Any]] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._stats = DispatchStats()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._threads = [
+                threading.Thread(target=self._run, name=f"{self._name}-{index}", daemon=True)
+                for index in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, *, drain: bool = True, timeout: float = 2.0) -> None:
+        """
+        Stop the workers; queued frames are processed first when ``drain`` is true.
+        """
+
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            if not drain:
+                self._stats.dropped += len(self._buffer)
+                self._buffer.clear()
+                self._pending.clear()
+                self._stats.queue_depth = 0
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Producer side
+
+    def submit(self, item: Any) -> bool:
+        """
+        Enqueue ``item``; returns ``False`` when it was dropped.
+        """
+
+        stamp = self._stamp() if self._stamp is not None else None
+        key: Optional[Hashable] = None
+        if self.policy is OverflowPolicy.CONFLATE and self._conflation_key is not None:
+            try:
+                key = self._conflation_key(item)
+            except Exception:  # pragma: no cover - defensive
+                key = None
+
+        with self._cond:
+            if not self._running:
+                self._stats.dropped += 1
+                return False
+            if key is not None:
+                slot = self._pending.get(key)
+                if slot is not None:
+                    slot[1] = item
+                    slot[2] = stamp
+                    self._stats.conflated += 1
+                    return True
+
+            if len(self._buffer) >= self.maxsize:
+                if self.policy is OverflowPolicy.BLOCK:
+                    while self._running and len(self._buffer) >= self.maxsize:
+                        self._cond.wait()
+                    if not self._running:
+                        self._stats.dropped += 1
+                        return False
+                else:
+                    evicted = self._buffer.popleft()
+                    if evicted[0] is not None:
+                        self._pending.pop(evicted[0], None)
+                    self._stats.dropped += 1
+
+            slot = [key, item, stamp]
+            self._buffer.append(slot)
+            if key is not None:
+                self._pending[key] = slot
+            self._stats.enqueued += 1
+            depth = len(self._buffer)
+            self._stats.queue_depth = depth
+            if depth > self._stats.max_queue_depth:
+                self._stats.max_queue_depth = depth
+            self._cond.notify()
+            return True
+
+    # ------------------------------------------------------------------
+    # Consumer side
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._buffer:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                key, item, stamp = self._buffer.popleft()
+                if key is not None:
+                    self._pending.pop(key, None)
+                self._stats.queue_depth = len(self._buffer)
+                self._cond.notify_all()
+            try:
+                if self._stamp is not None:
+                    self._handler(item, stamp)
+                else:
+                    self._handler(item)
+            except Exception:
+                self.logger.exception("Websocket dispatch handler raised an exception.")
+                with self._cond:
+                    self._stats.errors += 1
+                continue
+            with self._cond:
+                self._stats.processed += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return self._stats.as_dict()
+
+
+class ShardedDispatcher:
+    """
+    ``shards`` single-worker :class:`FrameDispatcher` queues selected by symbol hash.
+
+    Every frame for a symbol lands on the same queue and worker, which keeps
+    per-symbol ordering while different symbols are handled concurrently.
+    Frames carrying several symbols are split by ``splitter`` first so each
+    symbol's part queues behind that symbol's earlier frames. ``maxsize``
+    applies to each shard.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], None],
+        *,
+        shards: int = 2,
+        shard_key: ShardKey = frame_shard_key,
+        splitter: Optional[FrameSplitter] = split_frame_by_symbol,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        conflation_key: Optional[ConflationKey] = frame_conflation_key,
+        stamp: Optional[Callable[[], Any]] = None,
+        name: str = "fubon-ws-shard",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.shards = max(1, int(shards))
+        self.policy = policy
+        self._shard_key = shard_key
+        self._splitter = splitter
+        self._dispatchers = [
+            FrameDispatcher(
+                handler,
+                maxsize=maxsize,
+                policy=policy,
+                workers=1,
+                conflation_key=conflation_key,
+                stamp=stamp,
+                name=f"{name}-{index}",
+                logger=logger,
+            )
+            for index in range(self.shards)
+        ]
+
+    @property
+    def maxsize(self) -> int:
+        return self._dispatchers[0].maxsize
+
+    @property
+    def workers(self) -> int:
+        return self.shards
+
+    @property
+    def running(self) -> bool:
+        return any(dispatcher.running for dispatcher in self._dispatchers)
+
+    def start(self) -> None:
+        for dispatcher in self._dispatchers:
+            dispatcher.start()
+
+    def stop(self, *, drain: bool = True, timeout: float = 2.0) -> None:
+        for dispatcher in self._dispatchers:
+            dispatcher.stop(drain=drain, timeout=timeout)
+
+    def submit(self, item: Any) -> bool:
+        """
+        Enqueue ``item`` (or each of its per-symbol parts); ``False`` if any part was dropped.
+        """
+
+        parts = [item]
+        if self._splitter is not None and self.shards > 1:
+            try:
+                parts = self._splitter(item)
+            except Exception:  # pragma: no cover - defensive
+                parts = [item]
+        accepted = True
+        for part in parts:
+            try:
+                key = self._shard_key(part)
+            except Exception:  # pragma: no cover - defensive
+                key = None
+            accepted = self._dispatchers[shard_for(key, self.shards)].submit(part) and accepted
+        return accepted
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate counters across shards plus a ``per_shard`` breakdown.
+        """
+
+        per_shard = [dispatcher.stats() for dispatcher in self._dispatchers]
+        totals: Dict[str, Any] = {
+            key: sum(item[key] for item in per_shard)
+            for key in per_shard[0]
+            if key != "max_queue_depth"
+        }
+        totals["max_queue_depth"] = max(item["max_queue_depth"] for item in per_shard)
+        totals["shards"] = self.shards
+        totals["per_shard"] = per_shard
+        return totals
+
+
+__all__ = [
+    "DEFAULT_QUEUE_SIZE",
+    "DISPATCH_MODE_INLINE",
+    "DISPATCH_MODE_THREAD",
+    "DispatchStats",
+    "FrameDispatcher",
+    "OverflowPolicy",
+    "ShardedDispatcher",
+    "frame_conflation_key",
+    "frame_shard_key",
+    "shard_for",
+    "split_frame_by_symbol",
+]
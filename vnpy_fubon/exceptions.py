@@ -4,6 +4,8 @@ Custom exceptions raised by the vnpy_fubon package.
 
 from __future__ import annotations
 
+from typing import Any, Sequence
+
 
 class FubonConfigurationError(Exception):
     """
@@ -27,3 +29,20 @@ class FubonLoginError(RuntimeError):
     """
     Raised when the SDK reports an authentication or session initialisation failure.
     """
+
+
+class FubonRateLimitError(RuntimeError):
+    """
+    Raised when a call would wait longer than allowed for its rate-limit budget.
+    """
+
+
+class FubonContractDownloadError(RuntimeError):
+    """
+    Raised when some contract queries failed; ``records`` holds what the others returned.
+    """
+
+    def __init__(self, message: str, records: Sequence[Any] = (), failed: Sequence[str] = ()) -> None:
+        super().__init__(message)
+        self.records = list(records)
+        self.failed = list(failed)
@@ -0,0 +1,288 @@
+"""
+Online sequence gap detection and bounded background backfill.
+
+The detector remembers the last sequence number per ``(symbol, channel)`` and
+reports a :class:`GapEvent` as soon as a message skips ahead, so lost trades
+or book updates surface during the session rather than in the next offline
+``verify_gap`` run. :class:`GapBackfiller` runs recovery calls on a single
+worker thread behind a bounded queue; when the queue is full further gaps are
+counted and dropped instead of piling up REST requests.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+LOGGER = logging.getLogger("vnpy_fubon.gaps")
+
+DEFAULT_MAX_TRACKED = 20_000
+DEFAULT_RECENT_GAPS = 256
+DEFAULT_BACKFILL_PENDING = 64
+DEFAULT_RESTART_JUMP = 100
+
+GapKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class GapEvent:
+    """
+    A run of missing sequence numbers, shaped like a ``reconcile_log`` row.
+
+    ``start_seq``/``end_seq`` are the first and last missing values (inclusive);
+    the timestamps are those of the messages on either side of the gap.
+    """
+
+    symbol: str
+    channel: str
+    start_seq: int
+    end_seq: int
+    start_ts_utc: Optional[datetime]
+    end_ts_utc: Optional[datetime]
+    detected_at: datetime
+
+    @property
+    def missing(self) -> int:
+        return self.end_seq - self.start_seq + 1
+
+
+class SequenceGapDetector:
+    """
+    Track the last sequence per ``(symbol, channel)`` and flag forward jumps.
+
+    Repeated or older sequence numbers are counted as duplicates and ignored,
+    except that a value at or below ``restart_floor``, or more than
+    ``restart_jump`` below the last one, re-bases the stream (vendor sequences
+    restart with each trading session, not always from 1). At most
+    ``max_tracked`` streams are followed; further streams are counted as
+    untracked.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_tracked: int = DEFAULT_MAX_TRACKED,
+        recent: int = DEFAULT_RECENT_GAPS,
+        restart_floor: int = 1,
+        restart_jump: int = DEFAULT_RESTART_JUMP,
+    ) -> None:
+        self.max_tracked = max(1, int(max_tracked))
+        self.restart_floor = int(restart_floor)
+        self.restart_jump = max(1, int(restart_jump))
+        self._lock = threading.Lock()
+        self._last: Dict[GapKey, Tuple[int, Optional[datetime]]] = {}
+        self._recent: Deque[GapEvent] = deque(maxlen=max(1, int(recent)))
+        self._stats: Dict[str, int] = {
+            "observed": 0,
+            "gaps": 0,
+            "missing": 0,
+            "duplicates": 0,
+            "restarts": 0,
+            "untracked": 0,
+        }
+
+    def observe(
+        self,
+        symbol: str,
+        channel: str,
+        seq: Optional[int],
+        ts: Optional[datetime] = None,
+    ) -> Optional[GapEvent]:
+        """
+        Record ``seq`` for the stream; returns a :class:`GapEvent` when values were skipped.
+        """
+
+        if seq is None:
+            return None
+        key = (symbol, channel)
+        with self._lock:
+            self._stats["observed"] += 1
+            last = self._last.get(key)
+            if last is None:
+                if len(self._last) >= self.max_tracked:
+                    self._stats["untracked"] += 1
+                    return None
+                self._last[key] = (seq, ts)
+                return None
+            last_seq, last_ts = last
+            if seq == last_seq + 1:
+                self._last[key] = (seq, ts)
+                return None
+            if seq <= last_seq:
+                if seq <= self.restart_floor < last_seq or last_seq - seq > self.restart_jump:
+                    self._stats["restarts"] += 1
+                    self._last[key] = (seq, ts)
+                else:
+                    self._stats["duplicates"] += 1
+                return None
+            self._last[key] = (seq, ts)
+            gap = GapEvent(
+                symbol=symbol,
+                channel=channel,
+                start_seq=last_seq + 1,
+                end_seq=seq - 1,
+                start_ts_utc=last_ts,
+                end_ts_utc=ts,
+                detected_at=datetime.now(timezone.utc),
+            )
+            self._stats["gaps"] += 1
+            self._stats["missing"] += gap.missing
+            self._recent.append(gap)
+        return gap
+
+    def last_seq(self, symbol: str, channel: str) -> Optional[int]:
+        with self._lock:
+            last = self._last.get((symbol, channel))
+        return last[0] if last else None
+
+    def reset(self, symbol: Optional[str] = None, channel: Optional[str] = None) -> None:
+        """Forget tracked streams matching ``symbol``/``channel`` (all when both are ``None``)."""
+
+        with self._lock:
+            if symbol is None and channel is None:
+                self._last.clear()
+                return
+            for key in [
+                key
+                for key in self._last
+                if (symbol is None or key[0] == symbol) and (channel is None or key[1] == channel)
+            ]:
+                del self._last[key]
+
+    def recent(self) -> List[GapEvent]:
+        """Return the most recent gaps, oldest first."""
+
+        with self._lock:
+            return list(self._recent)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tracked"] = len(self._last)
+        return stats
+
+
+GapFetch = Callable[[GapEvent], Any]
+GapDone = Callable[[GapEvent, Any, Optional[BaseException]], None]
+
+_STOP = object()
+
+
+class GapBackfiller:
+    """
+    Run ``fetch(gap)`` for submitted gaps on one background thread.
+
+    ``on_done(gap, result, error)`` is called after each attempt from the
+    worker thread. ``submit`` never blocks: it returns ``False`` once
+    ``max_pending`` gaps are queued or the worker is stopped.
+    """
+
+    def __init__(
+        self,
+        fetch: GapFetch,
+        *,
+        on_done: Optional[GapDone] = None,
+        max_pending: int = DEFAULT_BACKFILL_PENDING,
+        name: str = "fubon-gap-backfill",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._fetch = fetch
+        self._on_done = on_done
+        self.max_pending = max(1, int(max_pending))
+        self._name = name
+        self.logger = logger or LOGGER
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.max_pending + 1)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {"submitted": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker; queued gaps that have not started are discarded."""
+
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            self._running = False
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._pending -= 1
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout=timeout)
+
+    def submit(self, gap: GapEvent) -> bool:
+        with self._lock:
+            if not self._running or self._pending >= self.max_pending:
+                self._stats["dropped"] += 1
+                return False
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._queue.put_nowait(gap)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        return stats
+
+    def _run(self) -> None:
+        while True:
+            gap = self._queue.get()
+            if gap is _STOP:
+                return
+            result: Any = None
+            error: Optional[BaseException] = None
+            try:
+                result = self._fetch(gap)
+            except Exception as exc:
+                error = exc
+                self.logger.warning(
+                    "Backfill for %s %s seq %s-%s failed: %s",
+                    gap.symbol,
+                    gap.channel,
+                    gap.start_seq,
+                    gap.end_seq,
+                    exc,
+                )
+            with self._lock:
+                self._pending -= 1
+                self._stats["failed" if error is not None else "completed"] += 1
+            if self._on_done is not None:
+                try:
+                    self._on_done(gap, result, error)
+                except Exception:
+                    self.logger.exception("Backfill completion callback failed.")
+
+
+__all__ = [
+    "DEFAULT_BACKFILL_PENDING",
+    "DEFAULT_MAX_TRACKED",
+    "DEFAULT_RESTART_JUMP",
+    "GapBackfiller",
+    "GapEvent",
+    "SequenceGapDetector",
+]
@@ -8,12 +8,15 @@ from __future__ import annotations
 import json
 import logging
 import os
+import sys
 import threading
 import time
 from datetime import datetime, timezone, timedelta, time as dt_time, date as dt_date
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from threading import Timer
-from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 from math import ceil
 
 try:  # pragma: no cover - optional vn.py dependency
@@ -27,13 +30,71 @@ if not isinstance(_VN_GLOBAL_SETTINGS, Mapping):
         _VN_GLOBAL_SETTINGS = {}
 GLOBAL_SETTINGS: Mapping[str, Any] = _VN_GLOBAL_SETTINGS  # type: ignore[assignment]
 
-from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer
+from adapters.fubon_to_vnpy import MarketEnvelopeNormalizer, NormalizedTrade
 from .account import AccountAPI
 from .fubon_connect import FubonAPIConnector, create_authenticated_client
+from .gaps import GapBackfiller, GapEvent, SequenceGapDetector
+from .bars import BarAggregator, parse_bar_windows
+from .contract_cache import (
+    DEFAULT_CACHE_FILENAME,
+    ContractCache,
+    ContractDiff,
+    ContractRecord,
+    diff_contracts,
+    trading_day_for,
+)
+from .conflation import DEFAULT_CONFLATION_INTERVAL_MS, TickConflator
+from .exceptions import FubonContractDownloadError
+from .dispatch import (
+    DEFAULT_QUEUE_SIZE,
+    DISPATCH_MODE_INLINE,
+    DISPATCH_MODE_THREAD,
+    FrameDispatcher,
+    OverflowPolicy,
+    ShardedDispatcher,
+)
+from .json_codec import DECODER_ENV_KEY, get_json_decoder
+from .latency import LatencyTracker, ReceiveStamp, parse_warn_ms, receive_stamp
 from .logging_config import configure_logging
-from .market import MarketAPI
+from .market import MarketAPI, MarketRawView
+from .numeric import NUMERIC_ENV_KEY, get_number_converter, resolve_numeric_mode
 from .order import OrderAPI
-from .normalization import normalize_exchange, normalize_product, normalize_symbol
+from .orderbook import OrderBookEngine, apply_levels_to_tick, book_seq_from_payload
+from .normalization import (
+    get_normalization_cache_stats,
+    normalize_exchange,
+    normalize_product,
+    normalize_symbol,
+    vt_symbol_from_parts,
+)
+from .option_chain import OptionChainIndex
+from .product_index import ProductIndex
+from .rate_limit import (
+    DEFAULT_ACCOUNT_RATE_PER_SEC,
+    DEFAULT_ORDER_MAX_WAIT_MS,
+    DEFAULT_ORDER_RATE_PER_SEC,
+    DEFAULT_REST_RATE_PER_SEC,
+    DEFAULT_REST_WORKERS,
+    ENDPOINT_ACCOUNT,
+    ENDPOINT_MARKET_DATA,
+    ENDPOINT_ORDER,
+    RateLimiter,
+)
+from .subscriptions import (
+    ACTION_SUBSCRIBE,
+    ACTION_UNSUBSCRIBE,
+    DEFAULT_SUBSCRIBE_WINDOW_MS,
+    SubscriptionQueue,
+)
+from .timestamps import parse_timestamp
+from .ws_pool import (
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_SUBSCRIPTIONS,
+    VENDOR_MAX_CONNECTIONS,
+    SubscriptionKey,
+    SubscriptionPool,
+    batch_keys,
+)
 from .vnpy_compat import (
     AccountData,
     BaseGateway,
@@ -41,6 +102,7 @@ from .vnpy_compat import (
     EVENT_CONTRACT,
     EVENT_ACCOUNT,
     EVENT_LOG,
+    EVENT_FUBON_BAR,
     EVENT_FUBON_MARKET_RAW,
     EVENT_ORDER,
     EVENT_POSITION,
@@ -80,7 +142,18 @@ DAY_SESSION_START = dt_time(8, 45)
 DAY_SESSION_END = dt_time(13, 45)
 NIGHT_SESSION_START = dt_time(15, 0)
 NIGHT_SESSION_END = dt_time(5, 0)
+RAW_EMIT_AUTO = "auto"
+RAW_EMIT_ALWAYS = "always"
+RAW_EMIT_NEVER = "never"
 DEFAULT_REST_CANDLES_LIMIT = 2000
+DEFAULT_GAP_BACKFILL_LIMIT = 500
+BOOK_RESUBSCRIBE_ATTEMPTS = 5
+CONTRACT_QUERY_PARAMS: Tuple[Mapping[str, str], ...] = (
+    {"type": "FUTURE", "session": "REGULAR"},
+    {"type": "FUTURE", "session": "AFTERHOURS"},
+    {"type": "OPTION", "session": "REGULAR"},
+    {"type": "OPTION", "session": "AFTERHOURS"},
+)
 
 class FubonGateway(BaseGateway):
     """
@@ -117,6 +190,19 @@ class FubonGateway(BaseGateway):
         self.account_map: dict[str, Any] = {}
         self.account_metadata: dict[str, Mapping[str, Any]] = {}
         self.contracts: Dict[str, ContractData] = {}
+        # Contracts dropped by a refresh, flagged ``extra["expired"]``.
+        self.expired_contracts: Dict[str, ContractData] = {}
+        self._contract_records: Dict[str, ContractRecord] = {}
+        self._contract_lock = threading.Lock()
+        self._contract_generation = 0
+        self._contract_refresh_interval = 0.0
+        self._contract_refresh_timer: Optional[Timer] = None
+        self._last_contract_refresh: Dict[str, Any] = {}
+        self._option_chain: OptionChainIndex[ContractData] = OptionChainIndex()
+        self._contract_cache: Optional[ContractCache] = None
+        self._contract_refresh_thread: Optional[threading.Thread] = None
+        self._rate_limiter = RateLimiter()
+        self._rest_workers = DEFAULT_REST_WORKERS
         self._symbol_aliases: Dict[str, str] = {}
         self._symbol_exchange_aliases: Dict[Tuple[str, str], str] = {}
         self._default_exchange_code = os.getenv("FUBON_EXCHANGE", "TAIFEX")
@@ -134,15 +220,33 @@ class FubonGateway(BaseGateway):
         self._active_subscriptions: Set[Tuple[str, str, Optional[bool]]] = set()
         self._subscription_ids_by_key: Dict[Tuple[str, str, Optional[bool]], str] = {}
         self._subscription_key_by_id: Dict[str, Tuple[str, str, Optional[bool]]] = {}
+        # Extra pooled connections; index 0 is always ``_ws_client`` above.
+        self._ws_pool = SubscriptionPool()
+        self._ws_pool_clients: Dict[int, Any] = {}
+        self._ws_pool_connected: Dict[int, bool] = {}
+        self._last_resubscribe: Dict[str, Any] = {}
+        self._subscription_queue: Optional[SubscriptionQueue] = None
+        self._subscribe_window_ms = float(DEFAULT_SUBSCRIBE_WINDOW_MS)
+        self._subscribe_nonblocking = False
         self._ws_reconnect_attempts = 0
         self._ws_reconnect_timer: Optional[Timer] = None
         self._ws_ping_timer: Optional[Timer] = None
         self._ws_ping_interval = int(os.getenv("FUBON_WS_PING_INTERVAL", "30"))
+        self._ws_dispatcher: Optional[FrameDispatcher | ShardedDispatcher] = None
+        self._book_conflator: Optional[TickConflator] = None
+        self._book_engine: Optional[OrderBookEngine] = None
+        self._bar_aggregator: Optional[BarAggregator] = None
+        self._gap_detector: Optional[SequenceGapDetector] = None
+        self._gap_backfiller: Optional[GapBackfiller] = None
+        self._latency_tracker: Optional[LatencyTracker] = None
+        self._raw_emit_mode = os.getenv("FUBON_EMIT_RAW", RAW_EMIT_ALWAYS).strip().lower()
+        self._raw_handlers: list[Callable[[Any], None]] = []
         self._closing = False
         self._ws_sdk_callbacks: list[Tuple[str, Callable[..., None]]] = []
         self._token_timer: Optional[Timer] = None
         self._token_refresh_interval = 900  # seconds; aligns with 15-minute default heartbeat
         self._market_normalizer: Optional[MarketEnvelopeNormalizer] = None
+        self._numeric_mode = resolve_numeric_mode()
         self._preferred_ws_mode = os.getenv("FUBON_REALTIME_MODE", "Normal")
         self._normal_mode_warning_emitted = False
         self._subscription_warning_emitted = False
@@ -216,24 +320,55 @@ class FubonGateway(BaseGateway):
 
         self._populate_account_metadata(preferred_account_setting)
 
-        self.account_api = AccountAPI(self.client, gateway_name=self.gateway_name, logger=self.logger)
+        self._configure_rate_limiter(setting)
+        self.account_api = AccountAPI(
+            self.client,
+            gateway_name=self.gateway_name,
+            logger=self.logger,
+            rate_limiter=self._rate_limiter,
+        )
         self.order_api = OrderAPI(
             self.client,
             account_id=self.primary_account_id,
             account_lookup=self.account_map,
             gateway_name=self.gateway_name,
             logger=self.logger,
+            rate_limiter=self._rate_limiter,
         )
         if self.primary_account_id:
             self.order_api.account_id = self.primary_account_id
         if self.order_api:
             self.order_api.set_account_lookup(self.account_map)
-        self.market_api = MarketAPI(self.client, gateway_name=self.gateway_name, logger=self.logger)
+        decoder_name = self._resolve_config_value("json_decoder", setting, env_key=DECODER_ENV_KEY)
+        self._numeric_mode = resolve_numeric_mode(
+            self._resolve_config_value("numeric_mode", setting, env_key=NUMERIC_ENV_KEY)
+        )
+        self._market_normalizer = None
+        self.market_api = MarketAPI(
+            self.client,
+            gateway_name=self.gateway_name,
+            logger=self.logger,
+            decoder=get_json_decoder(decoder_name) if decoder_name else None,
+            numeric_mode=self._numeric_mode,
+        )
+        self._raw_emit_mode = (
+            self._resolve_config_value("emit_raw", setting, env_key="FUBON_EMIT_RAW") or RAW_EMIT_ALWAYS
+        ).lower()
+        self._start_latency_tracking(setting)
+        self._start_ws_dispatcher(setting)
+        self._start_book_conflation(setting)
+        self._start_book_engine(setting)
+        self._start_bar_aggregation(setting)
+        self._start_gap_detection(setting)
+        self._configure_ws_pool(setting)
+        self._configure_subscription_queue(setting)
 
         self._register_order_callbacks()
         self._prepare_realtime()
         self._ensure_websocket_client(register_handler=True)
         self._start_token_refresh()
+        self._configure_contract_cache(setting)
+        self._configure_contract_refresh(setting)
         self._load_and_publish_contracts()
 
         self.write_log("Fubon gateway connected.", state="connected")
@@ -246,14 +381,26 @@ class FubonGateway(BaseGateway):
         self._closing = True
         self.write_log("Closing Fubon gateway...", state="closing")
         self._cancel_ws_reconnect()
+        self._stop_subscription_queue()
         self._disconnect_websocket()
+        self._stop_ws_dispatcher()
+        self._stop_book_conflation()
+        self._book_engine = None
+        self._stop_bar_aggregation()
+        self._stop_gap_detection()
         self.accounts.clear()
         self.primary_account = None
         self.primary_account_id = None
         self.account_api = None
         self.order_api = None
         self.market_api = None
+        self._cancel_contract_refresh()
+        self._contract_generation += 1
+        self._contract_refresh_thread = None
         self.contracts.clear()
+        self.expired_contracts.clear()
+        self._contract_records.clear()
+        self._option_chain = OptionChainIndex()
         self._symbol_aliases.clear()
         self._symbol_exchange_aliases.clear()
         self._subscription_ids_by_key.clear()
@@ -262,6 +409,9 @@ class FubonGateway(BaseGateway):
         self._closing = False
 
     def subscribe(self, req: SubscribeRequest, *, channels: Optional[Sequence[str]] = None, after_hours: Optional[bool] = None) -> None:
+        if self._subscribe_nonblocking:
+            self.subscribe_async([req.symbol], channels=channels, after_hours=after_hours)
+            return
         self.subscribe_quotes([req.symbol], channels=channels, after_hours=after_hours)
 
     def subscribe_quotes(
@@ -271,7 +421,23 @@ class FubonGateway(BaseGateway):
         channels: Optional[Sequence[str]] = None,
         after_hours: Optional[bool] = None,
     ) -> None:
-        client = self._ensure_websocket_client(register_handler=True)
+        self._subscribe_quotes(symbols, channels=channels, after_hours=after_hours)
+
+    def _subscribe_quotes(
+        self,
+        symbols: Sequence[str],
+        *,
+        channels: Optional[Sequence[str]] = None,
+        after_hours: Optional[bool] = None,
+        errors: Optional[Dict[str, Exception]] = None,
+    ) -> None:
+        """
+        Body of :meth:`subscribe_quotes`.
+
+        With ``errors`` given, a rejected symbol is recorded there and the rest are still sent.
+        """
+
+        self._ensure_websocket_client(register_handler=True)
         payload_channels = list(channels or ("books",))
 
         unique_symbols: list[str] = []
@@ -289,7 +455,8 @@ class FubonGateway(BaseGateway):
         if requires_normal and not self._is_normal_mode() and not self._normal_mode_warning_emitted:
             warning = (
                 "SDK realtime mode is not Normal; aggregates/candles subscriptions may be rejected. "
-                "Set FUBON_REALTIME_MODE=Normal before connecting."
+                "Set FUBON_REALTIME_MODE=Normal before connecting, or set FUBON_BAR_INTERVALS to build "
+                "bars locally from trades."
             )
             self.logger.warning(warning, extra={"gateway_state": "ws_mode_warning"})
             self._put_event(EVENT_LOG, warning)
@@ -305,76 +472,77 @@ class FubonGateway(BaseGateway):
                 continue
 
             projected_total = len(self._active_subscriptions) + len(pending_symbols)
-            if projected_total > 200 and not self._subscription_warning_emitted:
+            if projected_total > self._ws_pool.capacity and not self._subscription_warning_emitted:
                 message = (
                     f"Websocket subscriptions approaching vendor limit (current={len(self._active_subscriptions)}, "
-                    f"projected={projected_total}). Consider reducing channels per connection."
+                    f"projected={projected_total}, capacity={self._ws_pool.capacity}). "
+                    "Consider reducing channels per connection or raising FUBON_WS_CONNECTIONS."
                 )
                 self.logger.warning(message, extra={"gateway_state": "subscription_warning"})
                 self._put_event(EVENT_LOG, message)
                 self._subscription_warning_emitted = True
 
-            batch_completed = False
-            if len(pending_symbols) > 1:
-                batch_message = {"channel": channel, "symbols": pending_symbols}
-                if after_hours is not None:
-                    batch_message["afterHours"] = bool(after_hours)
-                try:
-                    response = client.subscribe(batch_message)
-                except TypeError:
-                    self.logger.debug(
-                        "Batch subscribe unsupported for payload %s; falling back to per-symbol requests.",
-                        batch_message,
-                        exc_info=True,
-                    )
-                except Exception as exc:
-                    self.logger.warning(
-                        "Batch subscribe failed for %s: %s",
-                        batch_message,
-                        exc,
-                        extra={
-                            "channel": channel,
-                            "gateway_state": "subscribe_failed",
-                        },
+            keys = [(channel, symbol, after_hours) for symbol in pending_symbols]
+            try:
+                for target, placed in self._resolve_ws_targets(keys):
+                    self._send_subscriptions(
+                        target, channel, [key[1] for key in placed], after_hours, errors=errors
                     )
-                    if self._should_reconnect_after_error(exc):
-                        self._schedule_ws_reconnect()
-                    else:
-                        self._put_event(EVENT_LOG, f"Subscription rejected for {batch_message}: {exc}")
-                else:
-                    parsed_ids = self._parse_subscription_ids(response, pending_symbols)
-                    id_map = {symbol: parsed_ids.get(symbol) for symbol in pending_symbols}
-                    self._register_subscriptions(channel, id_map, after_hours)
-                    batch_completed = True
+            finally:
+                for key in keys:
+                    if key not in self._active_subscriptions:
+                        self._ws_pool.release(key)
 
-            if batch_completed:
-                continue
+    def subscribe_async(
+        self,
+        symbols: Sequence[str],
+        *,
+        channels: Optional[Sequence[str]] = None,
+        after_hours: Optional[bool] = None,
+    ) -> Dict[SubscriptionKey, "Future[Optional[str]]"]:
+        """
+        Queue a subscription without waiting for the vendor.
 
-            for symbol in pending_symbols:
-                message = {"channel": channel, "symbol": symbol}
-                if after_hours is not None:
-                    message["afterHours"] = bool(after_hours)
-                try:
-                    response = client.subscribe(message)
-                except Exception as exc:
-                    self.logger.warning(
-                        "Subscribe failed for %s: %s",
-                        message,
-                        exc,
-                        extra={
-                            "channel": channel,
-                            "symbol": symbol,
-                            "gateway_state": "subscribe_failed",
-                        },
-                    )
-                    if self._should_reconnect_after_error(exc):
-                        self._schedule_ws_reconnect()
-                    else:
-                        self._put_event(EVENT_LOG, f"Subscription rejected for {message}: {exc}")
-                    raise
-                parsed_ids = self._parse_subscription_ids(response, [symbol])
-                id_map = {symbol: parsed_ids.get(symbol)}
-                self._register_subscriptions(channel, id_map, after_hours)
+        Returns a future per ``(channel, symbol, afterHours)`` key that resolves
+        to the subscription id (``None`` if the vendor returned none). Requests
+        made within ``subscribe_window_ms`` of each other are sent as one batch.
+        """
+
+        futures: Dict[SubscriptionKey, "Future[Optional[str]]"] = {}
+        queued: list[SubscriptionKey] = []
+        for key in self._subscription_keys(symbols, channels, after_hours):
+            if key in self._active_subscriptions:
+                future: "Future[Optional[str]]" = Future()
+                future.set_result(self._subscription_ids_by_key.get(key))
+                futures[key] = future
+            else:
+                queued.append(key)
+        if queued:
+            futures.update(zip(queued, self._ensure_subscription_queue().submit(ACTION_SUBSCRIBE, queued)))
+        return futures
+
+    def unsubscribe_async(
+        self,
+        symbols: Sequence[str],
+        *,
+        channels: Optional[Sequence[str]] = None,
+        after_hours: Optional[bool] = None,
+    ) -> Dict[SubscriptionKey, "Future[Optional[str]]"]:
+        """Queue an unsubscribe; the returned futures resolve to ``None`` once it was sent."""
+
+        keys = self._subscription_keys(symbols, channels, after_hours)
+        return dict(zip(keys, self._ensure_subscription_queue().submit(ACTION_UNSUBSCRIBE, keys)))
+
+    def _subscription_keys(
+        self, symbols: Sequence[str], channels: Optional[Sequence[str]], after_hours: Optional[bool]
+    ) -> list[SubscriptionKey]:
+        unique_symbols = list(dict.fromkeys(str(raw).strip() for raw in symbols))
+        return [
+            (channel, symbol, after_hours)
+            for channel in (channels or ("books",))
+            for symbol in unique_symbols
+            if symbol
+        ]
 
     def unsubscribe_quotes(
         self,
@@ -418,9 +586,10 @@ class FubonGateway(BaseGateway):
                     success = False
                     used_payload: Optional[Mapping[str, Any]] = None
                     last_exception: Optional[Exception] = None
+                    ws_client = self._ws_client_for_key(key)
                     for payload in payload_options:
                         try:
-                            self._ws_client.unsubscribe(payload)
+                            ws_client.unsubscribe(payload)
                             success = True
                             used_payload = payload
                             break
@@ -464,6 +633,86 @@ class FubonGateway(BaseGateway):
 
                     self._forget_subscription(key)
 
+    def _send_subscriptions(
+        self,
+        client: Any,
+        channel: str,
+        symbols: Sequence[str],
+        after_hours: Optional[bool],
+        *,
+        errors: Optional[Dict[str, Exception]] = None,
+    ) -> None:
+        """
+        Subscribe ``symbols`` on one connection, batching when the SDK accepts it.
+
+        Per-symbol failures raise unless ``errors`` is given, in which case they are collected there.
+        """
+
+        batch_completed = False
+        if len(symbols) > 1:
+            batch_message = {"channel": channel, "symbols": symbols}
+            if after_hours is not None:
+                batch_message["afterHours"] = bool(after_hours)
+            try:
+                response = client.subscribe(batch_message)
+            except TypeError:
+                self.logger.debug(
+                    "Batch subscribe unsupported for payload %s; falling back to per-symbol requests.",
+                    batch_message,
+                    exc_info=True,
+                )
+            except Exception as exc:
+                self.logger.warning(
+                    "Batch subscribe failed for %s: %s",
+                    batch_message,
+                    exc,
+                    extra={
+                        "channel": channel,
+                        "gateway_state": "subscribe_failed",
+                    },
+                )
+                if self._should_reconnect_after_error(exc):
+                    self._schedule_ws_reconnect()
+                else:
+                    self._put_event(EVENT_LOG, f"Subscription rejected for {batch_message}: {exc}")
+            else:
+                parsed_ids = self._parse_subscription_ids(response, symbols)
+                id_map = {symbol: parsed_ids.get(symbol) for symbol in symbols}
+                self._register_subscriptions(channel, id_map, after_hours)
+                batch_completed = True
+
+        if batch_completed:
+            return
+
+        for symbol in symbols:
+            message = {"channel": channel, "symbol": symbol}
+            if after_hours is not None:
+                message["afterHours"] = bool(after_hours)
+            try:
+                response = client.subscribe(message)
+            except Exception as exc:
+                self.logger.warning(
+                    "Subscribe failed for %s: %s",
+                    message,
+                    exc,
+                    extra={
+                        "channel": channel,
+                        "symbol": symbol,
+                        "gateway_state": "subscribe_failed",
+                    },
+                )
+                if self._should_reconnect_after_error(exc):
+                    self._schedule_ws_reconnect()
+                else:
+                    self._put_event(EVENT_LOG, f"Subscription rejected for {message}: {exc}")
+                if errors is None:
+                    raise
+                errors[symbol] = exc
+                continue
+            parsed_ids = self._parse_subscription_ids(response, [symbol])
+            id_map = {symbol: parsed_ids.get(symbol)}
+            self._register_subscriptions(channel, id_map, after_hours)
+
     def _register_subscriptions(
         self,
         channel: str,
@@ -478,6 +727,7 @@ class FubonGateway(BaseGateway):
             existing_id = self._subscription_ids_by_key.get(key)
             if key not in self._active_subscriptions:
                 self._active_subscriptions.add(key)
+                self._ws_pool.bind(key)
             if subscription_id:
                 sub_id = str(subscription_id).strip()
                 if sub_id:
@@ -507,6 +757,7 @@ class FubonGateway(BaseGateway):
         if subscription_id:
             self._subscription_key_by_id.pop(subscription_id, None)
         self._active_subscriptions.discard(key)
+        self._ws_pool.release(key)
 
     def _parse_subscription_ids(self, response: Any, symbols: Sequence[str]) -> Dict[str, str]:
         parsed: Dict[str, str] = {}
@@ -569,23 +820,35 @@ class FubonGateway(BaseGateway):
 
     def _get_market_normalizer(self) -> MarketEnvelopeNormalizer:
         if self._market_normalizer is None:
-            self._market_normalizer = MarketEnvelopeNormalizer(gateway_name=self.gateway_name)
+            self._market_normalizer = MarketEnvelopeNormalizer(
+                gateway_name=self.gateway_name, numeric_mode=self._numeric_mode
+            )
         return self._market_normalizer
 
-    def _normalize_market_trade(self, payload: Mapping[str, Any]) -> Optional[TradeData]:
+    def _normalize_market_trade(
+        self, payload: Mapping[str, Any], *, flatten: bool = True
+    ) -> Optional[TradeData]:
+        normalized = self._normalize_market_trade_envelope(payload, flatten=flatten)
+        return normalized.trade if normalized else None
+
+    def _normalize_market_trade_envelope(
+        self, payload: Mapping[str, Any], *, flatten: bool = True
+    ) -> Optional[NormalizedTrade]:
+        """
+        Normalise a trade payload and keep the raw envelope built along the way.
+        """
+
         try:
             normalizer = self._get_market_normalizer()
-            normalized = normalizer.normalize_trade(payload)
+            normalized = normalizer.normalize_trade(payload, flatten=flatten)
         except Exception as exc:
             self.logger.debug("Failed to normalize trade payload %s: %s", payload, exc)
             return None
         trade = normalized.trade
         trade.gateway_name = self.gateway_name
-        trade.extra = getattr(trade, "extra", {}) or {}
+        # ``normalize_trade`` already filled channel/seq/checksum/latency_ms.
         trade.extra["source"] = "market"
-        trade.extra["channel"] = normalized.raw.channel
-        trade.extra["latency_ms"] = normalized.raw.latency_ms
-        return trade
+        return normalized
 
     def _normalize_market_bar(self, payload: Mapping[str, Any]) -> Optional[BarData]:
         source: Mapping[str, Any]
@@ -602,7 +865,8 @@ class FubonGateway(BaseGateway):
         exchange_code = source.get("exchange") or source.get("market") or self._default_exchange_code
         exchange = normalize_exchange(exchange_code, default=self._default_exchange_code)
         dt = self._parse_ws_datetime(
-            source.get("date") or source.get("timestamp") or source.get("time") or source.get("datetime")
+            source.get("date") or source.get("timestamp") or source.get("time") or source.get("datetime"),
+            ("candles", "datetime"),
         ) or datetime.now(timezone.utc)
 
         timeframe = source.get("timeframe") or source.get("interval")
@@ -667,29 +931,8 @@ class FubonGateway(BaseGateway):
         except (TypeError, ValueError):
             return default
 
-    def _parse_ws_datetime(self, value: Any) -> Optional[datetime]:
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, (int, float)):
-            try:
-                return datetime.fromtimestamp(value, tz=timezone.utc)
-            except (OverflowError, OSError, ValueError):
-                return None
-        if isinstance(value, str):
-            text = value.strip()
-            if not text:
-                return None
-            try:
-                if text.endswith("Z"):
-                    text = text[:-1] + "+00:00"
-                return datetime.fromisoformat(text)
-            except ValueError:
-                for fmt in ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y%m%d%H%M%S"):
-                    try:
-                        return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
-                    except ValueError:
-                        continue
-        return None
+    def _parse_ws_datetime(self, value: Any, source: Any = None) -> Optional[datetime]:
+        return parse_timestamp(value, source=source)
 
     def _resolve_ws_mode(self) -> Optional[Any]:
         mode_value = (self._preferred_ws_mode or "").strip()
@@ -975,6 +1218,17 @@ class FubonGateway(BaseGateway):
     def query_contracts(self) -> Sequence[ContractData]:
         return list(self.contracts.values())
 
+    def get_option_chain(self) -> OptionChainIndex[ContractData]:
+        """
+        Return the option-chain index of the loaded contracts.
+
+        Options are keyed by product code (``TXO``) and by underlying vt_symbol,
+        e.g. ``get_option_chain().neighbours("TXO", expiry, 17000.0, 5)``. The
+        index is rebuilt whenever contracts are (re)loaded.
+        """
+
+        return self._option_chain
+
     def query_history(self, request: HistoryRequest) -> Sequence[BarData]:
         """
         Fetch historical bar data for CTA backtesting integrations.
@@ -1161,7 +1415,28 @@ class FubonGateway(BaseGateway):
         return None
 
     def _load_and_publish_contracts(self) -> None:
-        records = self._fetch_contracts_from_rest()
+        cache = self._contract_cache
+        trading_day = trading_day_for()
+        if cache is not None:
+            cached = cache.load(trading_day, self.gateway_name)
+            if cached:
+                self._publish_contract_records(cached)
+                self.write_log(
+                    f"Loaded {len(cached)} contracts from cache {cache.path}; refreshing in background.",
+                    state="contracts_loaded",
+                )
+                self._start_contract_refresh()
+                self._schedule_contract_refresh()
+                return
+
+        complete = True
+        try:
+            records = self._fetch_contracts_from_rest()
+        except FubonContractDownloadError as exc:
+            # Publish what arrived, but do not cache it as the day's full list.
+            self.logger.warning("%s", exc, extra={"gateway_state": "contracts_partial"})
+            records = exc.records
+            complete = False
         if not records:
             self.logger.warning(
                 "Fubon REST API returned no contracts; GUI features may be limited.",
@@ -1169,21 +1444,272 @@ class FubonGateway(BaseGateway):
             )
             return
 
-        self.contracts.clear()
-        self._symbol_aliases.clear()
-        self._symbol_exchange_aliases.clear()
+        self._publish_contract_records(records)
+        self.write_log(
+            f"Loaded {len(records)} contracts from Fubon REST API.",
+            state="contracts_loaded",
+        )
+        if complete:
+            self._save_contract_cache(trading_day, records)
+        self._schedule_contract_refresh()
+
+    def _publish_contract_records(self, records: Sequence[ContractRecord]) -> None:
+        """Replace the contract registry with ``records`` and publish every contract."""
 
-        emitted = 0
-        for contract, raw_symbol, raw_exchange in records:
-            self.contracts[contract.vt_symbol] = contract
-            self._register_contract_aliases(contract, raw_symbol, raw_exchange)
+        with self._contract_lock:
+            self._swap_contract_registry(records)
+            contracts = list(self.contracts.values())
+        for contract in contracts:
             self.on_contract(contract)
-            emitted += 1
 
+    def _swap_contract_registry(self, records: Iterable[ContractRecord]) -> None:
+        """
+        Build the contract, alias and option-chain tables aside, then swap them in.
+
+        Lookups such as :meth:`resolve_vt_symbol` see either the previous or the
+        new tables, never a half-built one. Callers hold ``_contract_lock``.
+        """
+
+        contracts: Dict[str, ContractData] = {}
+        by_vt_symbol: Dict[str, ContractRecord] = {}
+        aliases: Dict[str, str] = {}
+        exchange_aliases: Dict[Tuple[str, str], str] = {}
+        for record in records:
+            contract, raw_symbol, raw_exchange = record
+            contracts[contract.vt_symbol] = contract
+            by_vt_symbol[contract.vt_symbol] = record
+            self._register_contract_aliases(contract, raw_symbol, raw_exchange, aliases, exchange_aliases)
+        option_chain = OptionChainIndex.from_contracts(contracts.values())
+
+        self.contracts = contracts
+        self._contract_records = by_vt_symbol
+        self._symbol_aliases = aliases
+        self._symbol_exchange_aliases = exchange_aliases
+        self._option_chain = option_chain
+
+    def refresh_contracts(self) -> Optional[ContractDiff]:
+        """
+        Re-download contracts and publish only what changed since the last load.
+
+        Added and changed contracts go through ``on_contract``; contracts no
+        longer listed are flagged ``extra["expired"]`` and moved to
+        :attr:`expired_contracts`. When some queries failed, only additions and
+        changes are applied: nothing expires and the cache is not rewritten.
+        Returns ``None`` when nothing was downloaded.
+        """
+
+        generation = self._contract_generation
+        partial = False
+        try:
+            records = self._fetch_contracts_from_rest()
+        except FubonContractDownloadError as exc:
+            self.logger.warning(
+                "Contract refresh incomplete, applying additions and changes only: %s",
+                exc,
+                extra={"gateway_state": "contracts_refresh_failed"},
+            )
+            records = exc.records
+            partial = True
+        except Exception as exc:  # pragma: no cover - vendor behaviour
+            self.logger.warning("Contract refresh failed: %s", exc, extra={"gateway_state": "contracts_refresh_failed"})
+            return None
+        if not records:
+            return None
+        diff = self._apply_contract_records(records, generation, partial=partial)
+        if diff is not None and not diff.empty and not partial:
+            self._save_contract_cache(trading_day_for(), records)
+        return diff
+
+    def _apply_contract_records(
+        self, records: Sequence[ContractRecord], generation: int, *, partial: bool = False
+    ) -> Optional[ContractDiff]:
+        started = time.perf_counter()
+        with self._contract_lock:
+            # The gateway was closed (or reconnected) while downloading.
+            if generation != self._contract_generation:
+                return None
+            diff = diff_contracts(self._contract_records.values(), records)
+            if partial:
+                # A missing query is not proof that its contracts were delisted.
+                fresh = {record[0].vt_symbol for record in records}
+                records = list(records) + [
+                    record for vt_symbol, record in self._contract_records.items() if vt_symbol not in fresh
+                ]
+                diff = ContractDiff(added=diff.added, changed=diff.changed, removed=())
+            updated = set(diff.added) | set(diff.changed)
+            if not diff.empty:
+                expired_at = datetime.now(TAIPEI_TZ).isoformat()
+                for vt_symbol in diff.removed:
+                    contract = self.contracts[vt_symbol]
+                    contract.extra = {**(getattr(contract, "extra", None) or {}), "expired": True, "expiredAt": expired_at}
+                    self.expired_contracts[vt_symbol] = contract
+                for vt_symbol in diff.added:
+                    self.expired_contracts.pop(vt_symbol, None)
+                # Unchanged contracts keep the objects already handed to on_contract.
+                self._swap_contract_registry(
+                    record if record[0].vt_symbol in updated else self._contract_records[record[0].vt_symbol]
+                    for record in records
+                )
+            published = [self.contracts[vt_symbol] for vt_symbol in diff.added + diff.changed]
+
+        for contract in published:
+            self.on_contract(contract)
+        self._last_contract_refresh = {
+            "contracts": len(self.contracts),
+            "added": len(diff.added),
+            "changed": len(diff.changed),
+            "expired": len(diff.removed),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 3),
+            "at": datetime.now(TAIPEI_TZ).isoformat(),
+        }
         self.write_log(
-            f"Loaded {emitted} contracts from Fubon REST API.",
-            state="contracts_loaded",
+            f"Contract refresh: {len(diff.added)} added, {len(diff.changed)} changed, {len(diff.removed)} expired.",
+            state="contracts_refreshed",
+        )
+        return diff
+
+    def get_contract_refresh_stats(self) -> Dict[str, Any]:
+        """Return the counts of the last incremental refresh and the expired contracts held."""
+
+        stats = dict(self._last_contract_refresh)
+        stats["expired_total"] = len(self.expired_contracts)
+        stats["interval_sec"] = self._contract_refresh_interval
+        return stats
+
+    def _configure_contract_refresh(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Read ``contract_refresh_sec``/``FUBON_CONTRACT_REFRESH_SEC``: how often to run
+        :meth:`refresh_contracts` after connecting (default 0, disabled; minimum 60).
+        """
+
+        value = self._resolve_config_value("contract_refresh_sec", setting, env_key="FUBON_CONTRACT_REFRESH_SEC")
+        try:
+            interval = float(value) if value else 0.0
+        except ValueError:
+            self.logger.warning("Invalid FUBON_CONTRACT_REFRESH_SEC=%r; periodic refresh disabled", value)
+            interval = 0.0
+        self._contract_refresh_interval = max(60.0, interval) if interval > 0 else 0.0
+
+    def _schedule_contract_refresh(self) -> None:
+        if self._closing or self._contract_refresh_interval <= 0:
+            return
+        self._cancel_contract_refresh()
+        timer = Timer(self._contract_refresh_interval, self._run_scheduled_contract_refresh)
+        timer.daemon = True
+        self._contract_refresh_timer = timer
+        timer.start()
+
+    def _cancel_contract_refresh(self) -> None:
+        if self._contract_refresh_timer:
+            self._contract_refresh_timer.cancel()
+            self._contract_refresh_timer = None
+
+    def _run_scheduled_contract_refresh(self) -> None:
+        self._contract_refresh_timer = None
+        if self._closing:
+            return
+        self.refresh_contracts()
+        self._schedule_contract_refresh()
+
+    def _configure_rate_limiter(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Set the client-side budgets SDK calls are paced against.
+
+        ``rest_rate_per_sec``/``FUBON_REST_RATE_PER_SEC`` (default 5, the vendor's
+        300 per minute) covers market-data REST queries,
+        ``account_rate_per_sec``/``FUBON_ACCOUNT_RATE_PER_SEC`` (default 5) account
+        and order queries, and ``order_rate_per_sec``/``FUBON_ORDER_RATE_PER_SEC``
+        (default 50) order placement, cancellation and modification. An order that
+        would wait longer than ``order_max_wait_ms``/``FUBON_ORDER_MAX_WAIT_MS``
+        (default 1000) is rejected with :class:`FubonRateLimitError`.
+        ``rest_workers``/``FUBON_REST_WORKERS`` (default 4) sets the threads used to
+        download contracts concurrently.
+        """
+
+        def _float_option(key: str, env_key: str, default: float) -> float:
+            value = self._resolve_config_value(key, setting, env_key=env_key)
+            try:
+                number = float(value) if value else default
+                if number <= 0:
+                    raise ValueError(value)
+            except ValueError:
+                self.logger.warning("Invalid %s=%r; using %s", env_key, value, default)
+                return default
+            return number
+
+        budgets = {
+            ENDPOINT_MARKET_DATA: _float_option("rest_rate_per_sec", "FUBON_REST_RATE_PER_SEC", DEFAULT_REST_RATE_PER_SEC),
+            ENDPOINT_ACCOUNT: _float_option(
+                "account_rate_per_sec", "FUBON_ACCOUNT_RATE_PER_SEC", DEFAULT_ACCOUNT_RATE_PER_SEC
+            ),
+            ENDPOINT_ORDER: _float_option("order_rate_per_sec", "FUBON_ORDER_RATE_PER_SEC", DEFAULT_ORDER_RATE_PER_SEC),
+        }
+        order_max_wait = _float_option("order_max_wait_ms", "FUBON_ORDER_MAX_WAIT_MS", DEFAULT_ORDER_MAX_WAIT_MS)
+        self._rate_limiter = RateLimiter(budgets, max_wait={ENDPOINT_ORDER: order_max_wait / 1000.0})
+
+        workers = self._resolve_config_value("rest_workers", setting, env_key="FUBON_REST_WORKERS")
+        try:
+            self._rest_workers = max(1, int(workers)) if workers else DEFAULT_REST_WORKERS
+        except ValueError:
+            self.logger.warning("Invalid FUBON_REST_WORKERS=%r; using %s", workers, DEFAULT_REST_WORKERS)
+            self._rest_workers = DEFAULT_REST_WORKERS
+
+    def get_rate_limiter_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return per endpoint class (market_data, account, order) the tokens acquired,
+        calls that waited and their total ``waited_ms``, 429 pauses and rejections.
+        """
+
+        return self._rate_limiter.stats()
+
+    def get_rest_limiter_stats(self) -> Dict[str, float]:
+        """Return the market-data counters of :meth:`get_rate_limiter_stats`."""
+
+        return self._rate_limiter.stats()[ENDPOINT_MARKET_DATA]
+
+    def _configure_contract_cache(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Enable the on-disk contract cache.
+
+        ``contract_cache``/``FUBON_CONTRACT_CACHE`` takes a file path, or ``1`` for
+        ``~/.vntrader/fubon_contracts.sqlite3``. A cache from the current trading
+        day is published on connect and the REST download runs in the background.
+        """
+
+        value = (self._resolve_config_value("contract_cache", setting, env_key="FUBON_CONTRACT_CACHE") or "").strip()
+        if not value or value.lower() in {"0", "false", "no", "off"}:
+            self._contract_cache = None
+            return
+        if value.lower() in {"1", "true", "yes", "on"}:
+            path = Path.home() / ".vntrader" / DEFAULT_CACHE_FILENAME
+        else:
+            path = Path(value)
+        self._contract_cache = ContractCache(path)
+
+    def _save_contract_cache(self, trading_day: Any, records: Sequence[ContractRecord]) -> None:
+        cache = self._contract_cache
+        if cache is None:
+            return
+        try:
+            cache.save(trading_day, records)
+        except Exception as exc:
+            self.logger.warning(
+                "Writing contract cache %s failed: %s",
+                cache.path,
+                exc,
+                extra={"gateway_state": "contract_cache_failed"},
+            )
+
+    def _start_contract_refresh(self) -> None:
+        """Run :meth:`refresh_contracts` once in the background (after a cache hit)."""
+
+        thread = threading.Thread(
+            target=self.refresh_contracts,
+            name=f"{self.gateway_name.lower()}-contract-refresh",
+            daemon=True,
         )
+        self._contract_refresh_thread = thread
+        thread.start()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -1199,6 +1725,7 @@ class FubonGateway(BaseGateway):
         attempt = 0
         delay = base_delay
         while True:
+            self._rate_limiter.acquire(ENDPOINT_MARKET_DATA)
             try:
                 return func(*args, **kwargs)
             except Exception as exc:
@@ -1206,13 +1733,14 @@ class FubonGateway(BaseGateway):
                 if attempt >= max_attempts or not self._is_rate_limit_error(exc):
                     raise
                 self.logger.debug(
-                    "REST rate limit encountered for %s; retrying in %.2f seconds (attempt %s/%s).",
+                    "REST rate limit encountered for %s; pausing REST calls for %.2f seconds (attempt %s/%s).",
                     getattr(func, "__name__", repr(func)),
                     delay,
                     attempt,
                     max_attempts,
                 )
-                time.sleep(delay)
+                # Pause the shared bucket so concurrent callers back off too.
+                self._rate_limiter.pause(ENDPOINT_MARKET_DATA, delay)
                 delay = min(delay * 2, 8.0)
 
     def _is_rate_limit_error(self, exc: Exception) -> bool:
@@ -1235,41 +1763,83 @@ class FubonGateway(BaseGateway):
         return any(keyword in message for keyword in keywords)
 
     def _fetch_contracts_from_rest(self) -> List[Tuple[ContractData, str, str]]:
+        """
+        Download products and tickers and map them to contract records.
+
+        Raises :class:`FubonContractDownloadError`, carrying the records that did
+        arrive, when any of the queries failed.
+        """
+
         intraday = self._get_intraday_client()
         if intraday is None:
             self.logger.debug("REST intraday client unavailable; skipping contract download.")
             return []
 
-        product_metadata = self._fetch_product_metadata(intraday)
-
-        query_params = [
-            {"type": "FUTURE", "session": "REGULAR"},
-            {"type": "FUTURE", "session": "AFTERHOURS"},
-            {"type": "OPTION", "session": "REGULAR"},
-            {"type": "OPTION", "session": "AFTERHOURS"},
+        # Products and tickers do not depend on each other, so all eight
+        # queries go out together under the shared REST limiter.
+        started = time.perf_counter()
+        calls = [(intraday.products, params) for params in CONTRACT_QUERY_PARAMS] + [
+            (intraday.tickers, params) for params in CONTRACT_QUERY_PARAMS
+        ]
+        responses = self._query_rest_concurrently(calls)
+        failed = [
+            f"{getattr(func, '__name__', func)} {dict(params)}"
+            for (func, params), response in zip(calls, responses, strict=True)
+            if response is None
         ]
+        product_metadata = self._merge_product_metadata(responses[: len(CONTRACT_QUERY_PARAMS)])
+        product_index = ProductIndex(product_metadata)
 
         contracts: Dict[str, Tuple[ContractData, str, str]] = {}
-        for params in query_params:
+        for response in responses[len(CONTRACT_QUERY_PARAMS) :]:
+            for item in (response or {}).get("data") or []:
+                mapped = self._map_ticker_to_contract(item, product_metadata, product_index)
+                if not mapped:
+                    continue
+                contract, raw_symbol, raw_exchange = mapped
+                contracts[contract.vt_symbol] = (contract, raw_symbol, raw_exchange)
+
+        self.logger.debug(
+            "Downloaded %s contracts with %s REST queries in %.1fms",
+            len(contracts),
+            len(responses),
+            (time.perf_counter() - started) * 1000.0,
+        )
+        if failed:
+            raise FubonContractDownloadError(
+                f"{len(failed)} of {len(responses)} contract queries failed: {', '.join(failed)}",
+                records=list(contracts.values()),
+                failed=failed,
+            )
+        return list(contracts.values())
+
+    def _query_rest_concurrently(
+        self, calls: Sequence[Tuple[Callable[..., Any], Mapping[str, Any]]]
+    ) -> List[Optional[Mapping[str, Any]]]:
+        """
+        Run ``(func, params)`` REST queries on up to ``rest_workers`` threads.
+
+        Results keep the order of ``calls``; a query that fails yields ``None``.
+        """
+
+        def run(call: Tuple[Callable[..., Any], Mapping[str, Any]]) -> Optional[Mapping[str, Any]]:
+            func, params = call
             try:
-                response = self._call_rest_with_retry(
-                    intraday.tickers,
+                return self._call_rest_with_retry(
+                    func,
                     exchange=self._default_exchange_code,
                     limit=2000,
                     **params,
                 )
             except Exception as exc:  # pragma: no cover - vendor behaviour
-                self.logger.debug("intraday.tickers failed for %s: %s", params, exc)
-                continue
-
-            for item in response.get("data") or []:
-                mapped = self._map_ticker_to_contract(item, product_metadata)
-                if not mapped:
-                    continue
-                contract, raw_symbol, raw_exchange = mapped
-                contracts[contract.vt_symbol] = (contract, raw_symbol, raw_exchange)
+                self.logger.debug("intraday.%s failed for %s: %s", getattr(func, "__name__", func), params, exc)
+                return None
 
-        return list(contracts.values())
+        workers = min(self._rest_workers, len(calls))
+        if workers <= 1:
+            return [run(call) for call in calls]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.gateway_name.lower()}-rest") as executor:
+            return list(executor.map(run, calls))
 
     def _get_intraday_client(self) -> Any:
         if self.client is None:
@@ -1292,28 +1862,11 @@ class FubonGateway(BaseGateway):
 
         return getattr(futopt_rest, "intraday", None)
 
-    def _fetch_product_metadata(self, intraday: Any) -> Dict[str, Mapping[str, Any]]:
+    @staticmethod
+    def _merge_product_metadata(responses: Sequence[Optional[Mapping[str, Any]]]) -> Dict[str, Mapping[str, Any]]:
         product_metadata: Dict[str, Mapping[str, Any]] = {}
-        product_params = [
-            {"type": "FUTURE", "session": "REGULAR"},
-            {"type": "FUTURE", "session": "AFTERHOURS"},
-            {"type": "OPTION", "session": "REGULAR"},
-            {"type": "OPTION", "session": "AFTERHOURS"},
-        ]
-
-        for params in product_params:
-            try:
-                response = self._call_rest_with_retry(
-                    intraday.products,
-                    exchange=self._default_exchange_code,
-                    limit=2000,
-                    **params,
-                )
-            except Exception as exc:  # pragma: no cover - vendor behaviour
-                self.logger.debug("intraday.products failed for %s: %s", params, exc)
-                continue
-
-            for item in response.get("data") or []:
+        for response in responses:
+            for item in (response or {}).get("data") or []:
                 symbol = str(item.get("symbol") or "").strip().upper()
                 if not symbol:
                     continue
@@ -1327,14 +1880,17 @@ class FubonGateway(BaseGateway):
         self,
         ticker: Mapping[str, Any],
         product_metadata: Mapping[str, Mapping[str, Any]],
+        product_index: Optional[ProductIndex] = None,
     ) -> Optional[Tuple[ContractData, str, str]]:
         raw_symbol = str(ticker.get("symbol") or "").strip()
         symbol = normalize_symbol(raw_symbol)
         if not symbol:
             return None
 
+        if product_index is None:
+            product_index = ProductIndex(product_metadata)
         product_descriptor = ticker.get("type") or ""
-        product_key = self._match_product_symbol(symbol, product_metadata)
+        product_key, symbol_suffix = product_index.split(symbol)
         metadata = product_metadata.get(product_key or "", {})
         product = normalize_product(product_descriptor, default=Product.FUTURES)
 
@@ -1387,7 +1943,7 @@ class FubonGateway(BaseGateway):
         }
 
         if product is Product.OPTION:
-            self._populate_option_fields(contract, ticker, metadata)
+            self._populate_option_fields(contract, ticker, metadata, symbol_suffix)
 
         return contract, raw_symbol, str(exchange_code or "")
 
@@ -1647,6 +2203,8 @@ class FubonGateway(BaseGateway):
                 "channel": "trades",
                 "symbol": symbol,
                 "exchange": exchange,
+                # Trade ids and seq are read from the envelope, not the trades entry.
+                "serial": entry.get("serial"),
                 "trades": [normalized_entry],
             }
             trade = self._normalize_market_trade(payload)
@@ -1680,47 +2238,41 @@ class FubonGateway(BaseGateway):
             )
         return volumes
 
-    def _match_product_symbol(
-        self, contract_symbol: str, product_metadata: Mapping[str, Mapping[str, Any]]
-    ) -> Optional[str]:
-        upper_symbol = contract_symbol.upper()
-        best_match: Optional[str] = None
-        best_length = 0
-        for candidate in product_metadata.keys():
-            if upper_symbol.startswith(candidate) and len(candidate) > best_length:
-                best_length = len(candidate)
-                best_match = candidate
-        return best_match
-
     def _register_contract_aliases(
         self,
         contract: ContractData,
         raw_symbol: str,
         raw_exchange: str,
+        aliases: Optional[Dict[str, str]] = None,
+        exchange_aliases: Optional[Dict[Tuple[str, str], str]] = None,
     ) -> None:
-        vt_symbol = contract.vt_symbol
+        if aliases is None:
+            aliases = self._symbol_aliases
+        if exchange_aliases is None:
+            exchange_aliases = self._symbol_exchange_aliases
+        vt_symbol = sys.intern(contract.vt_symbol)
         canonical_symbol = normalize_symbol(contract.symbol)
-        canonical_exchange = getattr(contract.exchange, "value", str(contract.exchange))
+        canonical_exchange = sys.intern(getattr(contract.exchange, "value", str(contract.exchange)))
 
         normalized_raw_symbol = normalize_symbol(raw_symbol) or canonical_symbol
         raw_exchange_code = normalize_symbol(raw_exchange)
 
         # Base symbol aliases
-        self._symbol_aliases.setdefault(canonical_symbol, vt_symbol)
-        self._symbol_aliases.setdefault(normalized_raw_symbol, vt_symbol)
-        self._symbol_aliases.setdefault(vt_symbol, vt_symbol)
+        aliases.setdefault(canonical_symbol, vt_symbol)
+        aliases.setdefault(normalized_raw_symbol, vt_symbol)
+        aliases.setdefault(vt_symbol, vt_symbol)
 
         # Exchange-aware aliases
-        self._symbol_exchange_aliases.setdefault(
+        exchange_aliases.setdefault(
             (normalized_raw_symbol, canonical_exchange),
             vt_symbol,
         )
-        self._symbol_exchange_aliases.setdefault(
+        exchange_aliases.setdefault(
             (canonical_symbol, canonical_exchange),
             vt_symbol,
         )
         if raw_exchange_code:
-            self._symbol_exchange_aliases.setdefault(
+            exchange_aliases.setdefault(
                 (normalized_raw_symbol, raw_exchange_code),
                 vt_symbol,
             )
@@ -1774,11 +2326,17 @@ class FubonGateway(BaseGateway):
         contract: ContractData,
         ticker: Mapping[str, Any],
         metadata: Mapping[str, Any],
+        symbol_suffix: Optional[str] = None,
     ) -> None:
-        strike = self._parse_option_strike(contract.symbol, metadata.get("symbol"))
+        if symbol_suffix is None:
+            symbol_suffix = ProductIndex([metadata.get("symbol") or ""]).split(contract.symbol)[1]
+        strike = self._parse_option_strike(symbol_suffix)
         if strike is not None:
             contract.option_strike = strike
 
+        if metadata.get("symbol"):
+            contract.option_portfolio = str(metadata["symbol"]).upper()
+
         underlying = metadata.get("underlyingSymbol")
         if underlying:
             exchange_value = getattr(contract.exchange, "value", str(contract.exchange))
@@ -1792,15 +2350,11 @@ class FubonGateway(BaseGateway):
         if option_type:
             contract.option_type = option_type
 
-    def _parse_option_strike(self, symbol: str, product_symbol: Any) -> Optional[float]:
-        if not symbol:
+    def _parse_option_strike(self, suffix: str) -> Optional[float]:
+        """Parse the strike from the part of an option symbol after its product code."""
+
+        if not suffix:
             return None
-        base = str(product_symbol or "").upper()
-        prefix_len = len(base)
-        if prefix_len and symbol.upper().startswith(base):
-            suffix = symbol[prefix_len:]
-        else:
-            suffix = symbol
         numeric = "".join(ch for ch in suffix[:-2] if ch.isdigit())
         if not numeric:
             return None
@@ -1880,6 +2434,7 @@ class FubonGateway(BaseGateway):
         if self.client is None:
             raise RuntimeError("Gateway client unavailable.")
 
+        resubscribe = False
         with self._ws_lock:
             if self._ws_client is None:
                 marketdata = getattr(self.client, "marketdata", None)
@@ -1914,14 +2469,18 @@ class FubonGateway(BaseGateway):
                     )
                     self._schedule_ws_reconnect()
                     raise
-                self._resubscribe_all()
+                resubscribe = True
                 self._start_token_refresh()
                 self._start_ws_heartbeat()
 
             if register_handler:
                 self._register_ws_handlers()
+            client = self._ws_client
 
-            return self._ws_client
+        # Resubscribe outside the lock so SDK callbacks are not blocked meanwhile.
+        if resubscribe:
+            self._resubscribe_all()
+        return client
 
     def _disconnect_websocket(self) -> None:
         with self._ws_lock:
@@ -1940,6 +2499,16 @@ class FubonGateway(BaseGateway):
                 self._ws_connected = False
 
             self._ws_client = None
+            for index, pooled in self._ws_pool_clients.items():
+                disconnect = getattr(pooled, "disconnect", None)
+                if self._ws_pool_connected.get(index) and callable(disconnect):
+                    try:
+                        disconnect()
+                    except Exception:
+                        pass
+            self._ws_pool_clients.clear()
+            self._ws_pool_connected.clear()
+            self._ws_pool.clear()
             self._active_subscriptions.clear()
             self._subscription_ids_by_key.clear()
             self._subscription_key_by_id.clear()
@@ -1949,39 +2518,263 @@ class FubonGateway(BaseGateway):
     def _resubscribe_all(self) -> None:
         if not self._ws_client or not self._active_subscriptions:
             return
-        for channel, symbol, after_hours in list(self._active_subscriptions):
-            payload = {"channel": channel, "symbol": symbol}
-            if after_hours is not None:
-                payload["afterHours"] = bool(after_hours)
+        if self._book_engine is not None:
+            self._book_engine.invalidate()
+        gap_detector = self._gap_detector
+        if gap_detector is not None:
+            # Sequences may restart anywhere after a reconnect; re-base every stream.
+            gap_detector.reset()
+        for key in list(self._active_subscriptions):
+            self._ws_pool.bind(key)
+        if self._ws_pool_clients and not any(self._ws_pool_connected.values()):
+            # Every connection dropped, so every key is sent again anyway:
+            # spread them evenly over whatever came back.
+            live = [0, *self._reconnect_pool_clients(sorted(self._ws_pool_clients))]
+            layout = self._ws_pool.rebalance(live)
+        else:
+            layout = {0: self._ws_pool.keys_for(0)}
+        jobs = [
+            (self._ws_client if index == 0 else self._ws_pool_clients[index], keys)
+            for index, keys in sorted(layout.items())
+        ]
+        self._resubscribe_connections(jobs)
+
+    def _resubscribe_connections(self, jobs: Sequence[Tuple[Any, Sequence[SubscriptionKey]]]) -> Dict[str, Any]:
+        """
+        Re-send subscriptions for each ``(client, keys)`` pair, one thread per connection.
+
+        The outcome and the elapsed recovery time are logged and kept for
+        :meth:`get_ws_pool_stats` under ``last_resubscribe``.
+        """
+
+        started = time.perf_counter()
+        jobs = [(client, keys) for client, keys in jobs if keys]
+        if len(jobs) > 1:
+            with ThreadPoolExecutor(
+                max_workers=len(jobs), thread_name_prefix=f"{self.gateway_name.lower()}-resubscribe"
+            ) as executor:
+                results = list(executor.map(lambda job: self._resubscribe_keys(*job), jobs))
+        else:
+            results = [self._resubscribe_keys(client, keys) for client, keys in jobs]
+        summary: Dict[str, Any] = {"keys": 0, "resubscribed": 0, "failed": 0, "requests": 0}
+        for result in results:
+            for name, value in result.items():
+                summary[name] += value
+        summary["connections"] = len(jobs)
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+        self._last_resubscribe = summary
+        if summary["keys"]:
+            self.logger.info(
+                "Re-subscribed %s/%s websocket keys with %s request(s) over %s connection(s) in %.1fms",
+                summary["resubscribed"],
+                summary["keys"],
+                summary["requests"],
+                summary["connections"],
+                summary["elapsed_ms"],
+                extra={"gateway_state": "resubscribed", "latency_ms": summary["elapsed_ms"]},
+            )
+        return summary
+
+    def _resubscribe_keys(self, client: Any, keys: Sequence[SubscriptionKey]) -> Dict[str, int]:
+        """
+        Re-send ``keys`` on ``client`` as one batch per ``(channel, afterHours)``.
+
+        Batches are capped at the per-connection subscription limit; a batch the
+        SDK rejects falls back to per-symbol requests.
+        """
+
+        counts = {"keys": len(keys), "resubscribed": 0, "failed": 0, "requests": 0}
+        batches = batch_keys(keys, lambda key: (key[0], key[2]), self._ws_pool.max_subscriptions)
+        for (channel, after_hours), batch in batches:
+            chunk = [key[1] for key in batch]
+            if len(chunk) > 1:
+                payload: Dict[str, Any] = {"channel": channel, "symbols": chunk}
+                if after_hours is not None:
+                    payload["afterHours"] = bool(after_hours)
+                counts["requests"] += 1
+                try:
+                    response = client.subscribe(payload)
+                except Exception as exc:
+                    self.logger.debug(
+                        "Batch re-subscribe failed for channel=%s (%s symbols): %s; retrying per symbol.",
+                        channel,
+                        len(chunk),
+                        exc,
+                        exc_info=isinstance(exc, TypeError),
+                    )
+                else:
+                    self._store_subscription_ids(channel, after_hours, self._parse_subscription_ids(response, chunk))
+                    counts["resubscribed"] += len(chunk)
+                    continue
+            for symbol in chunk:
+                payload = {"channel": channel, "symbol": symbol}
+                if after_hours is not None:
+                    payload["afterHours"] = bool(after_hours)
+                counts["requests"] += 1
+                try:
+                    response = client.subscribe(payload)
+                except Exception as exc:
+                    counts["failed"] += 1
+                    self.logger.warning(
+                        "Failed to re-subscribe %s: %s",
+                        payload,
+                        exc,
+                        extra={
+                            "channel": channel,
+                            "symbol": symbol,
+                            "gateway_state": "resubscribe_failed",
+                        },
+                    )
+                    continue
+                self._store_subscription_ids(channel, after_hours, self._parse_subscription_ids(response, [symbol]))
+                counts["resubscribed"] += 1
+        return counts
+
+    def _store_subscription_ids(
+        self, channel: str, after_hours: Optional[bool], parsed_ids: Mapping[str, str]
+    ) -> None:
+        for symbol, sub_id in parsed_ids.items():
+            if not sub_id:
+                continue
+            key = (channel, symbol, after_hours)
+            self._subscription_ids_by_key[key] = sub_id
+            self._subscription_key_by_id[sub_id] = key
+
+    def _ws_client_for(self, index: int) -> Any:
+        """
+        Return the connected websocket client for pool slot ``index``.
+
+        Slot 0 is the primary client; extra slots are opened on first use. When
+        the SDK cannot provide or connect another client, the pool shrinks below
+        ``index`` and ``None`` is returned so the caller places its keys again.
+        """
+
+        if index <= 0:
+            return self._ensure_websocket_client(register_handler=True)
+        with self._ws_lock:
+            client = self._ws_pool_clients.get(index)
             try:
-                response = self._ws_client.subscribe(payload)
-                parsed_ids = self._parse_subscription_ids(response, [symbol])
-                if parsed_ids:
-                    sub_id = parsed_ids.get(symbol)
-                    if sub_id:
-                        key = (channel, symbol, after_hours)
-                        self._subscription_ids_by_key[key] = sub_id
-                        self._subscription_key_by_id[sub_id] = key
-                self.logger.debug(
-                    "Re-subscribed websocket channel %s",
-                    payload,
-                    extra={
-                        "channel": channel,
-                        "symbol": symbol,
-                        "gateway_state": "resubscribed",
-                    },
+                if client is None:
+                    client = self._create_ws_connection()
+                    self._ws_pool_clients[index] = client
+                    self._register_pool_handlers(index, client)
+                if not self._ws_pool_connected.get(index):
+                    client.connect()
+                    self._ws_pool_connected[index] = True
+                    self.logger.info(
+                        "FutOpt websocket pool connection %s connected.",
+                        index,
+                        extra={"gateway_state": "ws_connected"},
+                    )
+            except Exception as exc:
+                self.logger.warning(
+                    "Websocket pool connection %s unavailable: %s; limiting pool to %s connection(s).",
+                    index,
+                    exc,
+                    index,
+                    extra={"gateway_state": "ws_pool_shrunk"},
                 )
+                self._ws_pool.shrink(index)
+                return None
+            return client
+
+    def _ws_client_for_key(self, key: SubscriptionKey) -> Any:
+        index = self._ws_pool.connection_for(key)
+        if index:
+            client = self._ws_pool_clients.get(index)
+            if client is not None:
+                return client
+        return self._ws_client
+
+    def _resolve_ws_targets(self, keys: Sequence[SubscriptionKey]) -> list[Tuple[Any, list[SubscriptionKey]]]:
+        """Place ``keys`` in the pool and pair each connection's share with its client."""
+
+        while True:
+            placement = self._ws_pool.assign(keys)
+            batches: list[Tuple[Any, list[SubscriptionKey]]] = []
+            for index in sorted(placement):
+                client = self._ws_client_for(index)
+                if client is None:
+                    break
+                batches.append((client, placement[index]))
+            else:
+                return batches
+
+    def _create_ws_connection(self) -> Any:
+        """
+        Obtain another FutOpt websocket client for the pool.
+
+        The SDK hands out a fresh ``websocket_client`` per ``init_realtime`` call,
+        so realtime is initialised again; clients already handed out keep their
+        sockets. Raises ``RuntimeError`` if the SDK returns a client in use.
+        """
+
+        self._prepare_realtime()
+        marketdata = getattr(self.client, "marketdata", None)
+        factory = getattr(marketdata, "websocket_client", None)
+        client = getattr(factory, "futopt", None)
+        if client is None:
+            raise RuntimeError("FutOpt websocket client unavailable in this SDK build.")
+        if any(client is existing for existing in (self._ws_client, *self._ws_pool_clients.values())):
+            raise RuntimeError("SDK returned a websocket client that is already in use")
+        return client
+
+    def _register_pool_handlers(self, index: int, client: Any) -> None:
+        handler = getattr(client, "on", None)
+        if not callable(handler):
+            return
+        events: list[Tuple[str, Callable[..., None]]] = [
+            ("message", self._on_ws_message),
+            ("disconnect", partial(self._handle_pool_disconnect, index)),
+            ("error", partial(self._handle_pool_error, index)),
+        ]
+        for event_name, callback in events:
+            try:
+                handler(event_name, callback)
+            except Exception as exc:
+                self.logger.debug("Registering pool websocket handler %s failed: %s", event_name, exc)
+
+    def _reconnect_pool_clients(self, indexes: Sequence[int]) -> list[int]:
+        """Reconnect the given pool connections; returns the indexes that came back."""
+
+        recovered: list[int] = []
+        for index in indexes:
+            client = self._ws_pool_clients.get(index)
+            if client is None:
+                continue
+            try:
+                client.connect()
             except Exception as exc:
                 self.logger.warning(
-                    "Failed to re-subscribe %s: %s",
-                    payload,
+                    "Websocket pool connection %s reconnect failed: %s",
+                    index,
                     exc,
-                    extra={
-                        "channel": channel,
-                        "symbol": symbol,
-                        "gateway_state": "resubscribe_failed",
-                    },
+                    extra={"gateway_state": "ws_reconnect_failed"},
                 )
+                continue
+            with self._ws_lock:
+                self._ws_pool_connected[index] = True
+            recovered.append(index)
+        return recovered
+
+    def _recover_ws_pool(self) -> None:
+        """Reconnect dropped pool connections and resend the keys placed on them."""
+
+        with self._ws_lock:
+            down = [index for index in sorted(self._ws_pool_clients) if not self._ws_pool_connected.get(index)]
+        if not down:
+            return
+        recovered = self._reconnect_pool_clients(down)
+        gap_detector = self._gap_detector
+        if gap_detector is not None:
+            for index in recovered:
+                for channel, symbol, _ in self._ws_pool.keys_for(index):
+                    gap_detector.reset(symbol, channel)
+        self._resubscribe_connections(
+            [(self._ws_pool_clients[index], self._ws_pool.keys_for(index)) for index in recovered]
+        )
+        if len(recovered) < len(down):
+            self._schedule_ws_reconnect()
 
     def _register_ws_handlers(self) -> None:
         if self._ws_handlers_registered or not self._ws_client:
@@ -1991,7 +2784,7 @@ class FubonGateway(BaseGateway):
         handler = getattr(self._ws_client, "on", None)
         if callable(handler):
             events: list[Tuple[str, Callable[..., None]]] = [
-                ("message", self._handle_ws_message),
+                ("message", self._on_ws_message),
                 ("disconnect", self._handle_ws_disconnect),
                 ("error", self._handle_ws_error),
                 ("authenticated", self._handle_ws_authenticated),
@@ -2286,32 +3079,809 @@ class FubonGateway(BaseGateway):
             except Exception as exc:
                 self.logger.debug("Registering %s failed: %s", method_name, exc)
 
-    def _handle_ws_message(self, message: str) -> None:
+    def _start_ws_dispatcher(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Move websocket frame handling off the SDK callback thread when configured.
+
+        ``ws_dispatch_mode``/``FUBON_WS_DISPATCH_MODE`` selects ``inline`` (default)
+        or ``thread``; the queue is tuned via ``FUBON_WS_QUEUE_SIZE``,
+        ``FUBON_WS_OVERFLOW_POLICY`` and ``FUBON_WS_DISPATCH_WORKERS``. With more
+        than one worker, frames are sharded by symbol so each symbol keeps its order.
+        """
+
+        mode = (
+            self._resolve_config_value("ws_dispatch_mode", setting, env_key="FUBON_WS_DISPATCH_MODE")
+            or DISPATCH_MODE_INLINE
+        ).lower()
+        if mode != DISPATCH_MODE_THREAD:
+            return
+        self._stop_ws_dispatcher()
+
+        def _int_option(key: str, env_key: str, default: int) -> int:
+            value = self._resolve_config_value(key, setting, env_key=env_key)
+            try:
+                return max(1, int(value)) if value else default
+            except ValueError:
+                self.logger.warning("Invalid %s=%r; using %s", env_key, value, default)
+                return default
+
+        policy = OverflowPolicy.parse(
+            self._resolve_config_value(
+                "ws_overflow_policy", setting, env_key="FUBON_WS_OVERFLOW_POLICY"
+            )
+        )
+        maxsize = _int_option("ws_queue_size", "FUBON_WS_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        workers = _int_option("ws_dispatch_workers", "FUBON_WS_DISPATCH_WORKERS", 1)
+        # Stamp frames on the callback thread so queue time counts towards latency.
+        stamp = receive_stamp if self._latency_tracker is not None else None
+        dispatcher: FrameDispatcher | ShardedDispatcher
+        if workers > 1:
+            dispatcher = ShardedDispatcher(
+                self._handle_ws_message,
+                shards=workers,
+                maxsize=maxsize,
+                policy=policy,
+                stamp=stamp,
+                name=f"{self.gateway_name.lower()}-ws-shard",
+                logger=self.logger,
+            )
+        else:
+            dispatcher = FrameDispatcher(
+                self._handle_ws_message,
+                maxsize=maxsize,
+                policy=policy,
+                stamp=stamp,
+                name=f"{self.gateway_name.lower()}-ws-dispatch",
+                logger=self.logger,
+            )
+        dispatcher.start()
+        self._ws_dispatcher = dispatcher
+        self.logger.info(
+            "Websocket dispatch running off the callback thread (policy=%s, queue=%s, workers=%s)",
+            policy.value,
+            dispatcher.maxsize,
+            dispatcher.workers,
+            extra={"gateway_state": "ws_dispatch"},
+        )
+
+    def _stop_ws_dispatcher(self) -> None:
+        dispatcher = self._ws_dispatcher
+        self._ws_dispatcher = None
+        if dispatcher is not None:
+            dispatcher.stop()
+
+    def get_dispatch_stats(self) -> Dict[str, Any]:
+        """
+        Return websocket dispatch counters (enqueued, dropped, conflated, queue depth).
+        """
+
+        dispatcher = self._ws_dispatcher
+        if dispatcher is None:
+            return {"mode": DISPATCH_MODE_INLINE}
+        stats: Dict[str, Any] = {"mode": DISPATCH_MODE_THREAD, "policy": dispatcher.policy.value}
+        stats.update(dispatcher.stats())
+        return stats
+
+    def _start_book_conflation(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Enable per-symbol conflation of ``books`` updates when configured.
+
+        ``book_conflation``/``FUBON_BOOK_CONFLATION`` turns it on; the flush
+        cadence comes from ``FUBON_BOOK_CONFLATION_INTERVAL_MS`` (``0`` means
+        flush only when :meth:`flush_conflated_ticks` is called).
+        """
+
+        enabled = self._resolve_config_value(
+            "book_conflation", setting, env_key="FUBON_BOOK_CONFLATION"
+        )
+        if (enabled or "").lower() not in {"1", "true", "yes", "on"}:
+            return
+        self._stop_book_conflation()
+
+        interval_value = self._resolve_config_value(
+            "book_conflation_interval_ms", setting, env_key="FUBON_BOOK_CONFLATION_INTERVAL_MS"
+        )
+        try:
+            interval_ms = max(0, int(interval_value)) if interval_value else DEFAULT_CONFLATION_INTERVAL_MS
+        except ValueError:
+            self.logger.warning(
+                "Invalid FUBON_BOOK_CONFLATION_INTERVAL_MS=%r; using %s",
+                interval_value,
+                DEFAULT_CONFLATION_INTERVAL_MS,
+            )
+            interval_ms = DEFAULT_CONFLATION_INTERVAL_MS
+
+        conflator = TickConflator(
+            self._publish_conflated_tick,
+            interval=interval_ms / 1000,
+            name=f"{self.gateway_name.lower()}-book-conflation",
+            logger=self.logger,
+        )
+        conflator.start()
+        self._book_conflator = conflator
+        self.logger.info(
+            "Order book conflation enabled (interval_ms=%s)",
+            interval_ms,
+            extra={"gateway_state": "book_conflation"},
+        )
+
+    def _stop_book_conflation(self) -> None:
+        conflator = self._book_conflator
+        self._book_conflator = None
+        if conflator is not None:
+            conflator.stop()
+
+    def _publish_conflated_tick(self, tick: TickData, payload: Optional[Mapping[str, Any]]) -> None:
+        self._put_event(EVENT_TICK, tick)
+        if payload is not None:
+            self._put_event(EVENT_FUBON_MARKET_RAW, payload)
+
+    def flush_conflated_ticks(self) -> int:
+        """
+        Publish the latest pending book per symbol; returns the number of ticks emitted.
+        """
+
+        conflator = self._book_conflator
+        return conflator.flush() if conflator else 0
+
+    def get_conflation_stats(self) -> Dict[str, int]:
+        """
+        Return book conflation counters (received, coalesced, published, pending).
+        """
+
+        conflator = self._book_conflator
+        return conflator.stats() if conflator else {}
+
+    def _start_book_engine(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Maintain incremental L2 books from ``books`` snapshots and deltas when configured.
+
+        ``book_engine``/``FUBON_BOOK_ENGINE`` turns it on. Deltas must carry
+        consecutive ``seq``/``bookSeq`` values and zero sizes for removed
+        levels; on a gap the symbol's ``books`` subscription is cycled to
+        obtain a fresh snapshot.
+        """
+
+        enabled = self._resolve_config_value("book_engine", setting, env_key="FUBON_BOOK_ENGINE")
+        if (enabled or "").lower() not in {"1", "true", "yes", "on"}:
+            self._book_engine = None
+            return
+        self._book_engine = OrderBookEngine(
+            numeric=get_number_converter(self._numeric_mode),
+            on_gap=self._request_book_resnapshot,
+            logger=self.logger,
+        )
+        self.logger.info("Incremental order book engine enabled", extra={"gateway_state": "book_engine"})
+        dispatcher = self._ws_dispatcher
+        if dispatcher is not None and dispatcher.policy is OverflowPolicy.CONFLATE:
+            self.logger.warning(
+                "Dispatch policy 'conflate' drops book deltas under backpressure; "
+                "expect resnapshots while the order book engine is enabled.",
+                extra={"gateway_state": "book_engine"},
+            )
+
+    def _apply_book_update(self, tick: TickData, payload: Mapping[str, Any]) -> bool:
+        """
+        Feed a book message to the engine; returns ``False`` while the book is not usable.
+        """
+
+        update = self._book_engine.apply(tick.symbol, payload)
+        if not update.ready:
+            return False
+        apply_levels_to_tick(tick, update.bids, update.asks, zero=self._book_engine.zero)
+        return True
+
+    def _request_book_resnapshot(self, symbol: str, expected: Optional[int], received: Optional[int]) -> None:
+        self.logger.warning(
+            "Order book for %s needs a snapshot (expected_seq=%s, received_seq=%s)",
+            symbol,
+            expected,
+            received,
+            extra={"gateway_state": "book_gap"},
+        )
+        # Cycle the subscription off the websocket callback thread.
+        timer = Timer(0.0, self._resubscribe_books, args=(symbol,))
+        timer.daemon = True
+        timer.start()
+
+    def _resubscribe_books(self, symbol: str) -> None:
+        keys = [key for key in list(self._active_subscriptions) if key[0] == "books" and key[1] == symbol]
+        for _channel, _symbol, after_hours in keys:
+            try:
+                self.unsubscribe_quotes([symbol], channels=["books"], after_hours=after_hours)
+            except Exception as exc:
+                self.logger.warning(
+                    "Book unsubscribe for %s failed: %s",
+                    symbol,
+                    exc,
+                    extra={"gateway_state": "book_gap"},
+                )
+            self._restore_book_subscription(symbol, after_hours)
+
+    def _restore_book_subscription(self, symbol: str, after_hours: Optional[bool], attempt: int = 0) -> None:
+        """
+        Subscribe ``books`` again after a resnapshot cycle, retrying with backoff on failure.
+        """
+
+        if self._closing or self._book_engine is None:
+            return
+        try:
+            self.subscribe_quotes([symbol], channels=["books"], after_hours=after_hours)
+            return
+        except Exception as exc:
+            error = exc
+        attempt += 1
+        if attempt >= BOOK_RESUBSCRIBE_ATTEMPTS:
+            message = f"Book resnapshot for {symbol} failed after {attempt} attempts: {error}"
+            self.logger.error(message, extra={"gateway_state": "book_gap"})
+            self._put_event(EVENT_LOG, message)
+            # Let a later delta (e.g. after a manual subscribe) request a snapshot again.
+            self._book_engine.cancel_resnapshot(symbol)
+            return
+        delay = min(30.0, 2.0 ** (attempt - 1))
+        self.logger.warning(
+            "Book resnapshot for %s failed: %s; retrying in %.1f seconds",
+            symbol,
+            error,
+            delay,
+            extra={"gateway_state": "book_gap"},
+        )
+        timer = Timer(delay, self._restore_book_subscription, args=(symbol, after_hours, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _start_bar_aggregation(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Build bars locally from the ``trades`` stream when configured.
+
+        ``bar_intervals``/``FUBON_BAR_INTERVALS`` lists minute windows (for
+        example ``1,5,15,60``). Bars are anchored to the day and night session
+        starts and published as ``EVENT_FUBON_BAR`` and ``EVENT_FUBON_BAR +
+        vt_symbol`` once they close, the way vn.py publishes ticks.
+        """
+
+        windows = parse_bar_windows(
+            self._resolve_config_value("bar_intervals", setting, env_key="FUBON_BAR_INTERVALS")
+        )
+        self._stop_bar_aggregation()
+        if not windows:
+            return
+        aggregator = BarAggregator(
+            self._publish_local_bar,
+            sessions=((DAY_SESSION_START, DAY_SESSION_END), (NIGHT_SESSION_START, NIGHT_SESSION_END)),
+            tz=TAIPEI_TZ,
+            windows=windows,
+            gateway_name=self.gateway_name,
+            name=f"{self.gateway_name.lower()}-bar-aggregator",
+            logger=self.logger,
+        )
+        aggregator.start()
+        self._bar_aggregator = aggregator
+        self.logger.info(
+            "Local bar aggregation enabled (windows=%s)",
+            ",".join(str(window) for window in windows),
+            extra={"gateway_state": "bar_aggregation"},
+        )
+
+    def _stop_bar_aggregation(self) -> None:
+        aggregator = self._bar_aggregator
+        self._bar_aggregator = None
+        if aggregator is not None:
+            aggregator.stop()
+
+    def _publish_local_bar(self, bar: BarData) -> None:
+        self._put_event(EVENT_FUBON_BAR, bar)
+        self._put_event(EVENT_FUBON_BAR + bar.vt_symbol, bar)
+
+    def get_bar_stats(self) -> Dict[str, int]:
+        """
+        Return local bar aggregation counters (trades, bars, late, out_of_session, open_bars).
+        """
+
+        aggregator = self._bar_aggregator
+        return aggregator.stats() if aggregator else {}
+
+    def _start_gap_detection(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Track ``trades``/``books`` sequence numbers and flag gaps as they happen.
+
+        ``gap_detection``/``FUBON_GAP_DETECTION`` turns detection on; trade gaps
+        are then recovered through :meth:`fetch_trades_history` on a bounded
+        background worker unless ``gap_backfill``/``FUBON_GAP_BACKFILL`` is off.
+        Book sequences are only checked while the order book engine is
+        disabled, since the engine already resnapshots on gaps.
+        """
+
+        self._stop_gap_detection()
+        enabled = self._resolve_config_value("gap_detection", setting, env_key="FUBON_GAP_DETECTION")
+        if (enabled or "").lower() not in {"1", "true", "yes", "on"}:
+            return
+        self._gap_detector = SequenceGapDetector()
+        backfill = self._resolve_config_value("gap_backfill", setting, env_key="FUBON_GAP_BACKFILL")
+        if (backfill or "").lower() not in {"0", "false", "no", "off"}:
+            backfiller = GapBackfiller(
+                self._backfill_trade_gap,
+                on_done=self._on_gap_backfilled,
+                name=f"{self.gateway_name.lower()}-gap-backfill",
+                logger=self.logger,
+            )
+            backfiller.start()
+            self._gap_backfiller = backfiller
+        self.logger.info(
+            "Sequence gap detection enabled (backfill=%s)",
+            "on" if self._gap_backfiller is not None else "off",
+            extra={"gateway_state": "gap_detection"},
+        )
+
+    def _stop_gap_detection(self) -> None:
+        backfiller = self._gap_backfiller
+        self._gap_backfiller = None
+        self._gap_detector = None
+        if backfiller is not None:
+            backfiller.stop()
+
+    def _observe_sequence(
+        self, symbol: str, channel: str, seq: Optional[int], ts: Optional[datetime]
+    ) -> None:
+        detector = self._gap_detector
+        if detector is None:
+            return
+        gap = detector.observe(symbol, channel, seq, ts)
+        if gap is None:
+            return
+        self.logger.warning(
+            "Sequence gap on %s %s: missing %s-%s (%s messages)",
+            symbol,
+            channel,
+            gap.start_seq,
+            gap.end_seq,
+            gap.missing,
+            extra={"gateway_state": "seq_gap"},
+        )
+        backfiller = self._gap_backfiller
+        if backfiller is not None and channel == "trades" and not backfiller.submit(gap):
+            self.logger.warning(
+                "Backfill queue full; gap on %s %s-%s left for offline reconcile",
+                symbol,
+                gap.start_seq,
+                gap.end_seq,
+                extra={"gateway_state": "seq_gap"},
+            )
+
+    def _backfill_trade_gap(self, gap: GapEvent) -> List[TradeData]:
+        """
+        Fetch the trades missing in ``gap`` from the REST intraday endpoint.
+
+        Trade serials count from 1 within a session, so serial ``n`` is read at
+        ``offset=n - 1``. Results are filtered to the missing serial range, so
+        an unexpected page layout can only lower the recovered count.
+        """
+
+        after_hours = any(
+            key[2] for key in list(self._active_subscriptions) if key[0] == "trades" and key[1] == gap.symbol
+        )
+        trades = self.fetch_trades_history(
+            gap.symbol,
+            session="afterhours" if after_hours else None,
+            offset=gap.start_seq - 1,
+            limit=min(gap.missing, DEFAULT_GAP_BACKFILL_LIMIT),
+        )
+        recovered: List[TradeData] = []
+        for trade in trades:
+            try:
+                serial = int(trade.tradeid)
+            except (TypeError, ValueError):
+                continue
+            if gap.start_seq <= serial <= gap.end_seq:
+                recovered.append(trade)
+        return recovered
+
+    def _on_gap_backfilled(
+        self, gap: GapEvent, trades: Optional[List[TradeData]], error: Optional[BaseException]
+    ) -> None:
+        """
+        Publish the outcome of a live backfill as a ``backfill`` raw event.
+
+        A failed fetch is published too, as ``pending`` (the ``reconcile_log``
+        status for gaps left to offline reconcile) with the error text in ``error``.
+        """
+
+        trades = trades or []
+        if error is not None:
+            status = "pending"
+            self.logger.warning(
+                "Backfill failed for %s seq %s-%s: %s",
+                gap.symbol,
+                gap.start_seq,
+                gap.end_seq,
+                error,
+                extra={"gateway_state": "seq_gap"},
+            )
+        else:
+            status = "backfilled" if len(trades) >= gap.missing else "pending"
+            self.logger.info(
+                "Backfilled %s/%s trades for %s seq %s-%s",
+                len(trades),
+                gap.missing,
+                gap.symbol,
+                gap.start_seq,
+                gap.end_seq,
+                extra={"gateway_state": "seq_gap"},
+            )
+        payload = {
+            "channel": "trades",
+            "event_type": "backfill",
+            "symbol": gap.symbol,
+            "start_seq": gap.start_seq,
+            "end_seq": gap.end_seq,
+            "gap_status": status,
+        }
+        if error is not None:
+            payload["error"] = str(error)
+        self._put_event(EVENT_FUBON_MARKET_RAW, MarketRawView(payload, {"trades": trades, "gap": gap}))
+
+    def get_gap_stats(self) -> Dict[str, int]:
+        """
+        Return sequence gap counters; backfill counters carry a ``backfill_`` prefix.
+        """
+
+        detector = self._gap_detector
+        if detector is None:
+            return {}
+        stats = detector.stats()
+        backfiller = self._gap_backfiller
+        if backfiller is not None:
+            stats.update({f"backfill_{key}": value for key, value in backfiller.stats().items()})
+        return stats
+
+    def _configure_ws_pool(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Size the websocket connection pool.
+
+        ``ws_connections``/``FUBON_WS_CONNECTIONS`` (default 1, vendor maximum 5)
+        sets how many FutOpt connections subscriptions may spread over, and
+        ``ws_max_subscriptions``/``FUBON_WS_MAX_SUBSCRIPTIONS`` the cap per
+        connection (vendor limit 200). A further connection is only opened once
+        the earlier ones are full.
+        """
+
+        def _int_option(key: str, env_key: str, default: int) -> int:
+            value = self._resolve_config_value(key, setting, env_key=env_key)
+            try:
+                return max(1, int(value)) if value else default
+            except ValueError:
+                self.logger.warning("Invalid %s=%r; using %s", env_key, value, default)
+                return default
+
+        connections = _int_option("ws_connections", "FUBON_WS_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        if connections > VENDOR_MAX_CONNECTIONS:
+            self.logger.warning(
+                "FUBON_WS_CONNECTIONS=%s exceeds the vendor limit; using %s",
+                connections,
+                VENDOR_MAX_CONNECTIONS,
+            )
+        max_subscriptions = _int_option(
+            "ws_max_subscriptions", "FUBON_WS_MAX_SUBSCRIPTIONS", DEFAULT_MAX_SUBSCRIPTIONS
+        )
+        with self._ws_lock:
+            pool = SubscriptionPool(max_subscriptions=max_subscriptions, max_connections=connections)
+            for key in self._active_subscriptions:
+                pool.bind(key, self._ws_pool.connection_for(key) or 0)
+            self._ws_pool = pool
+        if pool.max_connections > 1:
+            self.logger.info(
+                "Websocket pool: up to %s connections of %s subscriptions",
+                pool.max_connections,
+                pool.max_subscriptions,
+                extra={"gateway_state": "ws_pool"},
+            )
+
+    def _configure_subscription_queue(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Read ``subscribe_window_ms``/``FUBON_SUBSCRIBE_WINDOW_MS`` (default 20), the
+        time :meth:`subscribe_async` waits to coalesce requests into one batch.
+        ``subscribe_async``/``FUBON_SUBSCRIBE_ASYNC`` makes vn.py's ``subscribe``
+        queue through it instead of blocking the caller.
+        """
+
+        nonblocking = self._resolve_config_value("subscribe_async", setting, env_key="FUBON_SUBSCRIBE_ASYNC")
+        self._subscribe_nonblocking = (nonblocking or "").lower() in {"1", "true", "yes", "on"}
+        value = self._resolve_config_value("subscribe_window_ms", setting, env_key="FUBON_SUBSCRIBE_WINDOW_MS")
+        try:
+            self._subscribe_window_ms = max(0.0, float(value)) if value else float(DEFAULT_SUBSCRIBE_WINDOW_MS)
+        except ValueError:
+            self.logger.warning("Invalid FUBON_SUBSCRIBE_WINDOW_MS=%r; using %s", value, DEFAULT_SUBSCRIBE_WINDOW_MS)
+            self._subscribe_window_ms = float(DEFAULT_SUBSCRIBE_WINDOW_MS)
+
+    def _ensure_subscription_queue(self) -> SubscriptionQueue:
+        with self._ws_lock:
+            if self._subscription_queue is None:
+                subscription_queue = SubscriptionQueue(
+                    self._send_queued_subscriptions,
+                    window=self._subscribe_window_ms / 1000.0,
+                    max_batch=self._ws_pool.max_subscriptions,
+                    name=f"{self.gateway_name.lower()}-subscribe",
+                    logger=self.logger,
+                )
+                subscription_queue.start()
+                self._subscription_queue = subscription_queue
+            return self._subscription_queue
+
+    def _stop_subscription_queue(self) -> None:
+        subscription_queue = self._subscription_queue
+        self._subscription_queue = None
+        if subscription_queue is not None:
+            subscription_queue.stop()
+
+    def _send_queued_subscriptions(
+        self, action: str, channel: str, symbols: list[str], after_hours: Optional[bool]
+    ) -> Dict[str, Any]:
+        """
+        Worker-side half of :meth:`subscribe_async`/:meth:`unsubscribe_async`.
+
+        A rejected symbol maps to its own error; the rest of the batch is still sent.
+        """
+
+        if action == ACTION_UNSUBSCRIBE:
+            self.unsubscribe_quotes(symbols, channels=(channel,), after_hours=after_hours)
+            return {symbol: None for symbol in symbols}
+        errors: Dict[str, Exception] = {}
+        error: Optional[Exception] = None
+        try:
+            self._subscribe_quotes(
+                symbols, channels=(channel,), after_hours=after_hours, errors=errors
+            )
+        except Exception as exc:
+            error = exc
+        results: Dict[str, Any] = {}
+        for symbol in symbols:
+            key = (channel, symbol, after_hours)
+            if key in self._active_subscriptions:
+                results[symbol] = self._subscription_ids_by_key.get(key)
+            elif symbol in errors:
+                results[symbol] = errors[symbol]
+            elif error is not None:
+                results[symbol] = error
+        return results
+
+    def get_subscription_queue_stats(self) -> Dict[str, int]:
+        """Return counters of the :meth:`subscribe_async` queue (empty before first use)."""
+
+        subscription_queue = self._subscription_queue
+        return subscription_queue.stats() if subscription_queue is not None else {}
+
+    def get_ws_pool_stats(self) -> Dict[str, Any]:
+        """
+        Return subscription placement counters, which pool connections are up and
+        the outcome of the last resubscription (keys, requests, ``elapsed_ms``).
+        """
+
+        stats = self._ws_pool.stats()
+        with self._ws_lock:
+            stats["connected"] = [bool(self._ws_connected)] + [
+                bool(self._ws_pool_connected.get(index)) for index in range(1, self._ws_pool.max_connections)
+            ]
+        stats["last_resubscribe"] = dict(self._last_resubscribe)
+        return stats
+
+    def _start_latency_tracking(self, setting: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Measure per-channel latency from SDK receipt to event put.
+
+        ``latency_tracking``/``FUBON_LATENCY_TRACKING`` turns it on, as does a
+        ``latency_warn_ms``/``FUBON_LATENCY_WARN_MS`` threshold, which logs a
+        rate-limited warning when a message's receive-to-put time exceeds it.
+        ``latency_log_interval``/``FUBON_LATENCY_LOG_INTERVAL`` (seconds) logs a
+        periodic percentile summary. Exchange-to-receive skew is stored in
+        ``latency_ms`` on ticks, trades and raw envelopes.
+        """
+
+        enabled = self._resolve_config_value("latency_tracking", setting, env_key="FUBON_LATENCY_TRACKING")
+        warn_ms = parse_warn_ms(
+            self._resolve_config_value("latency_warn_ms", setting, env_key="FUBON_LATENCY_WARN_MS")
+        )
+        if (enabled or "").lower() not in {"1", "true", "yes", "on"} and warn_ms is None:
+            self._latency_tracker = None
+            return
+        interval = self._resolve_config_value("latency_log_interval", setting, env_key="FUBON_LATENCY_LOG_INTERVAL")
+        try:
+            summary_interval = float(interval) if interval else None
+        except ValueError:
+            self.logger.warning("Invalid FUBON_LATENCY_LOG_INTERVAL=%r; summaries disabled", interval)
+            summary_interval = None
+        self._latency_tracker = LatencyTracker(
+            warn_ms=warn_ms, summary_interval=summary_interval, logger=self.logger
+        )
+        self.logger.info(
+            "Market data latency tracking enabled (warn_ms=%s)",
+            warn_ms,
+            extra={"gateway_state": "latency"},
+        )
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Return ``{channel: {stage: percentiles}}`` plus an ``alerts`` count per channel.
+
+        Stages are ``decode`` (receipt to decoded, including dispatch queue
+        time), ``normalize``, ``publish``, ``total`` and ``skew`` (exchange
+        time to receipt).
+        """
+
+        tracker = self._latency_tracker
+        if tracker is None:
+            return {}
+        return {"channels": tracker.snapshot(), "alerts": tracker.alerts()}
+
+    def get_book_engine_stats(self) -> Dict[str, int]:
+        """
+        Return order book engine counters (snapshots, deltas, gaps, resnapshot requests).
+        """
+
+        engine = self._book_engine
+        return engine.stats() if engine else {}
+
+    def get_normalization_cache_stats(self) -> Dict[str, Any]:
+        """
+        Return exchange/symbol/product memo cache counters and alias table sizes.
+        """
+
+        stats: Dict[str, Any] = dict(get_normalization_cache_stats())
+        stats["aliases"] = {
+            "symbol": len(self._symbol_aliases),
+            "symbol_exchange": len(self._symbol_exchange_aliases),
+        }
+        return stats
+
+    def register_raw_handler(self, handler: Callable[[Any], None]) -> None:
+        """
+        Register ``handler`` for ``EVENT_FUBON_MARKET_RAW`` on the event engine.
+
+        Under ``emit_raw=auto`` raw events are only built while at least one
+        handler is registered through this method.
+        """
+
+        self.event_engine.register(EVENT_FUBON_MARKET_RAW, handler)
+        self._raw_handlers.append(handler)
+
+    def unregister_raw_handler(self, handler: Callable[[Any], None]) -> None:
+        if handler not in self._raw_handlers:
+            return
+        self._raw_handlers.remove(handler)
+        self.event_engine.unregister(EVENT_FUBON_MARKET_RAW, handler)
+
+    def _should_emit_raw(self) -> bool:
+        """
+        Decide whether ``EVENT_FUBON_MARKET_RAW`` should be published.
+
+        ``emit_raw``/``FUBON_EMIT_RAW`` accepts ``always`` (default), ``auto`` or
+        ``never``. ``auto`` emits only while a handler registered through
+        :meth:`register_raw_handler` is listening; handlers registered directly
+        on the event engine are not visible to the gateway and need ``always``.
+        """
+
+        mode = self._raw_emit_mode
+        if mode == RAW_EMIT_ALWAYS:
+            return True
+        if mode == RAW_EMIT_NEVER:
+            return False
+        return bool(self._raw_handlers)
+
+    def _on_ws_message(self, message: Any) -> None:
+        dispatcher = self._ws_dispatcher
+        if dispatcher is not None and dispatcher.running:
+            dispatcher.submit(message)
+            return
+        self._handle_ws_message(message)
+
+    def _handle_ws_message(self, message: str, received: Optional[ReceiveStamp] = None) -> None:
+        """
+        Decode a websocket frame once and fan the resulting objects out as events.
+
+        ``parse_market_events`` already unwraps the ``data`` envelope, so the
+        per-event payload is handed to the normalisers as-is (no second flatten)
+        and the raw event reuses what they produced instead of re-parsing. Raw
+        events are read-only :class:`MarketRawView` objects and are skipped when
+        nobody listens (see :meth:`_should_emit_raw`). ``received`` is the
+        dispatcher's receipt stamp when latency tracking is on.
+        """
+
         if not self.market_api:
             return
-        events = self.market_api.parse_market_events(message)
+        tracker = self._latency_tracker
+        if tracker is not None and received is None:
+            received = receive_stamp()
+        emit_raw = self._should_emit_raw()
+        bar_aggregator = self._bar_aggregator
+        gap_detector = self._gap_detector
+        consume_trades = bar_aggregator is not None or gap_detector is not None
+        # The book engine rebuilds depth from the payload, so the levels are only walked there.
+        events = self.market_api.parse_market_events(message, book_levels=self._book_engine is None)
+        decoded_ns = time.perf_counter_ns() if tracker is not None else 0
         for event in events:
-            payload = dict(event.payload)
-            if event.channel and "channel" not in payload:
-                payload["channel"] = event.channel
-            payload.setdefault("event_type", event.event_type)
-
-            channel = (event.channel or "").lower()
-            if event.event_type == "orderbook" and event.tick:
-                event.tick.gateway_name = self.gateway_name
-                payload["tick"] = event.tick
-                self._put_event(EVENT_TICK, event.tick)
-            else:
-                if channel in {"trades", "trade"} or event.event_type == "trade":
-                    trade = self._normalize_market_trade(event.payload)
-                    if trade:
-                        payload["trade"] = trade
-                elif channel in {"candles", "candle", "aggregates", "aggregate"}:
-                    bar = self._normalize_market_bar(event.payload)
-                    if bar:
-                        payload["bar"] = bar
+            source = event.payload
+            channel = event.channel or ""
+            latency_channel = channel or event.event_type
+            normalized_ns = 0
+            is_book = event.event_type == "orderbook" and event.tick is not None
+            is_trade = not is_book and (event.event_type == "trade" or channel in {"trades", "trade"})
+            if not emit_raw and not is_book and not (is_trade and consume_trades):
+                # Trades and bars are only surfaced through the raw event (and local bars).
+                continue
 
-            self._put_event(EVENT_FUBON_MARKET_RAW, payload)
+            extra: Dict[str, Any] = {}
+            if event.channel and "channel" not in source:
+                extra["channel"] = event.channel
+            if "event_type" not in source:
+                extra["event_type"] = event.event_type
+
+            if is_book:
+                tick = event.tick
+                tick.gateway_name = self.gateway_name
+                if gap_detector is not None and self._book_engine is None:
+                    self._observe_sequence(tick.symbol, "books", book_seq_from_payload(source), tick.datetime)
+                # With the book engine on, deltas outside a valid book only surface as raw events.
+                if self._book_engine is None or self._apply_book_update(tick, source):
+                    extra["tick"] = tick
+                    if tracker is not None:
+                        normalized_ns = time.perf_counter_ns()
+                        latency_ms = tracker.record_skew(latency_channel, received[1], tick.datetime)
+                        tick_extra = getattr(tick, "extra", None)
+                        if tick_extra is None:
+                            tick.extra = {"latency_ms": latency_ms}
+                        else:
+                            tick_extra["latency_ms"] = latency_ms
+                    conflator = self._book_conflator
+                    if conflator is not None:
+                        conflator.offer(
+                            getattr(tick, "vt_symbol", None)
+                            or vt_symbol_from_parts(tick.symbol, tick.exchange),
+                            tick,
+                            MarketRawView(source, extra) if emit_raw else None,
+                        )
+                        if tracker is not None:
+                            tracker.observe(
+                                latency_channel,
+                                received,
+                                decoded_ns=decoded_ns,
+                                normalized_ns=normalized_ns,
+                                published_ns=time.perf_counter_ns(),
+                            )
+                        continue
+                    self._put_event(EVENT_TICK, tick)
+            elif is_trade:
+                normalized = self._normalize_market_trade_envelope(source, flatten=False)
+                if normalized:
+                    if tracker is not None:
+                        normalized_ns = time.perf_counter_ns()
+                        latency_ms = tracker.record_skew(latency_channel, received[1], normalized.raw.event_ts_utc)
+                        normalized.raw.latency_ms = latency_ms
+                        normalized.trade.extra["latency_ms"] = latency_ms
+                    extra["trade"] = normalized.trade
+                    extra["envelope"] = normalized.raw
+                    if gap_detector is not None:
+                        self._observe_sequence(
+                            normalized.trade.symbol, "trades", normalized.raw.seq, normalized.raw.event_ts_utc
+                        )
+                    if bar_aggregator is not None:
+                        trade = normalized.trade
+                        bar_aggregator.on_trade(
+                            trade.symbol, trade.exchange, normalized.raw.event_ts_utc, trade.price, trade.volume
+                        )
+            elif channel in {"candles", "candle", "aggregates", "aggregate"}:
+                bar = self._normalize_market_bar(source)
+                if bar:
+                    extra["bar"] = bar
+
+            if emit_raw:
+                self._put_event(EVENT_FUBON_MARKET_RAW, MarketRawView(source, extra))
+            if normalized_ns:
+                tracker.observe(
+                    latency_channel,
+                    received,
+                    decoded_ns=decoded_ns,
+                    normalized_ns=normalized_ns,
+                    published_ns=time.perf_counter_ns(),
+                )
 
     def _handle_ws_disconnect(self, *args: Any, **kwargs: Any) -> None:
         if self._closing:
@@ -2340,6 +3910,34 @@ class FubonGateway(BaseGateway):
         if self._should_reconnect_after_error(error):
             self._schedule_ws_reconnect()
 
+    def _handle_pool_disconnect(self, index: int, *args: Any, **kwargs: Any) -> None:
+        if self._closing:
+            return
+        self.logger.warning(
+            "FutOpt websocket pool connection %s disconnected: args=%s kwargs=%s",
+            index,
+            args,
+            kwargs,
+            extra={"gateway_state": "ws_disconnected"},
+        )
+        with self._ws_lock:
+            self._ws_pool_connected[index] = False
+        self._schedule_ws_reconnect()
+
+    def _handle_pool_error(self, index: int, error: Any) -> None:
+        if self._closing:
+            return
+        self.logger.warning(
+            "FutOpt websocket pool connection %s error: %s",
+            index,
+            error,
+            extra={"gateway_state": "ws_error"},
+        )
+        with self._ws_lock:
+            self._ws_pool_connected[index] = False
+        if self._should_reconnect_after_error(error):
+            self._schedule_ws_reconnect()
+
     def _handle_ws_authenticated(self, *_args: Any, **_kwargs: Any) -> None:
         self.logger.debug(
             "FutOpt websocket authenticated.",
@@ -2442,6 +4040,7 @@ class FubonGateway(BaseGateway):
         try:
             self._prepare_realtime()
             self._ensure_websocket_client(register_handler=True)
+            self._recover_ws_pool()
             self.logger.info(
                 "Websocket reconnect successful.",
                 extra={"gateway_state": "ws_reconnected"},
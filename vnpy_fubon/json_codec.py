@@ -0,0 +1,118 @@
+"""
+Pluggable JSON decoders for websocket frames.
+
+``orjson`` or ``msgspec`` are used when installed, falling back to the standard
+library. The backend can be pinned via ``FUBON_JSON_DECODER`` (``auto``,
+``orjson``, ``msgspec`` or ``json``) or the gateway ``json_decoder`` setting.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - optional dependency
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment]
+
+LOGGER = logging.getLogger("vnpy_fubon.json_codec")
+
+DECODER_ENV_KEY = "FUBON_JSON_DECODER"
+AUTO_DECODER = "auto"
+
+JsonDecoder = Callable[[Union[str, bytes, bytearray]], Any]
+
+
+def _build_decoders() -> Dict[str, JsonDecoder]:
+    decoders: Dict[str, JsonDecoder] = {}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    if msgspec is not None:
+        decoders["msgspec"] = msgspec.json.Decoder().decode
+    decoders["json"] = json.loads
+    return decoders
+
+
+# Insertion order doubles as the preference order for ``auto``.
+_DECODERS: Dict[str, JsonDecoder] = _build_decoders()
+_default_decoder: Optional[JsonDecoder] = None
+_default_name: Optional[str] = None
+
+
+def available_decoders() -> List[str]:
+    """
+    Return the installed decoder backends in preference order.
+    """
+
+    return list(_DECODERS)
+
+
+def resolve_decoder_name(name: Optional[str] = None) -> str:
+    """
+    Resolve a requested backend name to one that is installed.
+
+    ``None``/``auto`` pick the fastest available backend. Unknown or missing
+    backends fall back to the automatic choice with a warning.
+    """
+
+    requested = (name if name is not None else os.getenv(DECODER_ENV_KEY, "")).strip().lower()
+    if requested in ("", AUTO_DECODER):
+        return next(iter(_DECODERS))
+    if requested in ("stdlib", "std"):
+        requested = "json"
+    if requested in _DECODERS:
+        return requested
+    fallback = next(iter(_DECODERS))
+    LOGGER.warning(
+        "JSON decoder '%s' is not available (installed: %s); using '%s'.",
+        requested,
+        ", ".join(_DECODERS),
+        fallback,
+    )
+    return fallback
+
+
+def get_json_decoder(name: Optional[str] = None) -> JsonDecoder:
+    """
+    Return a decoder callable for ``name`` (or the configured default).
+    """
+
+    if name is None:
+        return _get_default_decoder()
+    return _DECODERS[resolve_decoder_name(name)]
+
+
+def _get_default_decoder() -> JsonDecoder:
+    global _default_decoder, _default_name
+    if _default_decoder is None:
+        _default_name = resolve_decoder_name()
+        _default_decoder = _DECODERS[_default_name]
+        LOGGER.debug("Using '%s' JSON decoder for websocket frames.", _default_name)
+    return _default_decoder
+
+
+def decode_json(raw: Union[str, bytes, bytearray]) -> Any:
+    """
+    Decode ``raw`` with the default backend.
+    """
+
+    return _get_default_decoder()(raw)
+
+
+__all__ = [
+    "AUTO_DECODER",
+    "DECODER_ENV_KEY",
+    "JsonDecoder",
+    "available_decoders",
+    "decode_json",
+    "get_json_decoder",
+    "resolve_decoder_name",
+]
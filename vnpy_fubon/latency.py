@@ -0,0 +1,316 @@
+"""
+Per-channel latency histograms for the market data path.
+
+Each frame is stamped when the SDK hands it over (monotonic and wall clock);
+later checkpoints (decode, normalise, event put, DB commit) are monotonic
+``perf_counter_ns`` readings, so stage latencies are immune to clock steps.
+The exchange-to-receive skew compares the vendor's event time with the wall
+clock at receipt and is what ``RawEnvelope.latency_ms`` carries.
+
+Histograms are HDR-style: values are bucketed log-linearly in microseconds
+(16 sub-buckets per power of two, about 6% relative precision) so recording
+is O(1) and memory stays bounded regardless of sample count.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+LOGGER = logging.getLogger("vnpy_fubon.latency")
+
+STAGE_DECODE = "decode"
+STAGE_NORMALIZE = "normalize"
+STAGE_PUBLISH = "publish"
+STAGE_COMMIT = "commit"
+STAGE_TOTAL = "total"
+STAGE_SKEW = "skew"
+
+DEFAULT_WARN_INTERVAL = 10.0
+PERCENTILES: Tuple[Tuple[str, float], ...] = (
+    ("p50_ms", 50.0),
+    ("p90_ms", 90.0),
+    ("p99_ms", 99.0),
+    ("p999_ms", 99.9),
+)
+
+_SUB_BUCKET_BITS = 4
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_LINEAR_LIMIT_BITS = _SUB_BUCKET_BITS + 1
+
+ReceiveStamp = Tuple[int, float]
+
+
+def receive_stamp() -> ReceiveStamp:
+    """Return ``(perf_counter_ns, wall_seconds)`` taken at frame receipt."""
+
+    return time.perf_counter_ns(), time.time()
+
+
+def _bucket_index(value_us: int) -> int:
+    shift = value_us.bit_length() - _LINEAR_LIMIT_BITS
+    if shift <= 0:
+        return value_us
+    return _SUB_BUCKETS * shift + (value_us >> shift)
+
+
+def _bucket_upper_us(index: int) -> int:
+    shift = index // _SUB_BUCKETS - 1
+    if shift <= 0:
+        return index
+    return ((index - _SUB_BUCKETS * shift) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of microsecond samples; not thread-safe on its own.
+    """
+
+    __slots__ = ("_counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def record_us(self, value_us: int) -> None:
+        if value_us < 0:
+            value_us = 0
+        index = _bucket_index(value_us)
+        counts = self._counts
+        counts[index] = counts.get(index, 0) + 1
+        if self.count == 0 or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+        self.count += 1
+        self.total_us += value_us
+
+    def percentile(self, percent: float) -> float:
+        """Return the upper bound (ms) of the bucket holding the ``percent`` quantile."""
+
+        if not self.count:
+            return 0.0
+        target = max(1, int(self.count * percent / 100.0 + 0.999999))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(_bucket_upper_us(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def snapshot(self) -> Dict[str, float]:
+        stats: Dict[str, float] = {
+            "count": self.count,
+            "min_ms": self.min_us / 1000.0,
+            "max_ms": self.max_us / 1000.0,
+            "mean_ms": (self.total_us / self.count / 1000.0) if self.count else 0.0,
+        }
+        for name, percent in PERCENTILES:
+            stats[name] = self.percentile(percent)
+        return stats
+
+
+class LatencyTracker:
+    """
+    Thread-safe ``(channel, stage)`` histograms with threshold alerts.
+
+    Samples of ``warn_stage`` above ``warn_ms`` log a warning at most once per
+    ``warn_interval`` seconds per channel; every breach is counted in
+    :meth:`alerts`. With ``summary_interval`` set, a percentile summary per
+    channel is logged from the recording thread once the interval has passed.
+    """
+
+    def __init__(
+        self,
+        *,
+        warn_ms: Optional[float] = None,
+        warn_stage: str = STAGE_TOTAL,
+        warn_interval: float = DEFAULT_WARN_INTERVAL,
+        summary_interval: Optional[float] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.warn_ms = float(warn_ms) if warn_ms else None
+        self.warn_stage = warn_stage
+        self.warn_interval = max(0.0, float(warn_interval))
+        self.summary_interval = float(summary_interval) if summary_interval else None
+        self.logger = logger or LOGGER
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._alerts: Dict[str, int] = {}
+        self._last_warn: Dict[str, float] = {}
+        self._last_summary = time.monotonic()
+
+    def record(self, channel: str, stage: str, elapsed_ns: int) -> None:
+        """Record a monotonic duration in nanoseconds."""
+
+        self.record_us(channel, stage, elapsed_ns // 1000)
+
+    def record_us(self, channel: str, stage: str, value_us: int) -> None:
+        key = (channel, stage)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record_us(value_us)
+        if (
+            self.warn_ms is not None
+            and stage == self.warn_stage
+            and value_us > self.warn_ms * 1000.0
+        ):
+            self._alert(channel, stage, value_us / 1000.0)
+        if (
+            self.summary_interval is not None
+            and time.monotonic() - self._last_summary >= self.summary_interval
+        ):
+            self.log_summary()
+
+    def record_skew(
+        self, channel: str, received_wall: float, exchange_ts: Optional[datetime]
+    ) -> Optional[int]:
+        """
+        Record exchange-time-to-receive skew; returns it in whole milliseconds.
+
+        Negative skews (exchange clock ahead of ours) are returned as-is but
+        recorded as zero.
+        """
+
+        if exchange_ts is None:
+            return None
+        if exchange_ts.tzinfo is None:
+            exchange_ts = exchange_ts.replace(tzinfo=timezone.utc)
+        skew_us = int((received_wall - exchange_ts.timestamp()) * 1_000_000)
+        self.record_us(channel, STAGE_SKEW, skew_us)
+        return skew_us // 1000
+
+    def observe(
+        self,
+        channel: str,
+        received: ReceiveStamp,
+        *,
+        decoded_ns: Optional[int] = None,
+        normalized_ns: Optional[int] = None,
+        published_ns: Optional[int] = None,
+        committed_ns: Optional[int] = None,
+        exchange_ts: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """
+        Record every stage between the checkpoints given; returns the skew in ms.
+
+        Stages are measured between consecutive checkpoints that are present,
+        and ``total`` spans receipt to the last one.
+        """
+
+        received_ns, received_wall = received
+        previous = received_ns
+        for stage, mark in (
+            (STAGE_DECODE, decoded_ns),
+            (STAGE_NORMALIZE, normalized_ns),
+            (STAGE_COMMIT, committed_ns),
+            (STAGE_PUBLISH, published_ns),
+        ):
+            if mark is None:
+                continue
+            self.record(channel, stage, mark - previous)
+            previous = mark
+        if previous != received_ns:
+            self.record(channel, STAGE_TOTAL, previous - received_ns)
+        return self.record_skew(channel, received_wall, exchange_ts)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return ``{channel: {stage: {count, min_ms, max_ms, mean_ms, p50_ms, ...}}}``."""
+
+        with self._lock:
+            items = [(key, histogram.snapshot()) for key, histogram in self._histograms.items()]
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (channel, stage), stats in sorted(items):
+            result.setdefault(channel, {})[stage] = stats
+        return result
+
+    def alerts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._alerts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._alerts.clear()
+            self._last_warn.clear()
+
+    def log_summary(self) -> None:
+        """Log one structured line per channel with the ``total`` and ``skew`` percentiles."""
+
+        self._last_summary = time.monotonic()
+        for channel, stages in self.snapshot().items():
+            total = stages.get(STAGE_TOTAL, {})
+            skew = stages.get(STAGE_SKEW, {})
+            self.logger.info(
+                "Latency %s: total p50=%.3fms p99=%.3fms max=%.3fms; skew p50=%.3fms p99=%.3fms (n=%s)",
+                channel,
+                total.get("p50_ms", 0.0),
+                total.get("p99_ms", 0.0),
+                total.get("max_ms", 0.0),
+                skew.get("p50_ms", 0.0),
+                skew.get("p99_ms", 0.0),
+                total.get("count", 0),
+                extra={
+                    "gateway_state": "latency",
+                    "channel": channel,
+                    "latency_ms": total.get("p99_ms"),
+                },
+            )
+
+    def _alert(self, channel: str, stage: str, value_ms: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._alerts[channel] = self._alerts.get(channel, 0) + 1
+            last = self._last_warn.get(channel)
+            if last is not None and now - last < self.warn_interval:
+                return
+            self._last_warn[channel] = now
+            count = self._alerts[channel]
+        self.logger.warning(
+            "Latency %s %s %.3fms exceeds %.0fms (%s breaches so far)",
+            channel,
+            stage,
+            value_ms,
+            self.warn_ms,
+            count,
+            extra={
+                "gateway_state": "latency_alert",
+                "channel": channel,
+                "latency_ms": round(value_ms, 3),
+            },
+        )
+
+
+def parse_warn_ms(value: Any) -> Optional[float]:
+    """Parse a ``latency_warn_ms`` setting; empty, zero or invalid values disable alerts."""
+
+    if value in (None, ""):
+        return None
+    try:
+        parsed = float(value)
+    except (TypeError, ValueError):
+        LOGGER.warning("Ignoring invalid latency_warn_ms %r", value)
+        return None
+    return parsed if parsed > 0 else None
+
+
+__all__ = [
+    "LatencyHistogram",
+    "LatencyTracker",
+    "STAGE_COMMIT",
+    "STAGE_DECODE",
+    "STAGE_NORMALIZE",
+    "STAGE_PUBLISH",
+    "STAGE_SKEW",
+    "STAGE_TOTAL",
+    "parse_warn_ms",
+    "receive_stamp",
+]
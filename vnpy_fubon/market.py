@@ -4,15 +4,17 @@ Market data helpers for subscription and quote normalisation.
 
 from __future__ import annotations
 
-import json
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from decimal import Decimal, InvalidOperation
-from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from .exceptions import FubonSDKMethodNotFoundError
+from .json_codec import JsonDecoder, get_json_decoder
 from .normalization import normalize_exchange
+from .numeric import NumberConverter, get_number_converter
+from .orderbook import DEFAULT_BOOK_DEPTH, apply_depth_to_tick, extract_levels
+from .timestamps import parse_timestamp
 from .vnpy_compat import Exchange, TickData
 
 SUBSCRIBE_METHODS = ("subscribe", "subscribe_market_data", "AddQuote")
@@ -45,25 +47,129 @@ class MarketEvent:
     event_type: str
 
 
-def _ensure_decimal(value: Any) -> Decimal:
-    if isinstance(value, Decimal):
-        return value
-    if value is None:
-        return Decimal("0")
-    if isinstance(value, (int, float)):
-        return Decimal(str(value))
-    if isinstance(value, str):
-        try:
-            return Decimal(value.replace(",", "").strip())
-        except InvalidOperation:
-            return Decimal("0")
-    return Decimal("0")
+class MarketRawView(Mapping[str, Any]):
+    """
+    Read-only view over a decoded payload plus gateway-added fields.
+
+    ``EVENT_FUBON_MARKET_RAW`` consumers see the same keys as before (``channel``,
+    ``event_type``, ``tick``/``trade``/``bar``) without the gateway copying the
+    payload per event. Added fields shadow payload keys; :meth:`to_dict`
+    materialises a plain ``dict`` on demand.
+    """
+
+    __slots__ = ("_payload", "_extra", "_merged")
+
+    def __init__(self, payload: Mapping[str, Any], extra: Optional[Mapping[str, Any]] = None) -> None:
+        self._payload = payload
+        self._extra: Mapping[str, Any] = extra or {}
+        self._merged: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._extra:
+            return self._extra[key]
+        return self._payload[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._extra or key in self._payload
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialise())
+
+    def __len__(self) -> int:
+        return len(self._materialise())
+
+    def __repr__(self) -> str:
+        return f"MarketRawView({self._materialise()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._materialise())
+
+    def _materialise(self) -> Dict[str, Any]:
+        if self._merged is None:
+            merged = dict(self._payload)
+            merged.update(self._extra)
+            self._merged = merged
+        return self._merged
 
 
 def _normalize_exchange(raw: Any) -> Exchange:
     return normalize_exchange(raw)
 
 
+@dataclass(frozen=True)
+class FieldExtractor:
+    """
+    Precompiled ``payload.get(a) or payload.get(b) or ...`` lookup.
+
+    The key tuple is fixed at import time so the hot path is a short loop over
+    ``dict.get`` instead of rebuilding alias lists for every message.
+    """
+
+    keys: Tuple[str, ...]
+
+    def __call__(self, payload: Mapping[str, Any]) -> Any:
+        value: Any = None
+        for key in self.keys:
+            value = payload.get(key)
+            if value:
+                return value
+        return value
+
+
+@dataclass(frozen=True)
+class ChannelDecoder:
+    """
+    Decoder registered for a websocket channel.
+
+    Attributes
+    ----------
+    event_type:
+        Classification assigned to every payload on the channel.
+    to_tick:
+        Whether payloads should be mapped to TickData.
+    """
+
+    event_type: str
+    to_tick: bool = False
+
+
+_ORDERBOOK_DECODER = ChannelDecoder(event_type="orderbook", to_tick=True)
+_TRADE_DECODER = ChannelDecoder(event_type="trade")
+_AGGREGATE_DECODER = ChannelDecoder(event_type="aggregate")
+_CANDLE_DECODER = ChannelDecoder(event_type="candle")
+
+CHANNEL_DECODERS: Dict[str, ChannelDecoder] = {
+    "books": _ORDERBOOK_DECODER,
+    "book": _ORDERBOOK_DECODER,
+    "quotes": _ORDERBOOK_DECODER,
+    "orderbook": _ORDERBOOK_DECODER,
+    "depth": _ORDERBOOK_DECODER,
+    "trades": _TRADE_DECODER,
+    "trade": _TRADE_DECODER,
+    "aggregates": _AGGREGATE_DECODER,
+    "aggregate": _AGGREGATE_DECODER,
+    "candles": _CANDLE_DECODER,
+    "candle": _CANDLE_DECODER,
+}
+
+_EVENT_TYPE_DECODERS: Dict[str, ChannelDecoder] = {
+    decoder.event_type: decoder for decoder in CHANNEL_DECODERS.values()
+}
+
+# Bound for the key-signature classification cache used on unknown channels.
+_SIGNATURE_CACHE_LIMIT = 512
+
+_TICK_SYMBOL = FieldExtractor(("symbol", "code"))
+_TICK_TIMESTAMP = FieldExtractor(("timestamp", "update_time", "time"))
+_TICK_NAME = FieldExtractor(("name", "symbolName"))
+_TICK_LAST_PRICE = FieldExtractor(("last_price", "close", "price"))
+_TICK_VOLUME = FieldExtractor(("volume", "totalVolume"))
+_TICK_BID_PRICE = FieldExtractor(("bid_price", "bestBidPrice"))
+_TICK_BID_VOLUME = FieldExtractor(("bid_volume", "bestBidVolume"))
+_TICK_ASK_PRICE = FieldExtractor(("ask_price", "bestAskPrice"))
+_TICK_ASK_VOLUME = FieldExtractor(("ask_volume", "bestAskVolume"))
+
+
 class MarketAPI:
     """
     Handles market data subscriptions and converts raw quotes to TickData.
@@ -75,10 +181,23 @@ class MarketAPI:
         *,
         gateway_name: str = "Fubon",
         logger: Optional[logging.Logger] = None,
+        decoder: Optional[JsonDecoder] = None,
+        numeric_mode: Optional[str] = None,
     ) -> None:
         self.client = client
         self.gateway_name = gateway_name
         self.logger = logger or LOGGER
+        self._decode = decoder or get_json_decoder()
+        self._num: NumberConverter = get_number_converter(numeric_mode)
+        self._channel_decoders: Dict[str, ChannelDecoder] = dict(CHANNEL_DECODERS)
+        self._signature_cache: Dict[Tuple[bool, Tuple[Any, ...]], str] = {}
+
+    def register_channel_decoder(self, channel: str, decoder: ChannelDecoder) -> None:
+        """
+        Register (or override) the decoder used for ``channel``.
+        """
+
+        self._channel_decoders[channel.strip().lower()] = decoder
 
     def subscribe_quotes(
         self,
@@ -120,39 +239,38 @@ class MarketAPI:
             f"MarketAPI cannot find any of {candidates} on client {type(self.client).__name__}"
         )
 
-    def _to_tick_data(self, payload: Mapping[str, Any]) -> TickData:
-        symbol = str(payload.get("symbol") or payload.get("code") or "")
+    def _to_tick_data(self, payload: Mapping[str, Any], *, levels: bool = True) -> TickData:
+        num = self._num
+        symbol = str(_TICK_SYMBOL(payload) or "")
         exchange = _normalize_exchange(payload.get("exchange"))
-        timestamp = payload.get("timestamp") or payload.get("update_time") or payload.get("time")
-        if isinstance(timestamp, (int, float)):
-            dt = datetime.fromtimestamp(timestamp)
-        elif isinstance(timestamp, str):
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y%m%d%H%M%S"):
-                try:
-                    dt = datetime.strptime(timestamp, fmt)
-                    break
-                except ValueError:
-                    continue
-            else:
-                dt = datetime.now(timezone.utc)
-        elif isinstance(timestamp, datetime):
-            dt = timestamp
-        else:
-            dt = datetime.now(timezone.utc)
+        dt = parse_timestamp(
+            _TICK_TIMESTAMP(payload), source=("quote", "timestamp"), naive_tz=None
+        ) or datetime.now(timezone.utc)
 
         tick = TickData(
             symbol=symbol,
             exchange=exchange,
             datetime=dt,
-            name=str(payload.get("name") or payload.get("symbolName") or symbol),
-            last_price=_ensure_decimal(payload.get("last_price") or payload.get("close") or payload.get("price")),
-            volume=_ensure_decimal(payload.get("volume") or payload.get("totalVolume") or 0),
-            bid_price_1=_ensure_decimal(payload.get("bid_price") or payload.get("bestBidPrice")),
-            bid_volume_1=_ensure_decimal(payload.get("bid_volume") or payload.get("bestBidVolume")),
-            ask_price_1=_ensure_decimal(payload.get("ask_price") or payload.get("bestAskPrice")),
-            ask_volume_1=_ensure_decimal(payload.get("ask_volume") or payload.get("bestAskVolume")),
+            name=str(_TICK_NAME(payload) or symbol),
+            last_price=num(_TICK_LAST_PRICE(payload)),
+            volume=num(_TICK_VOLUME(payload) or 0),
+            bid_price_1=num(_TICK_BID_PRICE(payload)),
+            bid_volume_1=num(_TICK_BID_VOLUME(payload)),
+            ask_price_1=num(_TICK_ASK_PRICE(payload)),
+            ask_volume_1=num(_TICK_ASK_VOLUME(payload)),
             gateway_name=self.gateway_name,
         )
+        bids = payload.get("bids") if levels else None
+        asks = payload.get("asks") if levels else None
+        if bids or asks:
+            zero = num(0)
+            bid_prices, bid_sizes = extract_levels(bids, DEFAULT_BOOK_DEPTH, num, zero)
+            ask_prices, ask_sizes = extract_levels(asks, DEFAULT_BOOK_DEPTH, num, zero)
+            if tick.bid_price_1:
+                bid_prices[0], bid_sizes[0] = tick.bid_price_1, tick.bid_volume_1
+            if tick.ask_price_1:
+                ask_prices[0], ask_sizes[0] = tick.ask_price_1, tick.ask_volume_1
+            apply_depth_to_tick(tick, bid_prices, bid_sizes, ask_prices, ask_sizes)
         self.logger.debug("Mapped quote payload %s to %s", payload, tick)
         return tick
 
@@ -177,24 +295,28 @@ class MarketAPI:
                 items.append((event.tick, event.payload))
         return items
 
-    def parse_market_events(self, message: str) -> List[MarketEvent]:
+    def parse_market_events(self, message: str, *, book_levels: bool = True) -> List[MarketEvent]:
         """
         Decode a websocket message into structured market events.
+
+        Pass ``book_levels=False`` when the caller rebuilds depth itself (the
+        gateway's order book engine) so ticks only carry the top-of-book fields.
         """
 
         try:
-            decoded = json.loads(message)
+            decoded = self._decode(message)
         except Exception as exc:
             self.logger.debug("Unable to decode websocket message %s: %s", message, exc)
             return []
 
         events: List[MarketEvent] = []
         for channel, payload in self._expand_message(decoded):
-            event_type = self._infer_event_type(channel, payload)
+            decoder = self._resolve_decoder(channel, payload)
+            event_type = decoder.event_type if decoder else "other"
             tick: Optional[TickData] = None
-            if event_type == "orderbook":
+            if decoder is not None and decoder.to_tick:
                 try:
-                    tick = self._to_tick_data(payload)
+                    tick = self._to_tick_data(payload, levels=book_levels)
                 except Exception as exc:  # pragma: no cover - vendor payload
                     self.logger.debug("Failed to map websocket payload %s: %s", payload, exc)
                     event_type = "other"
@@ -231,17 +353,36 @@ class MarketAPI:
             return channel.strip().lower()
         return None
 
+    def _resolve_decoder(
+        self, channel: Optional[str], payload: Mapping[str, Any]
+    ) -> Optional[ChannelDecoder]:
+        """
+        Return the decoder for ``channel``; unknown channels fall back to key heuristics.
+        """
+
+        if channel:
+            decoder = self._channel_decoders.get(channel)
+            if decoder is not None:
+                return decoder
+        return _EVENT_TYPE_DECODERS.get(self._classify_by_keys(channel, payload))
+
     def _infer_event_type(self, channel: Optional[str], payload: Mapping[str, Any]) -> str:
+        decoder = self._resolve_decoder((channel or "").lower() or None, payload)
+        return decoder.event_type if decoder else "other"
+
+    def _classify_by_keys(self, channel: Optional[str], payload: Mapping[str, Any]) -> str:
+        # Payloads of one shape share their key order, so the verdict is cached per signature.
+        signature = (not channel, tuple(payload.keys()))
+        cached = self._signature_cache.get(signature)
+        if cached is not None:
+            return cached
+        event_type = self._classify_keys(channel, payload)
+        if len(self._signature_cache) < _SIGNATURE_CACHE_LIMIT:
+            self._signature_cache[signature] = event_type
+        return event_type
+
+    def _classify_keys(self, channel: Optional[str], payload: Mapping[str, Any]) -> str:
         lower_channel = (channel or "").lower()
-        if lower_channel in {"books", "book", "quotes", "orderbook", "depth"}:
-            return "orderbook"
-        if lower_channel in {"trades", "trade"}:
-            return "trade"
-        if lower_channel in {"aggregates", "aggregate"}:
-            return "aggregate"
-        if lower_channel in {"candles", "candle"}:
-            return "candle"
-
         keys = {str(key).lower() for key in payload.keys()}
         price_keys = {"bid_price", "bestbidprice", "ask_price", "bestaskprice"}
         volume_keys = {"bid_volume", "bestbidvolume", "ask_volume", "bestaskvolume"}
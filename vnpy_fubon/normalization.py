@@ -4,10 +4,18 @@ Utilities for normalising Fubon contract metadata to vn.py canonical values.
 
 from __future__ import annotations
 
-from typing import Any, Iterable, Mapping, MutableSequence, Sequence
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Mapping, MutableSequence, Sequence
 
 from .vnpy_compat import Exchange, Product
 
+# Bounded memo sizes. Inputs come from a few hundred symbols and a handful of
+# exchange/product spellings, so these comfortably hold a full trading day.
+EXCHANGE_CACHE_SIZE = 256
+SYMBOL_CACHE_SIZE = 8192
+PRODUCT_CACHE_SIZE = 256
+
 # Canonical exchange aliases. Keys are upper-cased input variants.
 EXCHANGE_ALIASES: Mapping[str, str] = {
     "": "",
@@ -95,6 +103,13 @@ def normalize_exchange(raw: Any, *, default: Any | None = None) -> Exchange:
     Map vendor-specific exchange identifiers to vn.py's Exchange enum.
     """
 
+    try:
+        return _normalize_exchange_cached(raw, default)
+    except TypeError:  # unhashable input
+        return _normalize_exchange(raw, default)
+
+
+def _normalize_exchange(raw: Any, default: Any | None) -> Exchange:
     codes: list[str] = []
     codes.extend(_iter_candidates(raw))
     if default is not None:
@@ -114,17 +129,32 @@ def normalize_exchange(raw: Any, *, default: Any | None = None) -> Exchange:
     return all_exchanges[0]
 
 
+_normalize_exchange_cached = lru_cache(maxsize=EXCHANGE_CACHE_SIZE, typed=True)(_normalize_exchange)
+
+
 def normalize_symbol(raw: Any) -> str:
     """
     Canonicalise contract symbols by stripping whitespace and upper-casing.
+
+    Results are interned so alias tables and event payloads share one object per symbol.
     """
 
     if raw is None:
         return ""
+    try:
+        return _normalize_symbol_cached(raw)
+    except TypeError:  # unhashable input
+        return _normalize_symbol(raw)
+
+
+def _normalize_symbol(raw: Any) -> str:
     text = str(raw).strip()
     if not text:
         return ""
-    return text.replace(" ", "").upper()
+    return sys.intern(text.replace(" ", "").upper())
+
+
+_normalize_symbol_cached = lru_cache(maxsize=SYMBOL_CACHE_SIZE, typed=True)(_normalize_symbol)
 
 
 def normalize_product(raw: Any, *, default: Product | None = None) -> Product:
@@ -134,7 +164,13 @@ def normalize_product(raw: Any, *, default: Product | None = None) -> Product:
 
     if isinstance(raw, Product):
         return raw
+    try:
+        return _normalize_product_cached(raw, default)
+    except TypeError:  # unhashable input
+        return _normalize_product(raw, default)
 
+
+def _normalize_product(raw: Any, default: Product | None) -> Product:
     text = str(raw or "").strip().upper()
     if not text:
         return default or Product.FUTURES
@@ -149,10 +185,45 @@ def normalize_product(raw: Any, *, default: Product | None = None) -> Product:
     return default or Product.FUTURES
 
 
+_normalize_product_cached = lru_cache(maxsize=PRODUCT_CACHE_SIZE, typed=True)(_normalize_product)
+
+_CACHES = {
+    "exchange": _normalize_exchange_cached,
+    "symbol": _normalize_symbol_cached,
+    "product": _normalize_product_cached,
+}
+
+
+def get_normalization_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Return hit/miss counters and occupancy of the normalisation memo caches.
+    """
+
+    stats: Dict[str, Dict[str, int]] = {}
+    for name, cached in _CACHES.items():
+        info = cached.cache_info()
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize or 0,
+        }
+    return stats
+
+
+def clear_normalization_caches() -> None:
+    """
+    Drop memoised results, e.g. after alias tables are patched at runtime.
+    """
+
+    for cached in _CACHES.values():
+        cached.cache_clear()
+
+
 def vt_symbol_from_parts(symbol: str, exchange: Exchange) -> str:
     """
     Helper that mirrors vn.py's vt_symbol composition for tests and helpers.
     """
 
     exchange_code = getattr(exchange, "value", str(exchange))
-    return f"{symbol}.{exchange_code}"
+    return sys.intern(f"{symbol}.{exchange_code}")
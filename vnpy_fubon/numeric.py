@@ -0,0 +1,106 @@
+"""
+Numeric conversion helpers shared by market, order, account and adapter code.
+
+Market data hot paths can run in ``float`` mode (vn.py's native field type) to
+skip ``Decimal`` construction; ``decimal`` mode keeps exact values and stays the
+default. Storage paths should request ``decimal`` explicitly.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Optional, Union
+
+LOGGER = logging.getLogger("vnpy_fubon.numeric")
+
+NUMERIC_ENV_KEY = "FUBON_NUMERIC_MODE"
+NUMERIC_MODE_DECIMAL = "decimal"
+NUMERIC_MODE_FLOAT = "float"
+
+Number = Union[Decimal, float]
+NumberConverter = Callable[[Any], Number]
+
+
+def to_decimal(value: Any, fallback: str = "0") -> Decimal:
+    """
+    Convert vendor numbers (including ``"1,234"`` strings) to ``Decimal``.
+    """
+
+    if isinstance(value, Decimal):
+        return value
+    if value in (None, "", "null"):
+        return Decimal(fallback)
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    text = str(value).strip().replace(",", "")
+    if not text:
+        return Decimal(fallback)
+    try:
+        return Decimal(text)
+    except (InvalidOperation, ValueError):
+        return Decimal(fallback)
+
+
+def to_float(value: Any, fallback: float = 0.0) -> float:
+    """
+    Convert vendor numbers to ``float`` without building intermediate ``Decimal`` objects.
+    """
+
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
+    if value in (None, "", "null"):
+        return fallback
+    if isinstance(value, str):
+        text = value.strip().replace(",", "")
+        if not text:
+            return fallback
+        try:
+            return float(text)
+        except ValueError:
+            return fallback
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return fallback
+
+
+def resolve_numeric_mode(mode: Optional[str] = None) -> str:
+    """
+    Resolve ``mode`` (or ``FUBON_NUMERIC_MODE``) to ``decimal`` or ``float``.
+    """
+
+    text = (mode if mode is not None else os.getenv(NUMERIC_ENV_KEY, "")).strip().lower()
+    if text in ("", NUMERIC_MODE_DECIMAL):
+        return NUMERIC_MODE_DECIMAL
+    if text == NUMERIC_MODE_FLOAT:
+        return NUMERIC_MODE_FLOAT
+    LOGGER.warning("Unknown numeric mode '%s'; using '%s'.", text, NUMERIC_MODE_DECIMAL)
+    return NUMERIC_MODE_DECIMAL
+
+
+def get_number_converter(mode: Optional[str] = None) -> NumberConverter:
+    """
+    Return ``to_float`` or ``to_decimal`` for the resolved numeric mode.
+    """
+
+    if resolve_numeric_mode(mode) == NUMERIC_MODE_FLOAT:
+        return to_float
+    return to_decimal
+
+
+__all__ = [
+    "NUMERIC_ENV_KEY",
+    "NUMERIC_MODE_DECIMAL",
+    "NUMERIC_MODE_FLOAT",
+    "Number",
+    "NumberConverter",
+    "get_number_converter",
+    "resolve_numeric_mode",
+    "to_decimal",
+    "to_float",
+]
@@ -0,0 +1,145 @@
+"""
+Option-chain index over the gateway's contracts.
+
+Strategies look options up by ``(underlying, expiry, strike, type)`` and ask
+for the strikes around the at-the-money price. :class:`OptionChainIndex` keeps
+a dictionary for the exact lookup and one sorted ``array('d')`` of strikes per
+``(underlying, expiry)`` for the neighbour queries, so neither has to scan
+``query_contracts()``. Items are whatever was indexed: the gateway stores
+:class:`ContractData`, the subscribe tool stores plain symbols.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from .vnpy_compat import ContractData, OptionType, Product
+
+T = TypeVar("T")
+
+ChainKey = Tuple[str, date, float, OptionType]
+
+
+def _expiry_date(value: date | datetime) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class OptionChainIndex(Generic[T]):
+    """Options keyed by ``(underlying, expiry, strike, type)`` with sorted strikes per expiry."""
+
+    def __init__(self) -> None:
+        self._items: Dict[ChainKey, T] = {}
+        self._strike_sets: Dict[Tuple[str, date], Set[float]] = {}
+        self._strike_arrays: Dict[Tuple[str, date], array] = {}
+
+    @classmethod
+    def from_contracts(cls, contracts: Iterable[ContractData]) -> "OptionChainIndex[ContractData]":
+        index: OptionChainIndex[ContractData] = cls()
+        for contract in contracts:
+            index.add_contract(contract)
+        return index
+
+    def add(
+        self,
+        underlying: str,
+        expiry: date | datetime,
+        strike: float,
+        option_type: OptionType,
+        item: T,
+    ) -> None:
+        chain = (underlying.upper(), _expiry_date(expiry))
+        strike = float(strike)
+        self._items[(chain[0], chain[1], strike, option_type)] = item
+        strikes = self._strike_sets.setdefault(chain, set())
+        if strike not in strikes:
+            strikes.add(strike)
+            self._strike_arrays.pop(chain, None)
+
+    def add_contract(self, contract: ContractData) -> bool:
+        """
+        Index an option contract under its product code and its underlying.
+
+        Returns ``False`` for non-options and options missing strike, expiry or type.
+        """
+
+        if contract.product is not Product.OPTION:
+            return False
+        strike = contract.option_strike
+        expiry = contract.option_expiry
+        option_type = contract.option_type
+        if strike is None or expiry is None or option_type is None:
+            return False
+        names = {name for name in (contract.option_portfolio, contract.option_underlying) if name}
+        for name in names:
+            self.add(name, expiry, strike, option_type, contract)  # type: ignore[arg-type]
+        return bool(names)
+
+    def get(
+        self, underlying: str, expiry: date | datetime, strike: float, option_type: OptionType
+    ) -> Optional[T]:
+        return self._items.get(
+            (underlying.upper(), _expiry_date(expiry), float(strike), option_type)
+        )
+
+    def underlyings(self) -> List[str]:
+        return sorted({underlying for underlying, _expiry in self._strike_sets})
+
+    def expiries(self, underlying: str, *, after: Optional[date] = None) -> List[date]:
+        """Listed expiries of ``underlying`` in order, optionally only those on or after ``after``."""
+
+        name = underlying.upper()
+        return sorted(
+            expiry
+            for chain_name, expiry in self._strike_sets
+            if chain_name == name and (after is None or expiry >= after)
+        )
+
+    def strikes(self, underlying: str, expiry: date | datetime) -> array:
+        """Sorted strikes listed for ``underlying``/``expiry`` (empty when unknown)."""
+
+        chain = (underlying.upper(), _expiry_date(expiry))
+        strikes = self._strike_arrays.get(chain)
+        if strikes is None:
+            strikes = array("d", sorted(self._strike_sets.get(chain, ())))
+            self._strike_arrays[chain] = strikes
+        return strikes
+
+    def atm_strike(self, underlying: str, expiry: date | datetime, price: float) -> Optional[float]:
+        strikes = self.strikes(underlying, expiry)
+        if not strikes:
+            return None
+        return strikes[self._atm_position(strikes, price)]
+
+    def neighbours(
+        self, underlying: str, expiry: date | datetime, price: float, width: int
+    ) -> List[float]:
+        """The at-the-money strike plus up to ``width`` listed strikes either side, ascending."""
+
+        strikes = self.strikes(underlying, expiry)
+        if not strikes:
+            return []
+        position = self._atm_position(strikes, price)
+        return list(strikes[max(0, position - width) : position + width + 1])
+
+    @staticmethod
+    def _atm_position(strikes: array, price: float) -> int:
+        position = bisect_left(strikes, price)
+        if position == len(strikes):
+            return position - 1
+        if position and price - strikes[position - 1] <= strikes[position] - price:
+            return position - 1
+        return position
+
+    def __len__(self) -> int:
+        """Number of distinct items; a contract indexed under two names counts once."""
+
+        return len({id(item) for item in self._items.values()})
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._items
+
+
+__all__ = ["ChainKey", "OptionChainIndex"]
@@ -17,6 +17,8 @@ from .mappings import (
     ORDER_TYPE_MAP,
     ORDER_TYPE_REVERSE_MAP,
 )
+from .numeric import to_decimal as _ensure_decimal
+from .rate_limit import ENDPOINT_ACCOUNT, ENDPOINT_ORDER, RateLimiter
 from .vnpy_compat import (
     Direction,
     EstimateMarginData,
@@ -52,21 +54,6 @@ QUERY_TRADE_METHODS = ("query_deals", "get_deals", "QueryMatch")
 LOGGER = logging.getLogger("vnpy_fubon.order")
 
 
-def _ensure_decimal(value: Any) -> Decimal:
-    if isinstance(value, Decimal):
-        return value
-    if value is None:
-        return Decimal("0")
-    if isinstance(value, (int, float)):
-        return Decimal(str(value))
-    if isinstance(value, str):
-        try:
-            return Decimal(value.replace(",", "").strip())
-        except InvalidOperation:
-            return Decimal("0")
-    return Decimal("0")
-
-
 def _parse_timestamp(value: Any) -> datetime:
     if isinstance(value, datetime):
         return value
@@ -108,15 +95,27 @@ class OrderAPI:
         account_lookup: Optional[Mapping[str, Any]] = None,
         gateway_name: str = "Fubon",
         logger: Optional[logging.Logger] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
         self.client = client
         self.account_id = account_id
         self.gateway_name = gateway_name
         self.logger = logger or LOGGER
+        self.rate_limiter = rate_limiter
         self.account_lookup: Dict[str, Any] = {
             str(key): value for key, value in (account_lookup or {}).items()
         }
 
+    def _throttle(self, endpoint: str = ENDPOINT_ORDER) -> None:
+        """
+        Take a token for ``endpoint`` before calling the SDK.
+
+        Order calls raise :class:`FubonRateLimitError` rather than wait too long.
+        """
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(endpoint)
+
     def set_account_lookup(self, accounts: Mapping[str, Any]) -> None:
         """
         Register SDK account objects so downstream calls can provide them to the SDK.
@@ -133,6 +132,7 @@ class OrderAPI:
         if extra_payload:
             payload.update(extra_payload)
 
+        self._throttle()
         futopt = getattr(self.client, "futopt", None)
         futopt_place = getattr(futopt, "place_order", None) if futopt else None
         if callable(futopt_place):
@@ -171,6 +171,7 @@ class OrderAPI:
             raise ValueError("Unable to build SDK order object for margin estimation.")
 
         account_id = self._resolve_account_identifier(account) or payload.get("account_id") or self.account_id or "UNKNOWN"
+        self._throttle(ENDPOINT_ACCOUNT)
         try:
             response = method(account, order_args["order"])
         except TypeError:
@@ -180,6 +181,7 @@ class OrderAPI:
         return self._to_estimate_margin(account_id, payload.get("symbol"), estimate_payload)
 
     def cancel_order(self, order_id: str, **kwargs: Any) -> bool:
+        self._throttle()
         futopt = getattr(self.client, "futopt", None)
         futopt_cancel = getattr(futopt, "cancel_order", None) if futopt else None
         if callable(futopt_cancel):
@@ -251,6 +253,7 @@ class OrderAPI:
             raise ValueError("FutOptModifyLot payload missing; cannot modify lot.")
 
         unblock = kwargs.get("unblock")
+        self._throttle()
         try:
             if unblock is not None:
                 response = modify_method(account_obj, modify_obj, unblock=unblock)
@@ -269,6 +272,7 @@ class OrderAPI:
 
     def query_open_orders(self, **kwargs: Any) -> List[OrderData]:
         method = self._resolve_method(QUERY_ORDER_METHODS)
+        self._throttle(ENDPOINT_ACCOUNT)
         response = method(**kwargs)
         orders: List[OrderData] = []
         if isinstance(response, Mapping):
@@ -280,6 +284,7 @@ class OrderAPI:
         return orders
 
     def query_trades(self, **kwargs: Any) -> List[TradeData]:
+        self._throttle(ENDPOINT_ACCOUNT)
         futopt = getattr(self.client, "futopt", None)
         filled_history = getattr(futopt, "filled_history", None) if futopt else None
         if callable(filled_history):
@@ -329,6 +334,7 @@ class OrderAPI:
         if market_enum is not None and FutOptMarketType is not None:
             market = market_enum
 
+        self._throttle(ENDPOINT_ACCOUNT)
         try:
             if end_date is not None:
                 response = method(account, market, start_date, end_date)
@@ -777,6 +783,7 @@ class OrderAPI:
             return None
 
         market_type = params.get("market_type") or params.get("marketType")
+        self._throttle(ENDPOINT_ACCOUNT)
         try:
             if market_type is not None:
                 response = getter(account_obj, market_type=market_type)
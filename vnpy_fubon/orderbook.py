@@ -0,0 +1,431 @@
+"""
+Incremental L2 order book state rebuilt from snapshot and delta messages.
+
+Each symbol keeps price-sorted parallel lists per side. Snapshots replace the
+book; deltas update individual price levels (size ``0`` removes a level) and
+must arrive with consecutive ``book_seq`` values. A gap invalidates the book
+until the next snapshot, and the owner is asked to request one.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .numeric import Number, NumberConverter, to_float
+
+LOGGER = logging.getLogger("vnpy_fubon.orderbook")
+
+DEFAULT_BOOK_DEPTH = 5
+DEFAULT_MAX_BOOK_DEPTH = 50
+DEFAULT_RESNAPSHOT_TIMEOUT = 10.0
+
+BOOK_SNAPSHOT = "snapshot"
+BOOK_APPLIED = "applied"
+BOOK_GAP = "gap"
+BOOK_STALE = "stale"
+BOOK_AWAITING_SNAPSHOT = "awaiting_snapshot"
+
+_SEQ_KEYS = ("seq", "bookSeq")
+_SNAPSHOT_KEYS = ("isSnapshot", "snapshot")
+
+Level = Tuple[Number, Number]
+GapCallback = Callable[[str, Optional[int], Optional[int]], None]
+
+
+def book_seq_from_payload(payload: Mapping[str, Any]) -> Optional[int]:
+    """Return the book sequence number carried by ``payload``, if any."""
+
+    for key in _SEQ_KEYS:
+        value = payload.get(key)
+        if value in (None, ""):
+            continue
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def is_snapshot_payload(payload: Mapping[str, Any]) -> bool:
+    """
+    Classify a book payload as snapshot or delta.
+
+    Explicit ``isSnapshot``/``snapshot`` flags win; without a flag, payloads
+    lacking a sequence number are treated as full snapshots.
+    """
+
+    flag = None
+    for key in _SNAPSHOT_KEYS:
+        value = payload.get(key)
+        if value not in (None, ""):
+            flag = value
+            break
+    if isinstance(flag, bool):
+        return flag
+    text = str(flag or "").strip().lower()
+    if text in {"y", "yes", "true", "snapshot"}:
+        return True
+    if text in {"n", "no", "false", "delta"}:
+        return False
+    return book_seq_from_payload(payload) is None
+
+
+@dataclass
+class BookUpdate:
+    """Outcome of applying one book message."""
+
+    symbol: str
+    status: str
+    seq: Optional[int]
+    bids: List[Level] = field(default_factory=list)
+    asks: List[Level] = field(default_factory=list)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in (BOOK_SNAPSHOT, BOOK_APPLIED)
+
+
+class OrderBook:
+    """
+    Price-sorted two-sided book for one symbol.
+
+    Bids are stored under negated prices so both sides share ascending
+    ``bisect`` lookups with the best level at index 0.
+    """
+
+    __slots__ = (
+        "symbol",
+        "seq",
+        "valid",
+        "max_depth",
+        "_bid_keys",
+        "_bid_sizes",
+        "_ask_keys",
+        "_ask_sizes",
+    )
+
+    def __init__(self, symbol: str, *, max_depth: int = DEFAULT_MAX_BOOK_DEPTH) -> None:
+        self.symbol = symbol
+        self.seq: Optional[int] = None
+        self.valid = False
+        self.max_depth = max(1, int(max_depth))
+        self._bid_keys: List[Number] = []
+        self._bid_sizes: List[Number] = []
+        self._ask_keys: List[Number] = []
+        self._ask_sizes: List[Number] = []
+
+    def reset(self) -> None:
+        self.seq = None
+        self.valid = False
+        self._bid_keys.clear()
+        self._bid_sizes.clear()
+        self._ask_keys.clear()
+        self._ask_sizes.clear()
+
+    def load(self, bids: Sequence[Level], asks: Sequence[Level], seq: Optional[int]) -> None:
+        """Replace both sides with snapshot levels."""
+
+        self.reset()
+        for price, size in bids:
+            self.update_bid(price, size)
+        for price, size in asks:
+            self.update_ask(price, size)
+        self.seq = seq
+        self.valid = True
+
+    def update_bid(self, price: Number, size: Number) -> None:
+        self._update(self._bid_keys, self._bid_sizes, -price, size)
+
+    def update_ask(self, price: Number, size: Number) -> None:
+        self._update(self._ask_keys, self._ask_sizes, price, size)
+
+    def _update(self, keys: List[Number], sizes: List[Number], key: Number, size: Number) -> None:
+        index = bisect_left(keys, key)
+        present = index < len(keys) and keys[index] == key
+        if not size or size < 0:
+            if present:
+                del keys[index]
+                del sizes[index]
+            return
+        if present:
+            sizes[index] = size
+            return
+        if index >= self.max_depth:
+            return
+        keys.insert(index, key)
+        sizes.insert(index, size)
+        if len(keys) > self.max_depth:
+            del keys[self.max_depth :]
+            del sizes[self.max_depth :]
+
+    def top(self, depth: int = DEFAULT_BOOK_DEPTH) -> Tuple[List[Level], List[Level]]:
+        bids = [
+            (-key, size)
+            for key, size in zip(self._bid_keys[:depth], self._bid_sizes[:depth], strict=True)
+        ]
+        asks = list(zip(self._ask_keys[:depth], self._ask_sizes[:depth], strict=True))
+        return bids, asks
+
+
+def _entry_fields(entry: Any) -> Tuple[Any, Any]:
+    """Return raw ``(price, size)`` from a ``{"price", "size"}`` mapping or ``[price, size]`` pair."""
+
+    if isinstance(entry, Mapping):
+        price = entry.get("price")
+        if price in (None, ""):
+            price = entry.get("px")
+        size = entry.get("qty")
+        if size in (None, ""):
+            size = entry.get("size")
+            if size in (None, ""):
+                size = entry.get("volume")
+        return price, size
+    if isinstance(entry, Sequence) and not isinstance(entry, str) and len(entry) >= 2:
+        return entry[0], entry[1]
+    return None, None
+
+
+def _parse_levels(entries: Any, num: NumberConverter) -> List[Level]:
+    levels: List[Level] = []
+    if not isinstance(entries, Sequence) or isinstance(entries, (str, bytes)):
+        return levels
+    for entry in entries:
+        price, size = _entry_fields(entry)
+        if price in (None, ""):
+            continue
+        levels.append((num(price), num(size)))
+    return levels
+
+
+def extract_levels(
+    entries: Any, depth: int, num: NumberConverter, zero: Any = None
+) -> Tuple[List[Any], List[Any]]:
+    """
+    Convert the first ``depth`` entries of a bids/asks array in one pass.
+
+    Returns ``(prices, sizes)`` padded with ``zero`` (default ``num(0)``) to
+    exactly ``depth`` items, ready for :func:`apply_depth_to_tick`.
+    """
+
+    if zero is None:
+        zero = num(0)
+    prices = [zero] * depth
+    sizes = [zero] * depth
+    if not isinstance(entries, Sequence) or isinstance(entries, (str, bytes)):
+        return prices, sizes
+    for index, entry in enumerate(entries[:depth]):
+        price, size = _entry_fields(entry)
+        if price is None and size is None:
+            continue
+        prices[index] = num(price)
+        sizes[index] = num(size)
+    return prices, sizes
+
+
+class OrderBookEngine:
+    """
+    Maintain per-symbol books from a snapshot/delta stream.
+
+    ``on_gap(symbol, expected_seq, received_seq)`` is called once per broken
+    book (sequence gap, or deltas before the first snapshot); deltas are then
+    dropped until a snapshot restores the book. A request that brings no
+    snapshot within ``resnapshot_timeout`` seconds is made again.
+    """
+
+    def __init__(
+        self,
+        *,
+        depth: int = DEFAULT_BOOK_DEPTH,
+        max_depth: int = DEFAULT_MAX_BOOK_DEPTH,
+        numeric: NumberConverter = to_float,
+        on_gap: Optional[GapCallback] = None,
+        resnapshot_timeout: float = DEFAULT_RESNAPSHOT_TIMEOUT,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.depth = max(1, int(depth))
+        self.resnapshot_timeout = max(0.0, float(resnapshot_timeout))
+        self.max_depth = max(self.depth, int(max_depth))
+        self._num = numeric
+        self.zero = numeric(0)
+        self._on_gap = on_gap
+        self.logger = logger or LOGGER
+        self._lock = threading.Lock()
+        self._books: Dict[str, OrderBook] = {}
+        # symbol -> monotonic time of the outstanding resnapshot request
+        self._resnapshot_pending: Dict[str, float] = {}
+        self._stats: Dict[str, int] = {
+            "snapshots": 0,
+            "deltas": 0,
+            "gaps": 0,
+            "stale": 0,
+            "awaiting_snapshot": 0,
+            "resnapshot_requests": 0,
+        }
+
+    def apply(self, symbol: str, payload: Mapping[str, Any]) -> BookUpdate:
+        """
+        Apply a book message for ``symbol`` and return the resulting top levels.
+        """
+
+        num = self._num
+        seq = book_seq_from_payload(payload)
+        bids = _parse_levels(payload.get("bids") or payload.get("bidQuotes"), num)
+        asks = _parse_levels(payload.get("asks") or payload.get("askQuotes"), num)
+        gap: Optional[Tuple[Optional[int], Optional[int]]] = None
+        top_bids: List[Level] = []
+        top_asks: List[Level] = []
+
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None:
+                book = self._books[symbol] = OrderBook(symbol, max_depth=self.max_depth)
+
+            if is_snapshot_payload(payload):
+                book.load(bids, asks, seq)
+                self._resnapshot_pending.pop(symbol, None)
+                self._stats["snapshots"] += 1
+                status = BOOK_SNAPSHOT
+            elif not book.valid:
+                self._stats["awaiting_snapshot"] += 1
+                status = BOOK_AWAITING_SNAPSHOT
+                requested = self._resnapshot_pending.get(symbol)
+                if requested is None or time.monotonic() - requested >= self.resnapshot_timeout:
+                    gap = (None, seq)
+            elif seq is not None and book.seq is not None and seq <= book.seq:
+                self._stats["stale"] += 1
+                status = BOOK_STALE
+            elif seq is not None and book.seq is not None and seq != book.seq + 1:
+                gap = (book.seq + 1, seq)
+                book.reset()
+                self._stats["gaps"] += 1
+                status = BOOK_GAP
+            else:
+                for price, size in bids:
+                    book.update_bid(price, size)
+                for price, size in asks:
+                    book.update_ask(price, size)
+                if seq is not None:
+                    book.seq = seq
+                self._stats["deltas"] += 1
+                status = BOOK_APPLIED
+
+            if gap is not None:
+                self._resnapshot_pending[symbol] = time.monotonic()
+                self._stats["resnapshot_requests"] += 1
+            elif status in (BOOK_SNAPSHOT, BOOK_APPLIED):
+                top_bids, top_asks = book.top(self.depth)
+
+        if gap is not None and self._on_gap is not None:
+            try:
+                self._on_gap(symbol, gap[0], gap[1])
+            except Exception:
+                self.logger.exception("Resnapshot request for %s failed.", symbol)
+        return BookUpdate(symbol, status, seq, top_bids, top_asks)
+
+    def book(self, symbol: str) -> Optional[OrderBook]:
+        with self._lock:
+            return self._books.get(symbol)
+
+    def cancel_resnapshot(self, symbol: str) -> None:
+        """
+        Forget an outstanding resnapshot request so the next delta asks again.
+        """
+
+        with self._lock:
+            self._resnapshot_pending.pop(symbol, None)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Drop book state (one symbol or all), e.g. after a reconnect.
+        """
+
+        with self._lock:
+            targets = [symbol] if symbol is not None else list(self._books)
+            for key in targets:
+                book = self._books.get(key)
+                if book is not None:
+                    book.reset()
+                self._resnapshot_pending.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["books"] = len(self._books)
+            stats["valid_books"] = sum(1 for book in self._books.values() if book.valid)
+        return stats
+
+
+_DEPTH_FIELDS = tuple(
+    (f"bid_price_{level}", f"bid_volume_{level}", f"ask_price_{level}", f"ask_volume_{level}")
+    for level in range(1, DEFAULT_BOOK_DEPTH + 1)
+)
+
+
+def apply_depth_to_tick(
+    tick: Any,
+    bid_prices: Sequence[Any],
+    bid_sizes: Sequence[Any],
+    ask_prices: Sequence[Any],
+    ask_sizes: Sequence[Any],
+) -> None:
+    """
+    Copy per-level arrays onto vn.py ``bid_price_N``/``ask_volume_N`` fields (up to five levels).
+    """
+
+    # Deeper books are cut to the five levels TickData has fields for.
+    for names, bid_px, bid_sz, ask_px, ask_sz in zip(
+        _DEPTH_FIELDS, bid_prices, bid_sizes, ask_prices, ask_sizes, strict=False
+    ):
+        setattr(tick, names[0], bid_px)
+        setattr(tick, names[1], bid_sz)
+        setattr(tick, names[2], ask_px)
+        setattr(tick, names[3], ask_sz)
+
+
+def apply_levels_to_tick(
+    tick: Any,
+    bids: Sequence[Level],
+    asks: Sequence[Level],
+    *,
+    depth: int = DEFAULT_BOOK_DEPTH,
+    zero: Any = 0,
+) -> None:
+    """
+    Copy up to ``depth`` ``(price, size)`` levels onto the tick's depth fields.
+
+    Missing levels are set to ``zero`` so stale values never survive an update.
+    """
+
+    empty = (zero, zero)
+    for index, names in enumerate(_DEPTH_FIELDS[:depth]):
+        bid_px, bid_sz = bids[index] if index < len(bids) else empty
+        ask_px, ask_sz = asks[index] if index < len(asks) else empty
+        setattr(tick, names[0], bid_px)
+        setattr(tick, names[1], bid_sz)
+        setattr(tick, names[2], ask_px)
+        setattr(tick, names[3], ask_sz)
+
+
+__all__ = [
+    "BOOK_APPLIED",
+    "BOOK_AWAITING_SNAPSHOT",
+    "BOOK_GAP",
+    "BOOK_SNAPSHOT",
+    "BOOK_STALE",
+    "BookUpdate",
+    "DEFAULT_BOOK_DEPTH",
+    "DEFAULT_MAX_BOOK_DEPTH",
+    "DEFAULT_RESNAPSHOT_TIMEOUT",
+    "OrderBook",
+    "OrderBookEngine",
+    "apply_depth_to_tick",
+    "apply_levels_to_tick",
+    "extract_levels",
+    "book_seq_from_payload",
+    "is_snapshot_payload",
+]
@@ -0,0 +1,79 @@
+"""
+Longest-prefix lookup from contract symbols to product codes.
+
+FutOpt tickers are a product code followed by strike/month/year characters
+(``TXO18000F4`` belongs to ``TXO``), and some product codes are prefixes of
+others. :class:`ProductIndex` is a character trie built once per contract
+load, so matching a ticker costs its own length instead of a scan over every
+product.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("children", "key")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.key: Optional[str] = None
+
+
+class ProductIndex:
+    """Trie of upper-case product codes answering longest-prefix queries."""
+
+    def __init__(self, products: Iterable[str] = ()) -> None:
+        self._root = _Node()
+        self._size = 0
+        for product in products:
+            self.add(product)
+
+    def add(self, product: str) -> None:
+        key = str(product or "").strip().upper()
+        if not key:
+            return
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        if node.key is None:
+            self._size += 1
+        node.key = key
+
+    def longest_prefix(self, symbol: str) -> Optional[str]:
+        """Return the longest product code ``symbol`` starts with, or ``None``."""
+
+        node = self._root
+        best: Optional[str] = None
+        for char in symbol.upper():
+            child = node.children.get(char)
+            if child is None:
+                break
+            node = child
+            if node.key is not None:
+                best = node.key
+        return best
+
+    def split(self, symbol: str) -> Tuple[Optional[str], str]:
+        """Return ``(product, suffix)``; the suffix is the whole symbol when nothing matches."""
+
+        product = self.longest_prefix(symbol)
+        return product, symbol[len(product) :] if product else symbol
+
+    def __contains__(self, product: object) -> bool:
+        return isinstance(product, str) and self.longest_prefix(product) == product.upper()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.key is not None:
+                yield node.key
+            stack.extend(node.children.values())
+
+
+__all__ = ["ProductIndex"]
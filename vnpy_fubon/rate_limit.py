@@ -0,0 +1,204 @@
+"""
+Client-side token-bucket limits for the gateway's SDK calls.
+
+The vendor publishes per-account budgets: 300 market-data REST requests per
+minute, 5 account queries and 50 orders per second. Callers take a token from
+the bucket of their endpoint class before calling the SDK, whichever thread
+they run on, so the gateway paces itself instead of waiting for ``429``
+responses. A ``429`` that still gets through pauses the whole bucket rather
+than only the thread that saw it, so concurrent callers back off together.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Mapping, Optional
+
+from .exceptions import FubonRateLimitError
+
+ENDPOINT_MARKET_DATA = "market_data"
+ENDPOINT_ACCOUNT = "account"
+ENDPOINT_ORDER = "order"
+
+DEFAULT_REST_RATE_PER_SEC = 5.0
+DEFAULT_ACCOUNT_RATE_PER_SEC = 5.0
+DEFAULT_ORDER_RATE_PER_SEC = 50.0
+DEFAULT_ORDER_MAX_WAIT_MS = 1000
+DEFAULT_REST_WORKERS = 4
+
+DEFAULT_BUDGETS: Mapping[str, float] = {
+    ENDPOINT_MARKET_DATA: DEFAULT_REST_RATE_PER_SEC,
+    ENDPOINT_ACCOUNT: DEFAULT_ACCOUNT_RATE_PER_SEC,
+    ENDPOINT_ORDER: DEFAULT_ORDER_RATE_PER_SEC,
+}
+# Seconds a caller may wait for a token before the call is rejected; ``None`` waits.
+# Orders are rejected rather than sent late.
+DEFAULT_MAX_WAIT: Mapping[str, Optional[float]] = {
+    ENDPOINT_MARKET_DATA: None,
+    ENDPOINT_ACCOUNT: None,
+    ENDPOINT_ORDER: DEFAULT_ORDER_MAX_WAIT_MS / 1000.0,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at ``rate`` tokens per second.
+
+    ``capacity`` (default: one second worth of tokens) bounds the burst. The
+    bucket starts full. ``clock`` and ``sleep`` are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_REST_RATE_PER_SEC,
+        capacity: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity if capacity is not None else rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._resume_at = 0.0
+        self._stats: Dict[str, float] = {"acquired": 0, "waits": 0, "waited_ms": 0.0, "pauses": 0}
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def _reserve(self, tokens: float) -> float:
+        """Take ``tokens`` if possible and return 0, else return the seconds to wait."""
+
+        now = self._clock()
+        if now < self._resume_at:
+            return self._resume_at - now
+        self._refill(now)
+        # Allow for float drift, or a sub-nanosecond wait would never advance the clock.
+        if self._tokens >= tokens - 1e-9:
+            self._tokens = max(0.0, self._tokens - tokens)
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            if self._reserve(tokens) > 0:
+                return False
+            self._stats["acquired"] += 1
+            return True
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """
+        Block until ``tokens`` are available and return the seconds spent waiting.
+
+        Raises :class:`TimeoutError` when ``timeout`` elapses first.
+        """
+
+        started = self._clock()
+        waited = False
+        while True:
+            with self._lock:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    elapsed = self._clock() - started
+                    self._stats["acquired"] += 1
+                    if waited:
+                        self._stats["waits"] += 1
+                        self._stats["waited_ms"] += elapsed * 1000.0
+                    return elapsed
+            if timeout is not None and self._clock() - started + wait > timeout:
+                raise TimeoutError(f"rate limiter wait of {wait:.3f}s exceeds timeout")
+            waited = True
+            self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` (after a ``429``), then resume with a single token."""
+
+        with self._lock:
+            now = self._clock()
+            self._resume_at = max(self._resume_at, now + max(0.0, seconds))
+            self._tokens = 1.0
+            self._updated = self._resume_at
+            self._stats["pauses"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["waited_ms"] = round(stats["waited_ms"], 3)
+            stats["rate"] = self.rate
+            stats["capacity"] = self.capacity
+        return stats
+
+
+class RateLimiter:
+    """
+    One :class:`TokenBucket` per endpoint class (market data, account, order).
+
+    :meth:`acquire` blocks until the class has a token, or raises
+    :class:`FubonRateLimitError` when the wait would exceed the class's
+    ``max_wait``. Waits and rejections are counted per class.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, float]] = None,
+        *,
+        max_wait: Optional[Mapping[str, Optional[float]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        rates = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self._buckets = {
+            name: TokenBucket(rate, clock=clock, sleep=sleep) for name, rate in rates.items()
+        }
+        self._max_wait: Dict[str, Optional[float]] = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self._lock = threading.Lock()
+        self._rejected: Dict[str, int] = dict.fromkeys(self._buckets, 0)
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        return self._buckets[endpoint]
+
+    def acquire(self, endpoint: str, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from ``endpoint``'s budget; returns the seconds waited."""
+
+        try:
+            return self._buckets[endpoint].acquire(tokens, timeout=self._max_wait.get(endpoint))
+        except TimeoutError as exc:
+            with self._lock:
+                self._rejected[endpoint] += 1
+            raise FubonRateLimitError(f"{endpoint} rate limit exceeded: {exc}") from exc
+
+    def pause(self, endpoint: str, seconds: float) -> None:
+        self._buckets[endpoint].pause(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            rejected = dict(self._rejected)
+        stats: Dict[str, Dict[str, float]] = {}
+        for name, bucket in self._buckets.items():
+            stats[name] = bucket.stats()
+            stats[name]["rejected"] = rejected[name]
+        return stats
+
+
+__all__ = [
+    "DEFAULT_ACCOUNT_RATE_PER_SEC",
+    "DEFAULT_BUDGETS",
+    "DEFAULT_MAX_WAIT",
+    "DEFAULT_ORDER_MAX_WAIT_MS",
+    "DEFAULT_ORDER_RATE_PER_SEC",
+    "DEFAULT_REST_RATE_PER_SEC",
+    "DEFAULT_REST_WORKERS",
+    "ENDPOINT_ACCOUNT",
+    "ENDPOINT_MARKET_DATA",
+    "ENDPOINT_ORDER",
+    "RateLimiter",
+    "TokenBucket",
+]
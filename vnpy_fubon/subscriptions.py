@@ -0,0 +1,214 @@
+"""
+Coalescing queue behind the gateway's non-blocking subscription API.
+
+Callers get a :class:`concurrent.futures.Future` per ``(channel, symbol,
+afterHours)`` key straight away. A worker thread waits ``window`` seconds
+after the first queued request so that requests arriving together (for
+example a strategy subscribing a strike ladder one symbol at a time) go out
+as one batch per channel and session, then resolves each future with the
+subscription id the vendor returned (``None`` when it returned none).
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .ws_pool import DEFAULT_MAX_SUBSCRIPTIONS, SubscriptionKey, batch_keys
+
+LOGGER = logging.getLogger("vnpy_fubon.subscriptions")
+
+ACTION_SUBSCRIBE = "subscribe"
+ACTION_UNSUBSCRIBE = "unsubscribe"
+DEFAULT_SUBSCRIBE_WINDOW_MS = 20
+
+# send(action, channel, symbols, after_hours) -> {symbol: subscription id, None or exception}
+SendBatch = Callable[[str, str, List[str], Optional[bool]], Mapping[str, Any]]
+
+_STOP = object()
+
+
+class SubscriptionQueue:
+    """
+    Queue (un)subscribe requests and send them in coalesced batches.
+
+    ``send`` runs on the worker thread once per ``(action, channel,
+    afterHours)`` batch of at most ``max_batch`` symbols. Symbols missing from
+    its result, or mapped to an exception, fail their futures; if it raises,
+    the whole batch fails with that error. Requests keep their order across
+    actions, so a subscribe followed by an unsubscribe of the same key is not
+    reordered.
+    """
+
+    def __init__(
+        self,
+        send: SendBatch,
+        *,
+        window: float = DEFAULT_SUBSCRIBE_WINDOW_MS / 1000.0,
+        max_batch: int = DEFAULT_MAX_SUBSCRIPTIONS,
+        name: str = "fubon-subscribe",
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._send = send
+        self.window = max(0.0, float(window))
+        self.max_batch = max(1, int(max_batch))
+        self._name = name
+        self.logger = logger or LOGGER
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {
+            "submitted": 0,
+            "batches": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker; requests that have not been sent are cancelled."""
+
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+            self._running = False
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    self._pending -= 1
+                    self._stats["cancelled"] += 1
+                    item[2].cancel()
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout=timeout)
+
+    def submit(self, action: str, keys: Sequence[SubscriptionKey]) -> List[Future]:
+        """Queue ``keys`` and return one future per key, in the same order."""
+
+        futures: List[Future] = []
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Subscription queue is not running.")
+            for key in keys:
+                future: Future = Future()
+                self._queue.put_nowait((action, key, future))
+                futures.append(future)
+            self._pending += len(futures)
+            self._stats["submitted"] += len(futures)
+        return futures
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = self._pending
+        return stats
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            stop_after = False
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_after = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop_after:
+                return
+
+    def _flush(self, batch: List[Tuple[str, SubscriptionKey, Future]]) -> None:
+        run: List[Tuple[str, SubscriptionKey, Future]] = []
+        for item in batch:
+            if run and item[0] != run[0][0]:
+                self._send_run(run)
+                run = []
+            run.append(item)
+        if run:
+            self._send_run(run)
+
+    def _send_run(self, run: List[Tuple[str, SubscriptionKey, Future]]) -> None:
+        action = run[0][0]
+        waiting: Dict[SubscriptionKey, List[Future]] = {}
+        for _action, key, future in run:
+            if future.set_running_or_notify_cancel():
+                waiting.setdefault(key, []).append(future)
+            else:
+                self._settle(cancelled=1)
+        for (channel, after_hours), keys in batch_keys(
+            waiting, lambda key: (key[0], key[2]), self.max_batch
+        ):
+            symbols = [key[1] for key in keys]
+            try:
+                results = dict(self._send(action, channel, symbols, after_hours))
+            except Exception as exc:
+                self.logger.warning(
+                    "Queued %s of %s symbols on %s failed: %s",
+                    action,
+                    len(symbols),
+                    channel,
+                    exc,
+                    extra={"channel": channel, "gateway_state": f"{action}_failed"},
+                )
+                results, error = {}, exc
+            else:
+                error = None
+            completed = failed = 0
+            for key in keys:
+                outcome = results.get(
+                    key[1], error or RuntimeError(f"{action} {channel} {key[1]} was not confirmed")
+                )
+                for future in waiting[key]:
+                    if isinstance(outcome, BaseException):
+                        future.set_exception(outcome)
+                        failed += 1
+                    else:
+                        future.set_result(outcome)
+                        completed += 1
+            self._settle(batches=1, completed=completed, failed=failed)
+
+    def _settle(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+                if name != "batches":
+                    self._pending -= value
+
+
+__all__ = [
+    "ACTION_SUBSCRIBE",
+    "ACTION_UNSUBSCRIBE",
+    "DEFAULT_SUBSCRIBE_WINDOW_MS",
+    "SubscriptionQueue",
+]
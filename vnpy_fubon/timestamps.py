@@ -0,0 +1,296 @@
+"""
+Shared timestamp parsing for market, gateway and adapter code.
+
+Vendor payloads carry epoch numbers in seconds, milliseconds, microseconds or
+nanoseconds, ISO-8601 strings, or a few fixed ``strptime`` layouts. A single
+source (channel/field) almost always keeps one format, so the parser remembers
+the format that last worked per source and tries it first instead of walking
+the candidate list through exceptions on every message.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+LOGGER = logging.getLogger("vnpy_fubon.timestamps")
+
+# Taiwan has not observed DST since 1979, so a fixed offset is exact and avoids
+# per-call zoneinfo transition lookups.
+TAIPEI_TZ = timezone(timedelta(hours=8), "Asia/Taipei")
+
+FORMAT_EPOCH = "epoch"
+FORMAT_ISO = "iso"
+DEFAULT_STRPTIME_FORMATS: Tuple[str, ...] = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y%m%d%H%M%S",
+)
+
+_FORMAT_CACHE_LIMIT = 1024
+_EPOCH_NS_THRESHOLD = 1_000_000_000_000_000_000
+_EPOCH_US_THRESHOLD = 1_000_000_000_000_000
+_EPOCH_MS_THRESHOLD = 1_000_000_000_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_to_datetime(value: float) -> datetime:
+    """
+    Convert an epoch in s/ms/us/ns (detected by magnitude) to a UTC datetime.
+
+    Integer inputs keep microsecond precision; raises ``OverflowError`` or
+    ``ValueError`` for values outside the ``datetime`` range.
+    """
+
+    if isinstance(value, int):
+        magnitude = abs(value)
+        if magnitude > _EPOCH_NS_THRESHOLD:
+            return _EPOCH + timedelta(microseconds=value // 1_000)
+        if magnitude > _EPOCH_US_THRESHOLD:
+            return _EPOCH + timedelta(microseconds=value)
+        if magnitude > _EPOCH_MS_THRESHOLD:
+            return _EPOCH + timedelta(milliseconds=value)
+        return _EPOCH + timedelta(seconds=value)
+    timestamp = float(value)
+    magnitude = abs(timestamp)
+    if magnitude > _EPOCH_NS_THRESHOLD:
+        timestamp /= 1_000_000_000.0
+    elif magnitude > _EPOCH_US_THRESHOLD:
+        timestamp /= 1_000_000.0
+    elif magnitude > _EPOCH_MS_THRESHOLD:
+        timestamp /= 1_000.0
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+def to_taipei(value: datetime) -> datetime:
+    """
+    Convert ``value`` to Asia/Taipei; naive datetimes are treated as UTC.
+    """
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(TAIPEI_TZ)
+
+
+def utc_and_taipei(value: datetime) -> Tuple[datetime, datetime]:
+    """
+    Return ``(utc, taipei)`` views of ``value``; naive datetimes are treated as UTC.
+    """
+
+    if value.tzinfo is None:
+        utc_dt = value.replace(tzinfo=timezone.utc)
+    elif value.tzinfo is timezone.utc:
+        utc_dt = value
+    else:
+        utc_dt = value.astimezone(timezone.utc)
+    return utc_dt, utc_dt.astimezone(TAIPEI_TZ)
+
+
+def _parse_iso(text: str) -> datetime:
+    if text.endswith("Z") or text.endswith("z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(text)
+
+
+def _parse_compact(text: str) -> Optional[datetime]:
+    if len(text) != 14 or not text.isdigit():
+        return None
+    return datetime(
+        int(text[0:4]),
+        int(text[4:6]),
+        int(text[6:8]),
+        int(text[8:10]),
+        int(text[10:12]),
+        int(text[12:14]),
+    )
+
+
+def _parse_slashed(text: str) -> Optional[datetime]:
+    if len(text) != 19 or text[4] != "/" or text[7] != "/" or text[10] != " ":
+        return None
+    return datetime.fromisoformat(text.replace("/", "-"))
+
+
+# Slicing parsers for the vendor's fixed layouts; ``strptime`` stays as the
+# fallback for unpadded variants and caller-supplied formats.
+_FAST_LAYOUTS = {
+    "%Y%m%d%H%M%S": _parse_compact,
+    "%Y/%m/%d %H:%M:%S": _parse_slashed,
+}
+
+
+class TimestampParser:
+    """
+    Parse vendor timestamps, caching the detected format per source.
+
+    ``source`` is any hashable tag such as ``("books", "time")``. Counters are
+    plain integers and may be approximate when one parser is shared by several
+    worker threads; parsing itself is thread-safe.
+    """
+
+    def __init__(
+        self,
+        *,
+        formats: Sequence[str] = DEFAULT_STRPTIME_FORMATS,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._candidates: Tuple[str, ...] = (FORMAT_ISO,) + tuple(formats)
+        self.logger = logger or LOGGER
+        self._formats: Dict[Hashable, str] = {}
+        self._fallbacks_by_source: Dict[Hashable, int] = {}
+        self.parsed = 0
+        self.cache_hits = 0
+        self.detections = 0
+        self.fallbacks = 0
+
+    def parse(
+        self,
+        value: Any,
+        *,
+        source: Hashable = None,
+        naive_tz: Optional[tzinfo] = timezone.utc,
+    ) -> Optional[datetime]:
+        """
+        Parse ``value`` or return ``None`` (counted as a fallback).
+
+        Epoch numbers always yield UTC datetimes. Naive string results get
+        ``naive_tz`` attached unless it is ``None``.
+        """
+
+        value_type = type(value)
+        if value_type is datetime:
+            return value
+        if value_type is int or value_type is float:
+            try:
+                dt = epoch_to_datetime(value)
+            except (OverflowError, OSError, ValueError):
+                return self._fallback(source, value)
+            self.parsed += 1
+            return dt
+        if isinstance(value, str):
+            text = value.strip()
+            if not text:
+                return self._fallback(source, value)
+            dt = self._parse_text(text, source)
+            if dt is None:
+                return self._fallback(source, value)
+            self.parsed += 1
+            if dt.tzinfo is None and naive_tz is not None:
+                dt = dt.replace(tzinfo=naive_tz)
+            return dt
+        if isinstance(value, datetime):
+            return value
+        return self._fallback(source, value)
+
+    def format_for(self, source: Hashable) -> Optional[str]:
+        """Return the format last detected for ``source``."""
+
+        return self._formats.get(source)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "parsed": self.parsed,
+            "cache_hits": self.cache_hits,
+            "detections": self.detections,
+            "fallbacks": self.fallbacks,
+            "sources": len(self._formats),
+            "fallbacks_by_source": dict(self._fallbacks_by_source),
+        }
+
+    def reset(self) -> None:
+        """Forget detected formats and zero every counter."""
+
+        self._formats = {}
+        self._fallbacks_by_source = {}
+        self.parsed = self.cache_hits = self.detections = self.fallbacks = 0
+
+    def _parse_text(self, text: str, source: Hashable) -> Optional[datetime]:
+        cached = self._formats.get(source)
+        if cached is not None:
+            dt = self._try_format(cached, text)
+            if dt is not None:
+                self.cache_hits += 1
+                return dt
+
+        self.detections += 1
+        for fmt in self._detect_order(text):
+            if fmt == cached:
+                continue
+            dt = self._try_format(fmt, text)
+            if dt is not None:
+                if source is not None and (
+                    source in self._formats or len(self._formats) < _FORMAT_CACHE_LIMIT
+                ):
+                    self._formats[source] = fmt
+                return dt
+        return None
+
+    def _detect_order(self, text: str) -> Sequence[str]:
+        if text.isdigit() and not (len(text) == 14 and text[:2] in ("19", "20")):
+            return (FORMAT_EPOCH,) + self._candidates
+        return self._candidates + (FORMAT_EPOCH,)
+
+    @staticmethod
+    def _try_format(fmt: str, text: str) -> Optional[datetime]:
+        try:
+            if fmt == FORMAT_ISO:
+                return _parse_iso(text)
+            if fmt == FORMAT_EPOCH:
+                return epoch_to_datetime(int(text) if text.lstrip("-").isdigit() else float(text))
+            fast = _FAST_LAYOUTS.get(fmt)
+            if fast is not None:
+                dt = fast(text)
+                if dt is not None:
+                    return dt
+            return datetime.strptime(text, fmt)
+        except (OverflowError, OSError, ValueError):
+            return None
+
+    def _fallback(self, source: Hashable, value: Any) -> None:
+        self.fallbacks += 1
+        self._fallbacks_by_source[source] = self._fallbacks_by_source.get(source, 0) + 1
+        if value not in (None, ""):
+            self.logger.debug("Unparseable timestamp %r from %s", value, source)
+        return None
+
+
+_DEFAULT_PARSER = TimestampParser()
+
+
+def get_timestamp_parser() -> TimestampParser:
+    """Return the process-wide parser shared by the gateway and adapters."""
+
+    return _DEFAULT_PARSER
+
+
+def parse_timestamp(
+    value: Any,
+    *,
+    source: Hashable = None,
+    naive_tz: Optional[tzinfo] = timezone.utc,
+) -> Optional[datetime]:
+    """Parse ``value`` with the shared parser; see :meth:`TimestampParser.parse`."""
+
+    return _DEFAULT_PARSER.parse(value, source=source, naive_tz=naive_tz)
+
+
+def get_timestamp_stats() -> Dict[str, Any]:
+    """Return counters of the shared parser, including fallbacks per source."""
+
+    return _DEFAULT_PARSER.stats()
+
+
+__all__ = [
+    "DEFAULT_STRPTIME_FORMATS",
+    "FORMAT_EPOCH",
+    "FORMAT_ISO",
+    "TAIPEI_TZ",
+    "TimestampParser",
+    "epoch_to_datetime",
+    "get_timestamp_parser",
+    "get_timestamp_stats",
+    "parse_timestamp",
+    "to_taipei",
+    "utc_and_taipei",
+]
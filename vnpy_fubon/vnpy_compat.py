@@ -39,6 +39,10 @@ try:  # pragma: no cover - exercised only when vn.py is installed
         from vnpy.trader.event import EVENT_FUBON_MARKET_RAW  # type: ignore
     except ImportError:  # pragma: no cover - vn.py without custom event
         EVENT_FUBON_MARKET_RAW = "eFubonMarketRaw"
+    try:  # pragma: no cover - only executed when vn.py exposes custom event
+        from vnpy.trader.event import EVENT_FUBON_BAR  # type: ignore
+    except ImportError:  # pragma: no cover - vn.py without custom event
+        EVENT_FUBON_BAR = "eFubonBar."
     from vnpy.trader.gateway import BaseGateway
     from vnpy.trader.object import (
         AccountData,
@@ -273,6 +277,22 @@ except ImportError:  # pragma: no cover - default for most development environme
         ask_price_1: Optional[Decimal] = None
         ask_volume_1: Optional[Decimal] = None
         gateway_name: str = "Fubon"
+        bid_price_2: Optional[Decimal] = None
+        bid_price_3: Optional[Decimal] = None
+        bid_price_4: Optional[Decimal] = None
+        bid_price_5: Optional[Decimal] = None
+        ask_price_2: Optional[Decimal] = None
+        ask_price_3: Optional[Decimal] = None
+        ask_price_4: Optional[Decimal] = None
+        ask_price_5: Optional[Decimal] = None
+        bid_volume_2: Optional[Decimal] = None
+        bid_volume_3: Optional[Decimal] = None
+        bid_volume_4: Optional[Decimal] = None
+        bid_volume_5: Optional[Decimal] = None
+        ask_volume_2: Optional[Decimal] = None
+        ask_volume_3: Optional[Decimal] = None
+        ask_volume_4: Optional[Decimal] = None
+        ask_volume_5: Optional[Decimal] = None
 
     @dataclass
     class ContractData:
@@ -358,6 +378,7 @@ except ImportError:  # pragma: no cover - default for most development environme
     EVENT_POSITION = "ePosition."
     EVENT_TRADE = "eTrade."
     EVENT_FUBON_MARKET_RAW = "eFubonMarketRaw"
+    EVENT_FUBON_BAR = "eFubonBar."
     EVENT_LOG = "eLog"
 
 
@@ -407,6 +428,7 @@ __all__ = [
     "EVENT_ACCOUNT",
     "EVENT_CONTRACT",
     "EVENT_LOG",
+    "EVENT_FUBON_BAR",
     "EVENT_FUBON_MARKET_RAW",
     "EVENT_ORDER",
     "EVENT_POSITION",
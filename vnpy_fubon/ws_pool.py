@@ -0,0 +1,256 @@
+"""
+Placement of websocket subscriptions across a pool of FutOpt connections.
+
+The vendor caps each market data connection at 200 subscriptions and an
+account at 5 connections. :class:`SubscriptionPool` only decides which
+connection index carries each ``(channel, symbol, afterHours)`` key; the
+gateway owns the SDK clients and sends the actual subscribe calls. Keys are
+packed onto the lowest connection with headroom so small watch lists keep
+using a single socket, and keys sharing a channel/session are kept together
+so they can go out as one batch message.
+
+:func:`plan_subscriptions` and :func:`batch_keys` are the shared helpers for
+switching between subscription sets (e.g. day and night sessions) with as
+few vendor requests as possible.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from math import ceil
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+SubscriptionKey = Tuple[str, str, Optional[bool]]
+K = TypeVar("K", bound=Hashable)
+
+DEFAULT_MAX_SUBSCRIPTIONS = 200
+DEFAULT_MAX_CONNECTIONS = 1
+VENDOR_MAX_CONNECTIONS = 5
+
+
+def _batch_order(key: SubscriptionKey) -> Tuple[str, int, str]:
+    channel, symbol, after_hours = key
+    return channel, -1 if after_hours is None else int(after_hours), symbol
+
+
+class SubscriptionPool:
+    """
+    Assign subscription keys to connection indexes under a per-connection cap.
+
+    When every connection is full, new keys go to the least loaded one and are
+    counted in ``over_cap``; the vendor will reject them, which matches the
+    behaviour of a single overfull connection.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_subscriptions: int = DEFAULT_MAX_SUBSCRIPTIONS,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ) -> None:
+        self.max_subscriptions = max(1, int(max_subscriptions))
+        self.max_connections = max(1, min(int(max_connections), VENDOR_MAX_CONNECTIONS))
+        self._lock = threading.Lock()
+        self._placement: Dict[SubscriptionKey, int] = {}
+        self._load: List[int] = [0] * self.max_connections
+        self._stats: Dict[str, int] = {"assigned": 0, "released": 0, "over_cap": 0, "rebalances": 0}
+
+    @property
+    def capacity(self) -> int:
+        return self.max_subscriptions * self.max_connections
+
+    def connection_for(self, key: SubscriptionKey) -> Optional[int]:
+        with self._lock:
+            return self._placement.get(key)
+
+    def assign(self, keys: Iterable[SubscriptionKey]) -> Dict[int, List[SubscriptionKey]]:
+        """
+        Reserve a connection for each new key; returns ``{index: keys}``.
+
+        Keys that are already placed are returned under their current index.
+        """
+
+        result: Dict[int, List[SubscriptionKey]] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                index = self._placement.get(key)
+                if index is None:
+                    index = self._pick_locked()
+                    self._bind_locked(key, index)
+                    self._stats["assigned"] += 1
+                result.setdefault(index, []).append(key)
+        return result
+
+    def bind(self, key: SubscriptionKey, index: int = 0) -> int:
+        """Record ``key`` on ``index`` unless it is already placed; returns its index."""
+
+        with self._lock:
+            current = self._placement.get(key)
+            if current is not None:
+                return current
+            self._bind_locked(key, min(max(0, index), self.max_connections - 1))
+            return self._placement[key]
+
+    def release(self, key: SubscriptionKey) -> Optional[int]:
+        with self._lock:
+            index = self._placement.pop(key, None)
+            if index is not None:
+                self._load[index] -= 1
+                self._stats["released"] += 1
+            return index
+
+    def shrink(self, max_connections: int) -> List[SubscriptionKey]:
+        """
+        Stop using connection indexes at or above ``max_connections``.
+
+        Keys placed there move to the remaining connections and are returned so
+        the caller can subscribe them again.
+        """
+
+        with self._lock:
+            limit = max(1, min(int(max_connections), self.max_connections))
+            moved = sorted(
+                (key for key, index in self._placement.items() if index >= limit), key=_batch_order
+            )
+            self.max_connections = limit
+            self._load = self._load[:limit]
+            for key in moved:
+                self._bind_locked(key, self._pick_locked())
+        return moved
+
+    def keys_for(self, index: int) -> List[SubscriptionKey]:
+        with self._lock:
+            return sorted(
+                (key for key, placed in self._placement.items() if placed == index),
+                key=_batch_order,
+            )
+
+    def rebalance(self, available: Sequence[int]) -> Dict[int, List[SubscriptionKey]]:
+        """
+        Spread every placed key evenly over the ``available`` connection indexes.
+
+        Used after a reconnect, when all keys are sent again anyway; returns
+        the new ``{index: keys}`` layout.
+        """
+
+        indexes = sorted({index for index in available if 0 <= index < self.max_connections}) or [0]
+        with self._lock:
+            keys = sorted(self._placement, key=_batch_order)
+            self._placement.clear()
+            self._load = [0] * self.max_connections
+            per_connection = min(self.max_subscriptions, max(1, ceil(len(keys) / len(indexes))))
+            layout: Dict[int, List[SubscriptionKey]] = {}
+            position = 0
+            for index in indexes:
+                chunk = keys[position : position + per_connection]
+                position += len(chunk)
+                for key in chunk:
+                    self._bind_locked(key, index)
+                if chunk:
+                    layout[index] = chunk
+            for key in keys[position:]:
+                index = min(indexes, key=lambda item: self._load[item])
+                self._bind_locked(key, index)
+                self._stats["over_cap"] += 1
+                layout.setdefault(index, []).append(key)
+            self._stats["rebalances"] += 1
+        return layout
+
+    def clear(self) -> None:
+        with self._lock:
+            self._placement.clear()
+            self._load = [0] * self.max_connections
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats: Dict[str, object] = dict(self._stats)
+            stats["subscriptions"] = len(self._placement)
+            stats["per_connection"] = list(self._load)
+            stats["max_subscriptions"] = self.max_subscriptions
+            stats["max_connections"] = self.max_connections
+        return stats
+
+    def _pick_locked(self) -> int:
+        for index, load in enumerate(self._load):
+            if load < self.max_subscriptions:
+                return index
+        self._stats["over_cap"] += 1
+        return min(range(self.max_connections), key=lambda item: self._load[item])
+
+    def _bind_locked(self, key: SubscriptionKey, index: int) -> None:
+        self._placement[key] = index
+        self._load[index] += 1
+
+
+@dataclass(frozen=True)
+class SubscriptionPlan(Generic[K]):
+    """
+    Difference between the subscriptions held and the ones wanted.
+
+    Keys keep the order they were given in, so batches go out predictably.
+    """
+
+    subscribe: Tuple[K, ...]
+    unsubscribe: Tuple[K, ...]
+    keep: Tuple[K, ...]
+
+    @property
+    def empty(self) -> bool:
+        return not self.subscribe and not self.unsubscribe
+
+
+def plan_subscriptions(current: Iterable[K], target: Iterable[K]) -> SubscriptionPlan[K]:
+    """Return what to add and drop to move from ``current`` to ``target``."""
+
+    held = dict.fromkeys(current)
+    wanted = dict.fromkeys(target)
+    return SubscriptionPlan(
+        subscribe=tuple(key for key in wanted if key not in held),
+        unsubscribe=tuple(key for key in held if key not in wanted),
+        keep=tuple(key for key in wanted if key in held),
+    )
+
+
+def batch_keys(
+    keys: Iterable[K], group: Callable[[K], Hashable], size: int = DEFAULT_MAX_SUBSCRIPTIONS
+) -> List[Tuple[Hashable, List[K]]]:
+    """
+    Split ``keys`` into ``(group, chunk)`` batches of at most ``size`` keys.
+
+    Keys are grouped by ``group(key)`` (for example channel and afterHours),
+    since one vendor request carries a single channel and session.
+    """
+
+    size = max(1, int(size))
+    groups: Dict[Hashable, List[K]] = {}
+    for key in keys:
+        groups.setdefault(group(key), []).append(key)
+    return [
+        (name, members[offset : offset + size])
+        for name, members in groups.items()
+        for offset in range(0, len(members), size)
+    ]
+
+
+__all__ = [
+    "DEFAULT_MAX_CONNECTIONS",
+    "DEFAULT_MAX_SUBSCRIPTIONS",
+    "SubscriptionKey",
+    "SubscriptionPlan",
+    "SubscriptionPool",
+    "VENDOR_MAX_CONNECTIONS",
+    "batch_keys",
+    "plan_subscriptions",
+]